@@ -1,12 +1,17 @@
 from django.contrib import admin
+from recipe.admin_utils import CreatorFilter, EstimatedCountPaginator
 from .models import CreatedRecipe
 
 @admin.register(CreatedRecipe)
 class CreatedRecipeAdmin(admin.ModelAdmin):
-    list_display = ('title', 'creator', 'created_at', 'servings', 'ready_in_minutes')
-    list_filter = ('created_at', 'creator')
+    list_display = ('title', 'creator', 'created_at', 'servings', 'ready_in_minutes', 'view_count')
+    list_filter = ('created_at', CreatorFilter)
+    list_select_related = ('creator',)
     search_fields = ('title', 'creator__username')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'view_count')
+    autocomplete_fields = ('creator',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Recipe Information', {
@@ -16,7 +21,7 @@ class CreatedRecipeAdmin(admin.ModelAdmin):
             'fields': ('ingredients', 'instructions', 'servings', 'ready_in_minutes', 'featured_image')
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('created_at', 'updated_at', 'view_count'),
             'classes': ('collapse',)
         }),
     )
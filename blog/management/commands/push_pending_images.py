@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import CreatedRecipe
+from blog.uploads import push_pending_image
+
+
+class Command(BaseCommand):
+    help = "Upload created recipe images that are still staged (e.g. after a worker restart)"
+
+    def handle(self, *args, **options):
+        recipe_ids = list(
+            CreatedRecipe.objects.exclude(pending_image='').values_list('id', flat=True)
+        )
+        for recipe_id in recipe_ids:
+            push_pending_image(recipe_id)
+
+        remaining = CreatedRecipe.objects.exclude(pending_image='').count()
+        self.stdout.write(f"Pushed {len(recipe_ids) - remaining} of {len(recipe_ids)} staged images")
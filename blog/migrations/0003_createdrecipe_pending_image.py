@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_createdrecipe_is_shared_createdrecipe_shared_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='createdrecipe',
+            name='pending_image',
+            field=models.CharField(blank=True, default='', help_text='Staged image waiting to be uploaded', max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_createdrecipe_pending_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='createdrecipe',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
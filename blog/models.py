@@ -3,6 +3,8 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from cloudinary.models import CloudinaryField
 
+from .uploads import get_upload_backend
+
 class CreatedRecipe(models.Model):
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_created_recipes")
     title = models.CharField(max_length=255)
@@ -14,9 +16,11 @@ class CreatedRecipe(models.Model):
     ready_in_minutes = models.IntegerField(blank=True, null=True, validators=[MinValueValidator(1)])
     servings = models.IntegerField(blank=True, null=True, validators=[MinValueValidator(1)])
     featured_image = CloudinaryField('image', default='placeholder')
+    pending_image = models.CharField(max_length=255, blank=True, default='', help_text="Staged image waiting to be uploaded")
     is_shared = models.BooleanField(default=False)
     shared_message = models.TextField(blank=True, null=True, help_text="Optional message when sharing")
     shared_at = models.DateTimeField(blank=True, null=True)
+    view_count = models.PositiveIntegerField(default=0)  # Added in batches by recipe/analytics.py
     
     class Meta:
         ordering = ['-created_at']
@@ -24,6 +28,12 @@ class CreatedRecipe(models.Model):
     def __str__(self):
         return f"{self.title} by {self.creator.username}"
         
+    @property
+    def featured_image_url(self):
+        # Resolved by the upload backend that stored it (Cloudinary or local storage)
+        image = self._meta.get_field('featured_image').to_python(self.featured_image)
+        return get_upload_backend().image_url(image)
+        
     def get_ingredients_list(self):
         #Return ingredients as a list, split by lines
         return [ingredient.strip() for ingredient in self.ingredients.split('\n') if ingredient.strip()]
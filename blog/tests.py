@@ -1,3 +1,124 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import CreatedRecipe
+from blog.uploads import attach_featured_image, push_pending_image
+from recipe.models import Recipe
+
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=STORAGES)
+class LocalUploadBackendTests(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        self.media_root = root / 'media'
+        overrides = self.settings(
+            IMAGE_UPLOAD_BACKEND='blog.uploads.LocalUploadBackend',
+            MEDIA_ROOT=self.media_root,
+            IMAGE_UPLOAD_STAGING_ROOT=root / 'staging',
+            PRERENDER_ROOT=root / 'prerendered',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user('cook', password='pass')
+        self.client.force_login(self.user)
+
+    def create_recipe(self):
+        image = SimpleUploadedFile('pic.jpg', b'\xff\xd8\xff fake jpeg', content_type='image/jpeg')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse('create_recipe'), {
+                'title': 'Pancakes',
+                'ingredients': '2 eggs\n1 cup flour',
+                'instructions': 'Mix and fry',
+                'featured_image': image,
+            })
+        self.assertTrue(callbacks, "the upload should wait for the commit")
+        return CreatedRecipe.objects.get(title='Pancakes')
+
+    def test_new_recipe_shows_no_image_until_uploaded(self):
+        recipe = self.create_recipe()
+        self.assertTrue(recipe.pending_image)
+        self.assertIsNone(recipe.featured_image_url)
+        response = self.client.get(reverse('created_recipe_detail', args=[recipe.id]))
+        self.assertContains(response, 'No Image')
+
+    def test_uploaded_image_is_served_from_media(self):
+        recipe = self.create_recipe()
+        staged = Path(settings.IMAGE_UPLOAD_STAGING_ROOT, recipe.pending_image)
+        self.assertTrue(staged.exists())
+        mirror = Recipe.objects.create(recipe_id=f"created_{recipe.id}", title=recipe.title, is_cached=True)
+
+        # Runs in a worker thread in production; connections are managed by the test here
+        with mock.patch('blog.uploads.close_old_connections'):
+            push_pending_image(recipe.id)
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.pending_image, '')
+        self.assertEqual(recipe.featured_image_url, f'/media/recipes/{recipe.id}-pic.jpg')
+        self.assertTrue((self.media_root / 'recipes' / f'{recipe.id}-pic.jpg').exists())
+        self.assertFalse(staged.exists())
+        mirror.refresh_from_db()
+        self.assertEqual(mirror.image_url, recipe.featured_image_url)
+
+        response = self.client.get(reverse('created_recipe_detail', args=[recipe.id]))
+        self.assertContains(response, f'src="/media/recipes/{recipe.id}-pic.jpg"')
+        self.assertNotContains(response, 'res.cloudinary.com')
+
+        # A later save stores the value in Cloudinary's format, the URL must not change
+        recipe.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.featured_image_url, f'/media/recipes/{recipe.id}-pic.jpg')
+
+    # Image swaps are .update()s, which send no post_save to republish the public page
+    def test_background_upload_republishes(self):
+        recipe = self.create_recipe()
+        with mock.patch('blog.uploads.close_old_connections'), mock.patch('recipe.prerender.schedule') as schedule:
+            push_pending_image(recipe.id)
+            # Nothing left to swap the second time
+            push_pending_image(recipe.id)
+        schedule.assert_called_once_with(f"created_{recipe.id}")
+
+    def test_direct_upload_republishes(self):
+        recipe = CreatedRecipe.objects.create(creator=self.user, title='Waffles', ingredients='egg', instructions='Bake', is_shared=True)
+        request = RequestFactory().post('/', {
+            'featured_image_public_id': 'recipes/waffles',
+            'featured_image_version': '1',
+            'featured_image_signature': 'signed',
+        })
+        with mock.patch('blog.uploads.LocalUploadBackend.verify_direct_upload', return_value=True), \
+                mock.patch('recipe.prerender.schedule') as schedule:
+            attach_featured_image(recipe, request)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.featured_image.public_id, 'recipes/waffles')
+        schedule.assert_called_once_with(f"created_{recipe.id}")
+
+    def test_direct_upload_updates_the_feed_copy(self):
+        recipe = CreatedRecipe.objects.create(creator=self.user, title='Waffles', ingredients='egg', instructions='Bake', is_shared=True)
+        mirror = Recipe.objects.create(recipe_id=f"created_{recipe.id}", title=recipe.title, image_url='old.jpg', is_cached=True)
+        request = RequestFactory().post('/', {
+            'featured_image_public_id': 'recipes/waffles.jpg',
+            'featured_image_version': '1',
+            'featured_image_signature': 'signed',
+        })
+        with mock.patch('blog.uploads.LocalUploadBackend.verify_direct_upload', return_value=True):
+            attach_featured_image(recipe, request)
+        mirror.refresh_from_db()
+        self.assertEqual(mirror.image_url, '/media/recipes/waffles.jpg')
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.featured_image_url, mirror.image_url)
@@ -0,0 +1,163 @@
+"""
+Featured image uploads for CreatedRecipe, kept off the request path.
+
+The view stages the uploaded file on local disk and returns straight away;
+a background worker pushes it to the configured upload backend and then
+points featured_image at the result. Until that finishes the recipe keeps
+its previous image (the placeholder for new recipes).
+
+Browsers can also upload straight to Cloudinary with signed parameters from
+image_upload_signature, in which case only the resulting public id is posted.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudinary
+import cloudinary.uploader
+import cloudinary.utils
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Folder uploaded recipe images are grouped under
+UPLOAD_FOLDER = 'recipes'
+
+# Small pool: uploads are network bound and rare
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-upload')
+
+
+class CloudinaryUploadBackend:
+    """Uploads to Cloudinary (configured through CLOUDINARY_URL)"""
+
+    def upload(self, file_obj):
+        # Returns a tuple: (public_id, delivery_url)
+        result = cloudinary.uploader.upload(file_obj, folder=UPLOAD_FOLDER, resource_type='image')
+        return result['public_id'], result['secure_url']
+
+    def direct_upload_params(self):
+        """Signed parameters for a browser-side upload, or None if unavailable"""
+        config = cloudinary.config()
+        if not (config.cloud_name and config.api_key and config.api_secret):
+            return None
+        params = {'timestamp': int(time.time()), 'folder': UPLOAD_FOLDER}
+        params['signature'] = cloudinary.utils.api_sign_request(params, config.api_secret)
+        params['api_key'] = config.api_key
+        params['upload_url'] = f"https://api.cloudinary.com/v1_1/{config.cloud_name}/image/upload"
+        return params
+
+    def verify_direct_upload(self, public_id, version, signature):
+        return cloudinary.utils.verify_api_response_signature(public_id, version, signature)
+
+    def image_url(self, image):
+        """Delivery URL of a stored featured_image (a CloudinaryResource), or None"""
+        return image.url if image else None
+
+
+class LocalUploadBackend:
+    """Stand-in for Cloudinary that keeps images in default storage (development/testing)"""
+
+    def upload(self, file_obj):
+        name = default_storage.save(f"{UPLOAD_FOLDER}/{file_obj.name.rsplit('/', 1)[-1]}", file_obj)
+        return name, default_storage.url(name)
+
+    def direct_upload_params(self):
+        return None
+
+    def verify_direct_upload(self, public_id, version, signature):
+        return False
+
+    def image_url(self, image):
+        # Only names this backend saved have a file, not e.g. the Cloudinary placeholder
+        if not image or not image.public_id.startswith(f"{UPLOAD_FOLDER}/"):
+            return None
+        name = f"{image.public_id}.{image.format}" if image.format else image.public_id
+        return default_storage.url(name)
+
+
+def get_upload_backend():
+    return import_string(settings.IMAGE_UPLOAD_BACKEND)()
+
+
+def staging_storage():
+    return FileSystemStorage(location=settings.IMAGE_UPLOAD_STAGING_ROOT)
+
+
+def attach_featured_image(recipe, request):
+    """
+    Attach the image submitted with a create/edit form to the recipe.
+    A verified direct upload is applied immediately; a file upload is staged
+    and pushed in the background once the surrounding transaction commits.
+    """
+    from .models import CreatedRecipe
+
+    public_id = request.POST.get('featured_image_public_id')
+    if public_id:
+        backend = get_upload_backend()
+        if backend.verify_direct_upload(
+            public_id,
+            request.POST.get('featured_image_version'),
+            request.POST.get('featured_image_signature'),
+        ):
+            CreatedRecipe.objects.filter(id=recipe.id).update(featured_image=public_id, pending_image='')
+            recipe.featured_image = public_id
+            recipe.pending_image = ''
+            _image_swapped(recipe.id, recipe.featured_image_url)
+        return
+
+    uploaded = request.FILES.get('featured_image')
+    if not uploaded:
+        return
+
+    staged_name = staging_storage().save(f"{recipe.id}-{uploaded.name}", uploaded)
+    CreatedRecipe.objects.filter(id=recipe.id).update(pending_image=staged_name)
+    recipe.pending_image = staged_name
+    transaction.on_commit(lambda: _executor.submit(push_pending_image, recipe.id))
+
+
+def _image_swapped(recipe_id, url):
+    """
+    Follow up a featured_image swap: keep the feed copy of a shared recipe in
+    step and refresh its prerendered page. The swap is an .update(), which
+    sends no post_save for recipe/signals.py to act on.
+    """
+    from recipe import prerender
+    from recipe.models import Recipe
+
+    Recipe.objects.filter(recipe_id=f"created_{recipe_id}").update(image_url=url)
+    prerender.schedule(f"created_{recipe_id}")
+
+
+def push_pending_image(recipe_id):
+    """Upload a recipe's staged image and swap it in. Safe to call more than once."""
+    from .models import CreatedRecipe
+
+    close_old_connections()
+    try:
+        staged_name = CreatedRecipe.objects.filter(id=recipe_id).values_list('pending_image', flat=True).first()
+        if not staged_name:
+            return
+
+        storage = staging_storage()
+        if not storage.exists(staged_name):
+            CreatedRecipe.objects.filter(id=recipe_id, pending_image=staged_name).update(pending_image='')
+            return
+
+        with storage.open(staged_name) as staged_file:
+            public_id, url = get_upload_backend().upload(staged_file)
+
+        # Only swap in if no newer image was staged in the meantime
+        updated = CreatedRecipe.objects.filter(id=recipe_id, pending_image=staged_name).update(
+            featured_image=public_id, pending_image=''
+        )
+        if updated:
+            _image_swapped(recipe_id, url)
+        storage.delete(staged_name)
+    except Exception:
+        # Left staged; push_pending_images retries it
+        logger.exception("Image upload failed for created recipe %s", recipe_id)
+    finally:
+        close_old_connections()
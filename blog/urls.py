@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('create/', views.create_recipe, name='create_recipe'),
+    path('image-upload-signature/', views.image_upload_signature, name='image_upload_signature'),
     path('recipe/<int:recipe_id>/', views.created_recipe_detail, name='created_recipe_detail'),
     path('recipe/<int:recipe_id>/public/', views.public_created_recipe_detail, name='public_created_recipe_detail'),
     path('recipe/<int:recipe_id>/edit/', views.edit_created_recipe, name='edit_created_recipe'),
@@ -1,15 +1,18 @@
 
 # Imports (copied from recipe/views.py for convenience)
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.utils import timezone
 import requests 
-from recipe.models import Recipe, UserRecipe, RecipeComment
+from recipe import analytics, prerender
+from recipe.models import Recipe, RecipeContent, UserRecipe, RecipeComment
+from recipe.normalize import INGREDIENT_SCHEMA_VERSION, normalize_ingredients
 from blog.models import CreatedRecipe
+from blog.uploads import attach_featured_image, get_upload_backend
 
 # Create your views here.
 
@@ -23,7 +26,6 @@ def create_recipe(request):
         instructions = request.POST.get('instructions')
         servings = request.POST.get('servings')
         ready_in_minutes = request.POST.get('ready_in_minutes')
-        featured_image = request.FILES.get('featured_image')
         
         # Create and save the new recipe
         new_recipe = CreatedRecipe.objects.create(
@@ -34,14 +36,25 @@ def create_recipe(request):
             instructions=instructions,
             servings=int(servings) if servings else None,
             ready_in_minutes=int(ready_in_minutes) if ready_in_minutes else None,
-            featured_image=featured_image
         )
+        
+        # Image is uploaded in the background, the placeholder shows until then
+        attach_featured_image(new_recipe, request)
         messages.success(request, 'Your recipe has been created successfully!')
         return redirect('my_recipes')  # Redirect to the my_recipes page
 
     return render(request, 'create_recipe.html') 
 
 
+# Signed parameters so the browser can upload an image straight to Cloudinary
+@login_required
+def image_upload_signature(request):
+    params = get_upload_backend().direct_upload_params()
+    if params is None:
+        return JsonResponse({'direct_upload': False})
+    return JsonResponse({'direct_upload': True, **params})
+
+
 # View to display a single user created recipe
 @login_required 
 def created_recipe_detail(request, recipe_id):
@@ -55,8 +68,14 @@ def created_recipe_detail(request, recipe_id):
 
 # Public view to display a shared created recipe
 def public_created_recipe_detail(request, recipe_id):
+    # Anonymous visitors get the prerendered page when there is one
+    response = prerender.serve(request, f"created_{recipe_id}")
+    if response:
+        analytics.record_view(f"created_{recipe_id}")
+        return response
     try:
         recipe = CreatedRecipe.objects.get(id=recipe_id, is_shared=True)
+        analytics.record_view(f"created_{recipe.id}")
         return render(request, 'public_created_recipe_detail.html', {'recipe': recipe})
     except CreatedRecipe.DoesNotExist:
         messages.error(request, 'Recipe not found or not shared.')
@@ -80,11 +99,10 @@ def edit_created_recipe(request, recipe_id):
         recipe.servings = int(request.POST.get('servings')) if request.POST.get('servings') else None
         recipe.ready_in_minutes = int(request.POST.get('ready_in_minutes')) if request.POST.get('ready_in_minutes') else None
         
-        # Handle image upload
-        if request.FILES.get('featured_image'):
-            recipe.featured_image = request.FILES.get('featured_image')
-            
         recipe.save()
+        
+        # New image is uploaded in the background, the current one shows until then
+        attach_featured_image(recipe, request)
         messages.success(request, 'Your recipe has been updated successfully!')
         return redirect('created_recipe_detail', recipe_id=recipe.id)
     
@@ -121,15 +139,20 @@ def share_created_recipe(request, recipe_id):
             recipe_id=f"created_{recipe.id}",  # Unique identifier for created recipes, won't not clash with API IDs, will have to be handled specially in other views for modularity
             defaults={
                 'title': recipe.title,
-                'image_url': recipe.featured_image.url if recipe.featured_image else None,
-                'summary': recipe.description or '',
-                'instructions': recipe.instructions,
-                'ingredients': [{'original': ingredient} for ingredient in recipe.get_ingredients_list()],
+                'image_url': recipe.featured_image_url,
                 'ready_in_minutes': recipe.ready_in_minutes,
                 'servings': recipe.servings,
                 'is_cached': True
             }
         )
+        if created:
+            RecipeContent.objects.create(
+                recipe=recipe_obj,
+                summary=recipe.description or '',
+                instructions=recipe.instructions,
+                ingredients=normalize_ingredients(recipe.get_ingredients_list()),
+                schema_version=INGREDIENT_SCHEMA_VERSION
+            )
         
         # Create or update UserRecipe for sharing
         user_recipe, user_recipe_created = UserRecipe.objects.get_or_create(
@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from food_blog.profiling import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'food_blog.settings')
 
 application = get_asgi_application()
+
+# Load URLconf and views now rather than on the first request
+warm_up()
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def assets(request):
+    """Whether templates should load the built static bundles instead of CDN assets"""
+    return {'use_asset_bundles': settings.USE_ASSET_BUNDLES}
@@ -0,0 +1,61 @@
+"""
+Send reads to the read replica and writes to the primary database.
+
+A request is pinned to the primary when it is not a safe method (POST etc.)
+and for REPLICA_PIN_SECONDS after one, through a cookie, so the page a user
+is redirected to after sharing or commenting shows their change even if the
+replica is lagging. Reads inside a transaction, and all reads outside a web
+request, also use the primary.
+
+To try it locally with SQLite, point DATABASE_REPLICA_URL at a copy of the
+database file: reads then come from the copy until it is refreshed.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+
+PIN_COOKIE = 'use_primary'
+
+# Only web requests opt in to the replica; management commands, background
+# threads and anything else outside a request keep using the primary
+_pinned = ContextVar('use_primary', default=True)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaPinningMiddleware:
+    """Pin writes, and requests shortly after a write, to the primary"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+        token = _pinned.set(writes or PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        if writes:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,37 @@
+import resource
+
+
+def memory_usage():
+    """
+    Memory of the current process in KiB.
+    Returns a dict with 'rss' and, on Linux, 'private' (memory not shared with
+    the gunicorn master through copy-on-write) and 'shared'.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            fields = dict(
+                (line.split(':')[0], int(line.split()[1]))
+                for line in smaps
+                if line.split(':')[0] in ('Rss', 'Private_Clean', 'Private_Dirty', 'Shared_Clean', 'Shared_Dirty')
+            )
+    except OSError:
+        # Not Linux: peak RSS is the best we can do
+        return {'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'private': None, 'shared': None}
+
+    return {
+        'rss': fields['Rss'],
+        'private': fields['Private_Clean'] + fields['Private_Dirty'],
+        'shared': fields['Shared_Clean'] + fields['Shared_Dirty'],
+    }
+
+
+def warm_up():
+    """
+    Import everything Django would otherwise load lazily on the first request
+    (URLconf, views and their dependencies). With gunicorn --preload this runs
+    once in the master, so workers share those modules instead of each
+    importing them after the fork.
+    """
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
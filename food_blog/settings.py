@@ -24,8 +24,13 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 
+# Deployment profile, "development" (default) or "production".
+# Production turns DEBUG off and uses persistent DB connections and a shared cache.
+DJANGO_PROFILE = os.environ.get("DJANGO_PROFILE", "development")
+PRODUCTION = DJANGO_PROFILE == "production"
+
 # SECURITY WARNING: don't run with debug turned on in production! "Turn it off they say, the only thing I think when they tell me to turn it off, I say NO! NO! NO! NO! NO!"
-DEBUG = True
+DEBUG = os.environ.get("DEBUG", str(not PRODUCTION)) == "True"
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', '.herokuapp.com']
 
@@ -76,13 +81,21 @@ TEMPLATES = [
             BASE_DIR / 'templates',
             BASE_DIR / 'templates' / 'allauth',
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory for the life of the worker
+            # (the dev server's autoreloader still picks up template edits)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'food_blog.context_processors.assets',
             ],
         },
     },
@@ -90,6 +103,32 @@ TEMPLATES = [
 
 SPOONACULAR_API_KEY = os.environ.get("SPOONACULAR_API_KEY")
 
+# Spoonacular plan limits: points per day and a request rate (token bucket)
+SPOONACULAR_DAILY_POINTS = float(os.environ.get("SPOONACULAR_DAILY_POINTS", "150"))
+SPOONACULAR_REQUESTS_PER_SECOND = float(os.environ.get("SPOONACULAR_REQUESTS_PER_SECOND", "1"))
+SPOONACULAR_BURST = int(os.environ.get("SPOONACULAR_BURST", "5"))
+
+# Per-user/IP limits on views that write (see recipe/ratelimit.py). They are
+# only enforced with a Redis (REDIS_URL) or memcached cache
+RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "True") == "True"
+RATELIMIT_USE_FORWARDED_FOR = os.environ.get("RATELIMIT_USE_FORWARDED_FOR", str(PRODUCTION)) == "True"
+
+# Prefetched random recipes: pool size, the size that triggers a background
+# refill, and how often each process checks the size
+RANDOM_POOL_SIZE = int(os.environ.get("RANDOM_POOL_SIZE", "300"))
+RANDOM_POOL_LOW_WATER = int(os.environ.get("RANDOM_POOL_LOW_WATER", "100"))
+RANDOM_POOL_CHECK_SECONDS = int(os.environ.get("RANDOM_POOL_CHECK_SECONDS", "60"))
+
+# Send long pages (the home feed) as a stream: the page shell first, then
+# cards as they are rendered. Turn off behind proxies that buffer responses.
+STREAMING_PAGES = os.environ.get("STREAMING_PAGES", "True") == "True"
+
+# Buffered recipe view counts (see recipe/analytics.py): flush interval,
+# distinct recipes buffered before an early flush, and how long hourly rollups are kept
+ANALYTICS_FLUSH_SECONDS = int(os.environ.get("ANALYTICS_FLUSH_SECONDS", "30"))
+ANALYTICS_FLUSH_SIZE = int(os.environ.get("ANALYTICS_FLUSH_SIZE", "500"))
+ANALYTICS_RETENTION_DAYS = int(os.environ.get("ANALYTICS_RETENTION_DAYS", "90"))
+
 WSGI_APPLICATION = 'food_blog.wsgi.application'
 
 SECRET_KEY = os.environ.get("SECRET_KEY")
@@ -104,10 +143,68 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 # }
 #}
 
+# Persistent connections in production save a connect/auth round trip per request
 DATABASES = {
-    'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+    'default': dj_database_url.parse(
+        os.environ.get("DATABASE_URL"),
+        conn_max_age=int(os.environ.get("CONN_MAX_AGE", 600 if PRODUCTION else 0)),
+        conn_health_checks=True,
+    )
 }
 
+# Optional read replica: safe reads go there, see food_blog/db_routers.py
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ.get("DATABASE_REPLICA_URL"),
+        conn_max_age=int(os.environ.get("CONN_MAX_AGE", 600 if PRODUCTION else 0)),
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['food_blog.db_routers.PrimaryReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+        'food_blog.db_routers.ReplicaPinningMiddleware',
+    )
+
+# Seconds a user's reads stay on the primary after they post something
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "5"))
+
+# Cache: Redis if REDIS_URL is set (needs the redis package), otherwise the
+# database in production so every worker shares it (run createcachetable),
+# and process memory in development
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get("REDIS_URL"),
+        }
+    }
+elif PRODUCTION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sessions: with Redis they are read from the cache and only written through
+# to the DB on change. Without a shared in-memory cache, cached_db would add a
+# cache-table read to the session-table read on every signed in request, so
+# sessions live in a signed cookie instead (no server-side storage; logging
+# out clears the cookie, rotate SECRET_KEY to revoke every session).
+# Flash messages live in a signed cookie so they don't cause session writes.
+SESSION_ENGINE = os.environ.get("SESSION_ENGINE", (
+    'django.contrib.sessions.backends.cached_db' if os.environ.get("REDIS_URL")
+    else 'django.contrib.sessions.backends.signed_cookies'
+))
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 CSRF_TRUSTED_ORIGINS = [
     "https://127.0.0.1",
     "https://*.herokuapp.com"
@@ -157,7 +254,32 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-# Enable WhiteNoise's GZip and Brotli compression
+# User uploads
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Prerendered public recipe pages and the sitemap (see recipe/prerender.py).
+# Every process must share them: the local PRERENDER_ROOT suits one server,
+# with several (e.g. Heroku dynos) set PRERENDER_STORAGE to a shared backend
+# such as storages.backends.s3.S3Storage. Production leaves prerendering off
+# while the storage is local.
+PRERENDER_ROOT = os.environ.get("PRERENDER_ROOT", BASE_DIR / 'prerendered')
+PRERENDER_STORAGE = os.environ.get("PRERENDER_STORAGE", "django.core.files.storage.FileSystemStorage")
+PRERENDER_PAGES = os.environ.get(
+    "PRERENDER_PAGES", str(not PRODUCTION or not PRERENDER_STORAGE.endswith('.FileSystemStorage'))
+) == "True"
+
+# Created recipe images are staged here and uploaded in the background.
+# Set IMAGE_UPLOAD_BACKEND=blog.uploads.LocalUploadBackend to work without Cloudinary.
+IMAGE_UPLOAD_BACKEND = os.environ.get("IMAGE_UPLOAD_BACKEND", "blog.uploads.CloudinaryUploadBackend")
+IMAGE_UPLOAD_STAGING_ROOT = os.environ.get("IMAGE_UPLOAD_STAGING_ROOT", BASE_DIR / 'media' / 'staging')
+
+# Serve the bundles from `manage.py build_assets` once they exist, CDN assets otherwise
+USE_ASSET_BUNDLES = os.environ.get(
+    "USE_ASSET_BUNDLES", str((BASE_DIR / 'static' / 'dist' / 'site.min.css').exists())
+) == "True"
+
+# Enable WhiteNoise's GZip and Brotli compression (Brotli needs the Brotli package)
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -171,3 +293,17 @@ STORAGES = {
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Refuse to boot a production profile with settings that keep per-request
+# debug data in memory (DEBUG stores every SQL query run by the worker), or
+# that read sessions through the database cache table
+if PRODUCTION:
+    from django.core.exceptions import ImproperlyConfigured
+
+    if DEBUG:
+        raise ImproperlyConfigured("DEBUG must be off when DJANGO_PROFILE=production.")
+    if any(template.get('OPTIONS', {}).get('debug') for template in TEMPLATES):
+        raise ImproperlyConfigured("Template debug must be off when DJANGO_PROFILE=production.")
+    if SESSION_ENGINE.endswith('cached_db') and not os.environ.get("REDIS_URL"):
+        raise ImproperlyConfigured("cached_db sessions need REDIS_URL when DJANGO_PROFILE=production.")
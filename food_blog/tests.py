@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import nullcontext
+
+from django.db import connections, transaction
+from django.http import JsonResponse
+from django.test import TransactionTestCase, modify_settings, override_settings
+from django.urls import path
+
+from food_blog.db_routers import PRIMARY, REPLICA
+from recipe.models import Recipe
+from recipe.streaming import stream_template
+
+
+def titles(request):
+    if request.method == 'POST':
+        Recipe.objects.create(recipe_id=request.POST['recipe_id'], title=request.POST['recipe_id'])
+    with transaction.atomic() if request.GET.get('atomic') else nullcontext():
+        found = list(Recipe.objects.order_by('recipe_id').values_list('title', flat=True))
+    return JsonResponse({'titles': found})
+
+
+def streamed_titles(request):
+    def items():
+        # Read while the body streams, after the view has returned
+        for recipe in Recipe.objects.order_by('recipe_id'):
+            yield f'<li>{recipe.title}</li>'
+    return stream_template(request, 'titles.html', {}, 'items', items())
+
+
+urlpatterns = [path('titles/', titles), path('streamed/', streamed_titles)]
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {'loaders': [('django.template.loaders.locmem.Loader', {'titles.html': '<ul>{{ items }}</ul>'})]},
+}]
+
+
+@override_settings(
+    ROOT_URLCONF='food_blog.tests',
+    DATABASE_ROUTERS=['food_blog.db_routers.PrimaryReplicaRouter'],
+    REPLICA_PIN_SECONDS=5,
+)
+@modify_settings(MIDDLEWARE={'prepend': 'food_blog.db_routers.ReplicaPinningMiddleware'})
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    """
+    Two SQLite databases: the replica is a file copy of the primary, taken
+    in setUp, so anything written after that is "lagging" on the replica.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        # Added after the test runner set up its databases, so it is left alone
+        connections.settings[REPLICA] = {**connections.settings[PRIMARY], 'NAME': cls.replica_path}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        os.remove(cls.replica_path)
+        super().tearDownClass()
+
+    def setUp(self):
+        Recipe.objects.create(recipe_id='1', title='replicated')
+        self.sync_replica()
+        # Written after the last sync, so only the primary has it
+        Recipe.objects.create(recipe_id='2', title='lagging')
+
+    def sync_replica(self):
+        connections[REPLICA].close()
+        connections[PRIMARY].ensure_connection()
+        replica = sqlite3.connect(self.replica_path)
+        connections[PRIMARY].connection.backup(replica)
+        replica.close()
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.client.get('/titles/').json()['titles'], ['replicated'])
+
+    def test_writes_and_their_reads_go_to_the_primary(self):
+        response = self.client.post('/titles/', {'recipe_id': '3'}).json()
+        self.assertEqual(response['titles'], ['replicated', 'lagging', '3'])
+        self.assertTrue(Recipe.objects.using(PRIMARY).filter(recipe_id='3').exists())
+        self.assertFalse(Recipe.objects.using(REPLICA).filter(recipe_id='3').exists())
+
+    def test_reads_in_a_transaction_go_to_the_primary(self):
+        response = self.client.get('/titles/', {'atomic': '1'}).json()
+        self.assertEqual(response['titles'], ['replicated', 'lagging'])
+
+    def test_pinned_to_the_primary_after_a_post(self):
+        response = self.client.post('/titles/', {'recipe_id': '3'})
+        cookie = response.cookies['use_primary']
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertTrue(cookie['httponly'])
+
+        # The user sees their own write on the next page
+        self.assertEqual(self.client.get('/titles/').json()['titles'], ['replicated', 'lagging', '3'])
+
+        # Once the cookie expires reads go back to the replica
+        self.client.cookies.pop('use_primary')
+        self.assertEqual(self.client.get('/titles/').json()['titles'], ['replicated'])
+
+    def test_outside_requests_use_the_primary(self):
+        # Management commands and background threads never see replica lag
+        self.assertEqual(Recipe.objects.all().db, PRIMARY)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_request_leaves_the_pin_as_it_found_it(self):
+        self.client.get('/titles/')
+        self.assertEqual(Recipe.objects.all().db, PRIMARY)
+
+    @override_settings(TEMPLATES=TEMPLATES)
+    def test_streamed_pages_read_from_the_replica(self):
+        response = self.client.get('/streamed/')
+        self.assertEqual(b''.join(response.streaming_content), b'<ul><li>replicated</li></ul>')
+
+    @override_settings(TEMPLATES=TEMPLATES)
+    def test_streamed_pages_keep_the_pin(self):
+        self.client.cookies['use_primary'] = '1'
+        response = self.client.get('/streamed/')
+        self.assertEqual(b''.join(response.streaming_content), b'<ul><li>replicated</li><li>lagging</li></ul>')
+
+    @override_settings(TEMPLATES=TEMPLATES)
+    async def test_streamed_pages_under_asgi(self):
+        self.async_client.cookies['use_primary'] = '1'
+        response = await self.async_client.get('/streamed/')
+        # A sync body would be read to the end (with a warning) before sending
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body, b'<ul><li>replicated</li><li>lagging</li></ul>')
@@ -14,14 +14,21 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from recipe.views import home_view
+from recipe.views import home_view, sitemap
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("accounts/", include("allauth.urls")),
     path('search/', include('recipe.urls')),
     path('blog/', include('blog.urls')),
+    path('api/', include('recipe.api_urls')),
     path('summernote/', include('django_summernote.urls')),
+    path('sitemap.xml', sitemap, name='sitemap'),
     path('', home_view, name='home'), 
 ]
+
+# Images from LocalUploadBackend, served by the development server (DEBUG only)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
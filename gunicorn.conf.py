@@ -0,0 +1,85 @@
+"""
+Gunicorn settings, tuned for small dynos. Every value can be overridden from
+the environment.
+
+The app is preloaded in the master, and its heap is frozen out of the
+garbage collector before forking. Workers then share those pages
+copy-on-write instead of each holding a private copy of Django, allauth,
+summernote, cloudinary and requests.
+
+Worker classes:
+- gthread (default): threads cover the I/O-bound Spoonacular and Cloudinary calls.
+- gevent: set GUNICORN_WORKER_CLASS=gevent (needs gevent, plus psycogreen for Postgres).
+- sync: the old behaviour.
+- uvicorn: serves food_blog.asgi instead. Needed for the live feed stream,
+  where each idle client costs a coroutine rather than a thread.
+"""
+import gc
+import os
+
+from food_blog.profiling import memory_usage
+
+wsgi_app = 'food_blog.wsgi'
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'uvicorn':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'food_blog.asgi:application'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Recycle workers so slow leaks and fragmentation can't grow without bound;
+# jitter keeps them from all restarting at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Nothing opened while preloading may be shared with forked workers
+    from django.db import connections
+    connections.close_all()
+
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in the workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    usage = memory_usage()
+    server.log.info("Master preloaded app: rss=%s KiB", usage['rss'])
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning("psycogreen is not installed; database calls will block the gevent worker")
+        else:
+            patch_psycopg()
+
+
+def post_worker_init(worker):
+    usage = memory_usage()
+    worker.log.info(
+        "Worker %s ready: rss=%s KiB, private=%s KiB, shared=%s KiB",
+        worker.pid, usage['rss'], usage['private'], usage['shared'],
+    )
+
+
+def worker_exit(server, worker):
+    # Recipe views still buffered in this worker (see recipe/analytics.py)
+    from recipe import analytics
+    try:
+        analytics.flush()
+    except Exception:
+        server.log.exception("Could not flush recipe view counts of worker %s", worker.pid)
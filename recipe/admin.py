@@ -1,21 +1,67 @@
 from django.contrib import admin
-from .models import Recipe, UserRecipe, RecipeComment
+from .admin_utils import EstimatedCountPaginator, UserFilter
+from .models import ApiUsage, QueuedRecipeFetch, RandomPoolEntry, Recipe, RecipeContent, RecipeNeighbour, RecipeViewHour, UserRecipe, RecipeComment
+
+class RecipeContentInline(admin.StackedInline):
+    model = RecipeContent
+    can_delete = False
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('recipe_id', 'title', 'is_cached', 'cached_at', 'servings')
+    inlines = [RecipeContentInline]
+    list_display = ('recipe_id', 'title', 'is_cached', 'cached_at', 'servings', 'view_count')
     list_filter = ('is_cached', 'cached_at')
     search_fields = ('recipe_id', 'title')
-    readonly_fields = ('cached_at',)
+    readonly_fields = ('cached_at', 'view_count')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(UserRecipe)
 class UserRecipeAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe', 'is_shared', 'rating', 'created_at')
-    list_filter = ('is_shared', 'created_at')
+    list_filter = ('is_shared', 'created_at', UserFilter)
+    list_select_related = ('user', 'recipe')
     search_fields = ('user__username', 'recipe__title')
+    autocomplete_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(RecipeComment)
 class RecipeCommentAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe', 'rating', 'created_at')
-    list_filter = ('created_at', 'rating')
+    list_filter = ('created_at', 'rating', UserFilter)
+    list_select_related = ('user', 'recipe')
     search_fields = ('user__username', 'recipe__title', 'comment')
+    autocomplete_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(ApiUsage)
+class ApiUsageAdmin(admin.ModelAdmin):
+    list_display = ('day', 'points_used', 'quota_left', 'requests', 'throttled')
+    readonly_fields = ('day', 'points_used', 'quota_left', 'requests', 'throttled', 'tokens', 'tokens_updated_at')
+
+@admin.register(QueuedRecipeFetch)
+class QueuedRecipeFetchAdmin(admin.ModelAdmin):
+    list_display = ('recipe_id', 'requested_at', 'attempts')
+
+@admin.register(RandomPoolEntry)
+class RandomPoolEntryAdmin(admin.ModelAdmin):
+    list_display = ('recipe', 'random_key', 'added_at')
+    list_select_related = ('recipe',)
+    autocomplete_fields = ('recipe',)
+
+@admin.register(RecipeNeighbour)
+class RecipeNeighbourAdmin(admin.ModelAdmin):
+    list_display = ('source', 'rank', 'neighbour', 'title', 'score')
+    search_fields = ('source', 'neighbour', 'title')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(RecipeViewHour)
+class RecipeViewHourAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'recipe_key', 'views')
+    list_filter = ('hour',)
+    search_fields = ('recipe_key',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
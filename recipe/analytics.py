@@ -0,0 +1,153 @@
+"""
+Recipe page view counting without a database write per view.
+
+Views are added up in a per-process buffer keyed by (hour, recipe key) and
+written out by a background flusher thread every ANALYTICS_FLUSH_SECONDS,
+or sooner once ANALYTICS_FLUSH_SIZE distinct keys are buffered, whether or
+not more requests come in. A flush issues one
+UPDATE ... SET view_count = view_count + n per distinct n rather than one
+per recipe, and adds the same counts to the hourly RecipeViewHour rollups.
+Recipe keys are Recipe.recipe_id values, created recipes use "created_<id>".
+
+Gunicorn's worker_exit hook and atexit flush what is left when a process
+stops cleanly. A process that is killed (OOM, SIGKILL after the worker
+timeout) loses at most the views of its last ANALYTICS_FLUSH_SECONDS,
+which is fine for popularity ranking.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from blog.models import CreatedRecipe
+from .models import Recipe, RecipeViewHour
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_buffer = Counter()
+_flush_now = threading.Event()
+_flusher = None
+
+
+def record_view(recipe_key):
+    """Count one view of a recipe page. Only touches process memory."""
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    with _lock:
+        _buffer[hour, str(recipe_key)] += 1
+        full = len(_buffer) >= settings.ANALYTICS_FLUSH_SIZE
+        _start_flusher()
+    if full:
+        _flush_now.set()
+
+
+def flush():
+    """Write out this process's buffered views now"""
+    write_counts(_take_buffer())
+
+
+def _take_buffer():
+    global _buffer
+    with _lock:
+        counts, _buffer = _buffer, Counter()
+    return counts
+
+
+def _start_flusher():
+    # Started on first use rather than at import: threads don't survive
+    # gunicorn forking workers from the preloaded master
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_run_flusher, name='analytics-flush', daemon=True)
+        _flusher.start()
+
+
+def _run_flusher():
+    while True:
+        _flush_now.wait(settings.ANALYTICS_FLUSH_SECONDS)
+        _flush_now.clear()
+        counts = _take_buffer()
+        if counts:
+            _background_flush(counts)
+
+
+def _background_flush(counts):
+    close_old_connections()
+    try:
+        write_counts(counts)
+    except Exception:
+        logger.exception("Dropped %d buffered recipe view counts", sum(counts.values()))
+    finally:
+        close_old_connections()
+
+
+def write_counts(counts):
+    """
+    Add {(hour, recipe_key): views} to the recipe totals and hourly rollups,
+    batching every UPDATE by increment.
+    """
+    if not counts:
+        return
+    totals = Counter()
+    for (hour, key), views in counts.items():
+        totals[key] += views
+
+    recipes, created = defaultdict(list), defaultdict(list)
+    for key, views in totals.items():
+        if key.startswith('created_'):
+            if key[len('created_'):].isdigit():
+                created[views].append(int(key[len('created_'):]))
+        else:
+            recipes[views].append(key)
+
+    hours = defaultdict(lambda: defaultdict(list))
+    for (hour, key), views in counts.items():
+        hours[hour][views].append(key)
+
+    with transaction.atomic():
+        for views, keys in recipes.items():
+            Recipe.objects.filter(recipe_id__in=keys).update(view_count=F('view_count') + views)
+        for views, ids in created.items():
+            CreatedRecipe.objects.filter(id__in=ids).update(view_count=F('view_count') + views)
+
+        # Make sure every rollup row exists, then increment; safe when
+        # several processes flush the same hour at once
+        RecipeViewHour.objects.bulk_create(
+            [RecipeViewHour(recipe_key=key, hour=hour, views=0) for hour, key in counts],
+            ignore_conflicts=True,
+        )
+        for hour, keys_by_views in hours.items():
+            for views, keys in keys_by_views.items():
+                RecipeViewHour.objects.filter(hour=hour, recipe_key__in=keys).update(views=F('views') + views)
+
+
+def popular(days=7, limit=10):
+    """[(recipe_key, views)] of the most viewed recipes over the last days"""
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        RecipeViewHour.objects.filter(hour__gte=since)
+        .values_list('recipe_key')
+        .annotate(total=Sum('views'))
+        .order_by('-total')[:limit]
+    )
+
+
+def prune(days=None):
+    """Delete hourly rollups older than ANALYTICS_RETENTION_DAYS. Returns the number deleted."""
+    days = settings.ANALYTICS_RETENTION_DAYS if days is None else days
+    deleted, _ = RecipeViewHour.objects.filter(hour__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Could not flush recipe view counts at exit")
@@ -0,0 +1,509 @@
+"""
+JSON API over recipes, the feed, a user's library, comments and created
+recipes, for clients that don't want server-rendered pages.
+
+Rows are read with .values() so no model instances are built and related
+data comes from joins or subqueries, never a query per object. Clients pick
+the fields they need with ?fields=a,b (only those columns and joins are
+queried), page with the opaque next_cursor, and get gzip when they send
+Accept-Encoding: gzip.
+
+Writes take a JSON body and use the session (and CSRF token) like the site.
+"""
+import json
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField, Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+
+from blog.models import CreatedRecipe
+from . import analytics, prerender, shopping
+from .models import Recipe, RecipeComment, UserRecipe
+from .pagination import decode_position, encode_position
+from .quota import QuotaExceeded
+from .ratelimit import ratelimit
+from .views import get_or_fetch_recipe, shown_recipes
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Most recipes in one shopping list
+MAX_SHOPPING_RECIPES = 50
+
+
+def comment_count(**recipe):
+    """Subquery counting the comments on the recipe matched by the filter"""
+    comments = RecipeComment.objects.filter(**recipe).order_by().values('recipe')
+    return Coalesce(Subquery(comments.annotate(total=Count('id')).values('total')), 0)
+
+
+# Fields per resource: public name -> column path or expression. The first
+# list of each pair is what a client gets without ?fields.
+RECIPE_FIELDS = {
+    'recipe_id': 'recipe_id',
+    'title': 'title',
+    'image_url': 'image_url',
+    'ready_in_minutes': 'ready_in_minutes',
+    'servings': 'servings',
+    'source_url': 'source_url',
+    'summary': 'content__summary',
+    'instructions': 'content__instructions',
+    'ingredients': 'content__ingredients',
+    'comment_count': comment_count(recipe=OuterRef('pk')),
+    'view_count': 'view_count',
+}
+RECIPE_LIST_DEFAULT = ('recipe_id', 'title', 'image_url', 'ready_in_minutes', 'servings')
+
+FEED_FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'recipe_id': 'recipe__recipe_id',
+    'title': 'recipe__title',
+    'image_url': 'recipe__image_url',
+    'message': 'message',
+    'rating': 'rating',
+    'shared_at': 'shared_at',
+    'comment_count': comment_count(recipe=OuterRef('recipe')),
+}
+FEED_DEFAULT = ('id', 'user', 'recipe_id', 'title', 'image_url', 'message', 'rating', 'shared_at')
+
+LIBRARY_FIELDS = {
+    'id': 'id',
+    'recipe_id': 'recipe__recipe_id',
+    'title': 'recipe__title',
+    'image_url': 'recipe__image_url',
+    'rating': 'rating',
+    'is_shared': 'is_shared',
+    'message': 'message',
+    'created_at': 'created_at',
+    'shared_at': 'shared_at',
+}
+LIBRARY_DEFAULT = ('id', 'recipe_id', 'title', 'image_url', 'rating', 'is_shared', 'created_at')
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'comment': 'comment',
+    'rating': 'rating',
+    'created_at': 'created_at',
+}
+COMMENT_DEFAULT = tuple(COMMENT_FIELDS)
+
+CREATED_FIELDS = {
+    'id': 'id',
+    'creator': 'creator__username',
+    'title': 'title',
+    'description': 'description',
+    'ingredients': 'ingredients',
+    'instructions': 'instructions',
+    'servings': 'servings',
+    'ready_in_minutes': 'ready_in_minutes',
+    'is_shared': 'is_shared',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'view_count': 'view_count',
+    # Comments live on the feed mirror Recipe "created_<id>"
+    'comment_count': comment_count(recipe__recipe_id=Concat(Value('created_'), Cast(OuterRef('id'), CharField()))),
+}
+CREATED_LIST_DEFAULT = ('id', 'creator', 'title', 'description', 'servings', 'ready_in_minutes', 'created_at')
+
+# Fields a client may write on a created recipe
+CREATED_WRITABLE = ('title', 'description', 'ingredients', 'instructions', 'servings', 'ready_in_minutes')
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def api_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder, json_dumps_params={'separators': (',', ':')})
+
+
+def api_view(methods=('GET',), login=False):
+    """
+    Wrap an API view: allowed methods, JSON 401 instead of the login
+    redirect, ApiError and QuotaExceeded turned into JSON errors, and gzip.
+    """
+    def decorator(view):
+        @gzip_page
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                response = api_response({'error': 'Method not allowed'}, status=405)
+                response['Allow'] = ', '.join(methods)
+                return response
+            if (login or request.method != 'GET') and not request.user.is_authenticated:
+                return api_response({'error': 'Authentication required'}, status=401)
+            try:
+                return view(request, *args, **kwargs)
+            except ApiError as error:
+                return api_response({'error': str(error), **error.extra}, status=error.status)
+            except QuotaExceeded as error:
+                response = api_response({'error': 'Recipe service unavailable', 'retry_after': error.retry_after}, status=503)
+                response['Retry-After'] = str(error.retry_after)
+                return response
+        return wrapped
+    return decorator
+
+
+def selected_fields(request, spec, default):
+    """Names from ?fields=a,b (all of spec for ?fields=all), or default"""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(default)
+    if requested == 'all':
+        return list(spec)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in spec]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}", available=list(spec))
+    return list(dict.fromkeys(names))
+
+
+def column(name, spec):
+    """Key of a field in select()'s rows; renamed ones are aliased so they can't clash with model fields"""
+    return name if spec[name] == name else f'api_{name}'
+
+
+def select(queryset, names, spec, **extra):
+    """queryset.values() of just the named fields (see shape())"""
+    columns = [name for name in names if spec[name] == name]
+    expressions = {
+        column(name, spec): F(spec[name]) if isinstance(spec[name], str) else spec[name]
+        for name in names if spec[name] != name
+    }
+    return queryset.values(*columns, **expressions, **extra)
+
+
+def shape(rows, names, spec):
+    """Rows from select() keyed by public field names, in the requested order"""
+    keys = [(name, column(name, spec)) for name in names]
+    return [{name: row[key] for name, key in keys} for row in rows]
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit must be a number")
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def paginate(request, queryset, spec, default, order='created_at'):
+    """
+    One keyset page of a resource, newest first by (order, pk).
+    Returns {'results': [...], 'next_cursor': ...}.
+    """
+    names = selected_fields(request, spec, default)
+    limit = page_size(request)
+    queryset = queryset.order_by(f'-{order}', '-pk')
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = decode_position(cursor)
+        if position is None:
+            raise ApiError("Invalid cursor")
+        # The value is text, the order field's lookups parse it back
+        value, pk = position
+        try:
+            queryset = queryset.filter(Q(**{f'{order}__lt': value}) | Q(**{order: value, 'pk__lt': pk}))
+        except (ValidationError, ValueError, TypeError):
+            raise ApiError("Invalid cursor")
+
+    rows = list(select(queryset, names, spec, cursor_value=F(order), cursor_pk=F('pk'))[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_position(last['cursor_value'], last['cursor_pk'])
+    return {'results': shape(rows[:limit], names, spec), 'next_cursor': next_cursor}
+
+
+def one(request, queryset, spec, default):
+    names = selected_fields(request, spec, default)
+    rows = shape(select(queryset, names, spec)[:1], names, spec)
+    if not rows:
+        raise ApiError("Not found", status=404)
+    return rows[0]
+
+
+def json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError("Body must be JSON")
+    if not isinstance(data, dict):
+        raise ApiError("Body must be a JSON object")
+    return data
+
+
+def clean_rating(value):
+    if value in (None, ''):
+        return None
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        raise ApiError("rating must be a number from 0 to 5")
+    if not 0 <= rating <= 5:
+        raise ApiError("rating must be a number from 0 to 5")
+    return rating
+
+
+def clean_positive(data, name):
+    value = data.get(name)
+    if value in (None, ''):
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ApiError(f"{name} must be a positive whole number")
+    return value
+
+
+# Recipes
+
+def recipe_for_key(recipe_id):
+    """
+    Recipe for a key from the URL. Spoonacular ids are fetched (and cached) on
+    first use like the recipe page, "created_<id>" mirrors must already exist
+    and be shared, anything else is a 404.
+    """
+    recipe_id = str(recipe_id)
+    if recipe_id.startswith('created_'):
+        recipe_obj = shown_recipes().filter(recipe_id=recipe_id).first()
+    elif recipe_id.isdigit():
+        recipe_obj, _ = get_or_fetch_recipe(recipe_id)
+    else:
+        recipe_obj = None
+    if recipe_obj is None:
+        raise ApiError("Not found", status=404)
+    return recipe_obj
+
+
+@api_view()
+def recipes(request):
+    queryset = Recipe.objects.filter(is_cached=True).exclude(recipe_id__startswith='created_')
+    if request.GET.get('q'):
+        queryset = queryset.filter(title__icontains=request.GET['q'])
+    # Most viewed first with ?order=views, newest otherwise
+    order = 'view_count' if request.GET.get('order') == 'views' else 'cached_at'
+    return api_response(paginate(request, queryset, RECIPE_FIELDS, RECIPE_LIST_DEFAULT, order=order))
+
+
+@api_view()
+def popular_recipes(request):
+    """Most viewed recipes (API and created) over the last ?days (default 7)"""
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), settings.ANALYTICS_RETENTION_DAYS)
+    except ValueError:
+        raise ApiError("days must be a number")
+    ranking = analytics.popular(days=days, limit=page_size(request))
+    titles = dict(shown_recipes().filter(recipe_id__in=[key for key, _ in ranking]).values_list('recipe_id', 'title'))
+    created_ids = [int(key[len('created_'):]) for key, _ in ranking if key.startswith('created_') and key[len('created_'):].isdigit()]
+    titles.update(
+        (f"created_{pk}", title)
+        for pk, title in CreatedRecipe.objects.filter(id__in=created_ids, is_shared=True).values_list('id', 'title')
+    )
+    return api_response({'results': [
+        {'recipe_id': key, 'title': titles[key], 'views': views}
+        for key, views in ranking if key in titles
+    ]})
+
+
+@api_view()
+def recipe(request, recipe_id):
+    recipe_obj = recipe_for_key(recipe_id)
+    return api_response(one(request, Recipe.objects.filter(pk=recipe_obj.pk), RECIPE_FIELDS, tuple(RECIPE_FIELDS)))
+
+
+@api_view(methods=('GET', 'POST'))
+def recipe_comments(request, recipe_id):
+    if request.method == 'POST':
+        return create_comment(request, recipe_id)
+    # Same keys as recipe_for_key, but nothing is fetched just to list no comments
+    recipe_id = str(recipe_id)
+    if not recipe_id.isdigit() and not shown_recipes().filter(recipe_id=recipe_id).exists():
+        raise ApiError("Not found", status=404)
+    queryset = RecipeComment.objects.filter(recipe__recipe_id=recipe_id)
+    return api_response(paginate(request, queryset, COMMENT_FIELDS, COMMENT_DEFAULT))
+
+
+@ratelimit('10/m')
+def create_comment(request, recipe_id):
+    data = json_body(request)
+    text = (data.get('comment') or '').strip()
+    if not text:
+        raise ApiError("comment is required")
+    rating = clean_rating(data.get('rating'))
+    recipe_obj = recipe_for_key(recipe_id)
+    comment = RecipeComment.objects.create(recipe=recipe_obj, user=request.user, comment=text, rating=rating)
+    return api_response(one(request, RecipeComment.objects.filter(pk=comment.pk), COMMENT_FIELDS, COMMENT_DEFAULT), status=201)
+
+
+# Feed
+
+@api_view()
+def feed(request):
+    queryset = UserRecipe.objects.filter(is_shared=True)
+    return api_response(paginate(request, queryset, FEED_FIELDS, FEED_DEFAULT, order='shared_at'))
+
+
+# Library (the signed in user's saved and shared recipes)
+
+@api_view(methods=('GET', 'POST'), login=True)
+def library(request):
+    if request.method == 'POST':
+        return save_to_library(request)
+    queryset = UserRecipe.objects.filter(user=request.user)
+    if request.GET.get('shared') in ('0', '1'):
+        queryset = queryset.filter(is_shared=request.GET['shared'] == '1')
+    return api_response(paginate(request, queryset, LIBRARY_FIELDS, LIBRARY_DEFAULT))
+
+
+@ratelimit('30/m')
+def save_to_library(request):
+    data = json_body(request)
+    if not str(data.get('recipe_id') or '').isdigit():
+        raise ApiError("recipe_id must be a Spoonacular recipe id")
+    recipe_obj, _ = get_or_fetch_recipe(data['recipe_id'])
+    user_recipe, created = UserRecipe.objects.get_or_create(user=request.user, recipe=recipe_obj)
+    update_library_item(user_recipe, data)
+    queryset = UserRecipe.objects.filter(pk=user_recipe.pk)
+    return api_response(one(request, queryset, LIBRARY_FIELDS, LIBRARY_DEFAULT), status=201 if created else 200)
+
+
+def update_library_item(user_recipe, data):
+    """Apply rating, message and is_shared from a request body"""
+    if 'rating' in data:
+        user_recipe.rating = clean_rating(data['rating'])
+    if 'message' in data:
+        user_recipe.message = data['message'] or ''
+    if 'is_shared' in data:
+        if data['is_shared'] and not user_recipe.is_shared:
+            user_recipe.shared_at = timezone.now()
+        user_recipe.is_shared = bool(data['is_shared'])
+    user_recipe.save()
+
+
+@api_view(methods=('GET', 'PATCH', 'DELETE'), login=True)
+def library_item(request, recipe_id):
+    queryset = UserRecipe.objects.filter(user=request.user, recipe__recipe_id=str(recipe_id))
+    if request.method == 'GET':
+        return api_response(one(request, queryset, LIBRARY_FIELDS, LIBRARY_DEFAULT))
+    user_recipe = queryset.first()
+    if user_recipe is None:
+        raise ApiError("Not found", status=404)
+    if request.method == 'DELETE':
+        user_recipe.delete()
+        if user_recipe.is_shared:
+            prerender.schedule(recipe_id)
+        return HttpResponse(status=204)
+    update_library_item(user_recipe, json_body(request))
+    return api_response(one(request, queryset, LIBRARY_FIELDS, LIBRARY_DEFAULT))
+
+
+# Created recipes: shared ones for everyone, ?mine=1 for your own
+
+@api_view(methods=('GET', 'POST'))
+def created_recipes(request):
+    if request.method == 'POST':
+        return create_created_recipe(request)
+    if request.GET.get('mine') == '1':
+        if not request.user.is_authenticated:
+            return api_response({'error': 'Authentication required'}, status=401)
+        queryset = CreatedRecipe.objects.filter(creator=request.user)
+    else:
+        queryset = CreatedRecipe.objects.filter(is_shared=True)
+    return api_response(paginate(request, queryset, CREATED_FIELDS, CREATED_LIST_DEFAULT))
+
+
+def apply_created_fields(recipe, data):
+    for name in CREATED_WRITABLE:
+        if name not in data:
+            continue
+        if name in ('servings', 'ready_in_minutes'):
+            setattr(recipe, name, clean_positive(data, name))
+        else:
+            setattr(recipe, name, str(data[name] or '').strip())
+    missing = [name for name in ('title', 'ingredients', 'instructions') if not getattr(recipe, name)]
+    if missing:
+        raise ApiError(f"Required: {', '.join(missing)}")
+
+
+@ratelimit('10/m')
+def create_created_recipe(request):
+    recipe = CreatedRecipe(creator=request.user)
+    apply_created_fields(recipe, json_body(request))
+    recipe.save()
+    queryset = CreatedRecipe.objects.filter(pk=recipe.pk)
+    return api_response(one(request, queryset, CREATED_FIELDS, tuple(CREATED_FIELDS)), status=201)
+
+
+@api_view(methods=('GET', 'PATCH', 'DELETE'))
+def created_recipe(request, recipe_id):
+    if request.method == 'GET':
+        visible = Q(is_shared=True)
+        if request.user.is_authenticated:
+            visible |= Q(creator=request.user)
+        queryset = CreatedRecipe.objects.filter(visible, pk=recipe_id)
+        return api_response(one(request, queryset, CREATED_FIELDS, tuple(CREATED_FIELDS)))
+
+    recipe = CreatedRecipe.objects.filter(pk=recipe_id, creator=request.user).first()
+    if recipe is None:
+        raise ApiError("Not found", status=404)
+    if request.method == 'DELETE':
+        recipe.delete()
+        return HttpResponse(status=204)
+    apply_created_fields(recipe, json_body(request))
+    recipe.save()
+    return api_response(one(request, CreatedRecipe.objects.filter(pk=recipe.pk), CREATED_FIELDS, tuple(CREATED_FIELDS)))
+
+
+# Shopping list for recipes from your library and created recipes:
+# ?recipes=716429:4,created_12 (":servings" scales a recipe, optional)
+
+def parse_selection(value):
+    """[(recipe key, servings or None)] from "716429:4,created_12" """
+    selection = []
+    for part in (value or '').split(','):
+        key, _, servings = part.strip().partition(':')
+        if not key:
+            continue
+        number = key[len('created_'):] if key.startswith('created_') else key
+        if not number.isdigit() or (servings and not servings.isdigit()):
+            raise ApiError(f"Invalid recipe selection: {part.strip()}")
+        selection.append((key, int(servings) if servings and int(servings) > 0 else None))
+    if not selection:
+        raise ApiError("recipes is required, e.g. ?recipes=716429:4,created_12")
+    if len(selection) > MAX_SHOPPING_RECIPES:
+        raise ApiError(f"At most {MAX_SHOPPING_RECIPES} recipes per list")
+    return selection
+
+
+@api_view(login=True)
+def shopping_list(request):
+    selection = parse_selection(request.GET.get('recipes'))
+    keys = {key for key, _ in selection}
+
+    # Saved recipes and your own or shared created recipes only
+    allowed = set(
+        UserRecipe.objects.filter(user=request.user, recipe__recipe_id__in=keys)
+        .exclude(recipe__recipe_id__startswith='created_')
+        .values_list('recipe__recipe_id', flat=True)
+    )
+    created_ids = [int(key[len('created_'):]) for key in keys if key.startswith('created_')]
+    allowed.update(
+        f"created_{pk}" for pk in CreatedRecipe.objects.filter(
+            Q(creator=request.user) | Q(is_shared=True), id__in=created_ids
+        ).values_list('id', flat=True)
+    )
+
+    result = shopping.shopping_list([(key, servings) for key, servings in selection if key in allowed])
+    result['missing'] = sorted(set(result['missing']) | (keys - allowed))
+    return api_response(result)
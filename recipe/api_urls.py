@@ -0,0 +1,17 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('recipes/', api.recipes, name='recipes'),
+    path('recipes/popular/', api.popular_recipes, name='popular_recipes'),
+    path('recipes/<str:recipe_id>/', api.recipe, name='recipe'),
+    path('recipes/<str:recipe_id>/comments/', api.recipe_comments, name='recipe_comments'),
+    path('feed/', api.feed, name='feed'),
+    path('library/', api.library, name='library'),
+    path('library/<str:recipe_id>/', api.library_item, name='library_item'),
+    path('created/', api.created_recipes, name='created_recipes'),
+    path('created/<int:recipe_id>/', api.created_recipe, name='created_recipe'),
+    path('shopping-list/', api.shopping_list, name='shopping_list'),
+]
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class RecipeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe'
+
+    def ready(self):
+        # Live feed broadcasts and prerendered pages follow shares and comments
+        from . import signals  # noqa: F401
+        # Registers the rate limiter's cache check
+        from . import ratelimit  # noqa: F401
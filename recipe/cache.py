@@ -0,0 +1,59 @@
+from . import prerender
+from .images import spoonacular_image_url
+from .models import Recipe, RecipeContent
+from .normalize import INGREDIENT_SCHEMA_VERSION, normalize_ingredients
+
+
+# Map Spoonacular recipe information onto Recipe fields
+def recipe_fields_from_api(recipe_id, recipe_data):
+    # Fix image URL
+    recipe_data['image'] = spoonacular_image_url(recipe_id)
+    return {
+        'title': recipe_data.get('title', f'Recipe {recipe_id}'),
+        'image_url': recipe_data.get('image'),
+        'ready_in_minutes': recipe_data.get('readyInMinutes'),
+        'servings': recipe_data.get('servings'),
+        'source_url': recipe_data.get('sourceUrl'),
+        'is_cached': True
+    }
+
+
+# Map Spoonacular recipe information onto RecipeContent fields
+def content_fields_from_api(recipe_data):
+    return {
+        'summary': recipe_data.get('summary', ''),
+        'instructions': recipe_data.get('instructions', ''),
+        'ingredients': normalize_ingredients(recipe_data.get('extendedIngredients')),
+        'schema_version': INGREDIENT_SCHEMA_VERSION,
+    }
+
+
+def store_recipe_data(recipes_data):
+    """
+    Insert or refresh cached recipes from a list of Spoonacular recipe
+    information dicts (e.g. an informationBulk response), in three queries.
+    Returns the number of recipes stored.
+    """
+    fetched = {str(data['id']): data for data in recipes_data if 'id' in data}
+    if not fetched:
+        return 0
+
+    Recipe.objects.bulk_create(
+        [Recipe(recipe_id=recipe_id, **recipe_fields_from_api(recipe_id, data)) for recipe_id, data in fetched.items()],
+        update_conflicts=True,
+        unique_fields=['recipe_id'],
+        update_fields=['title', 'image_url', 'ready_in_minutes', 'servings', 'source_url', 'is_cached', 'cached_at']
+    )
+
+    # Content rows need the recipes' primary keys, so look them up once
+    recipe_pks = dict(Recipe.objects.filter(recipe_id__in=fetched).values_list('recipe_id', 'id'))
+    RecipeContent.objects.bulk_create(
+        [RecipeContent(recipe_id=recipe_pks[recipe_id], **content_fields_from_api(data)) for recipe_id, data in fetched.items()],
+        update_conflicts=True,
+        unique_fields=['recipe'],
+        update_fields=['summary', 'instructions', 'ingredients', 'schema_version']
+    )
+
+    # Bulk upserts send no post_save, so republish refreshed public pages here
+    prerender.schedule(*[recipe_id for recipe_id in fetched if prerender.is_published(recipe_id)])
+    return len(fetched)
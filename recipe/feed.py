@@ -0,0 +1,109 @@
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from .images import DEFAULT_SIZES, image_sources, reverse_format
+from .models import RecipeComment, RecipeContent
+
+# Number of comments shown under each feed card
+FEED_COMMENTS_PER_CARD = 3
+
+
+class CommentBlock:
+    """
+    A recipe's comment section as shown under a feed card: links, the most
+    recent comments and the total count.
+    """
+
+    __slots__ = (
+        'recipe', 'is_created', 'detail_url', 'comment_url', 'comments_url',
+        'recent_comments', 'comment_count',
+    )
+
+    def __init__(self, recipe, recent_comments=(), comment_count=0):
+        self.recipe = recipe
+        self.is_created = recipe.recipe_id.startswith('created_')
+        if self.is_created:
+            self.detail_url = reverse_format('public_created_recipe_detail').format(recipe.recipe_id[len('created_'):])
+        else:
+            self.detail_url = reverse_format('recipe_detail').format(recipe.recipe_id)
+        self.comment_url = reverse_format('make_feed_comment').format(recipe.recipe_id)
+        self.comments_url = reverse_format('recipe_comments').format(recipe.recipe_id)
+        self.recent_comments = list(recent_comments)
+        self.comment_count = comment_count
+
+
+class FeedCard(CommentBlock):
+    """
+    Everything the feed card template needs, worked out once in Python so the
+    template only prints values (no slicing, URL reversing or star loops).
+    """
+
+    __slots__ = ('shared_recipe', 'image', 'stars', 'summary')
+
+    def __init__(self, shared_recipe, recent_comments=(), comment_count=0, summary=''):
+        super().__init__(shared_recipe.recipe, recent_comments, comment_count)
+        recipe = shared_recipe.recipe
+        self.shared_recipe = shared_recipe
+
+        if self.is_created:
+            self.image = image_sources(url=recipe.image_url) if recipe.image_url else None
+        else:
+            self.image = image_sources(recipe_id=recipe.recipe_id)
+        if self.image:
+            self.image['sizes'] = DEFAULT_SIZES
+
+        self.stars = '⭐' * int(shared_recipe.rating or 0)
+        self.summary = summary
+
+
+def build_comment_block(recipe):
+    """CommentBlock for one recipe, e.g. to re-render it after a new comment"""
+    comments = RecipeComment.objects.filter(recipe=recipe)
+    return CommentBlock(
+        recipe,
+        recent_comments=comments.select_related('user').order_by('-created_at', '-id')[:FEED_COMMENTS_PER_CARD],
+        comment_count=comments.count(),
+    )
+
+
+def build_feed_cards(shared_recipes):
+    """
+    Turn shared UserRecipes (with user and recipe selected) into FeedCards.
+    Recent comments, comment counts and created recipe descriptions for every
+    card are fetched in three queries in total rather than per card.
+    """
+    shared_recipes = list(shared_recipes)
+    recipe_ids = {shared_recipe.recipe_id for shared_recipe in shared_recipes}
+
+    counts = dict(
+        RecipeComment.objects.filter(recipe_id__in=recipe_ids)
+        .values_list('recipe_id')
+        .annotate(total=Count('id'))
+    )
+
+    # Only created recipes show a description, and only their summaries are loaded
+    summaries = dict(
+        RecipeContent.objects.filter(
+            recipe_id__in=recipe_ids, recipe__recipe_id__startswith='created_'
+        ).exclude(summary='').values_list('recipe_id', 'summary')
+    )
+
+    recent = {}
+    comments = RecipeComment.objects.filter(recipe_id__in=recipe_ids).select_related('user').annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('recipe_id')],
+            order_by=[F('created_at').desc(), F('id').desc()],
+        )
+    ).filter(position__lte=FEED_COMMENTS_PER_CARD).order_by('recipe_id', 'position')
+    for comment in comments:
+        recent.setdefault(comment.recipe_id, []).append(comment)
+
+    return [
+        FeedCard(
+            shared_recipe,
+            recent_comments=recent.get(shared_recipe.recipe_id, ()),
+            comment_count=counts.get(shared_recipe.recipe_id, 0),
+            summary=summaries.get(shared_recipe.recipe_id) or '',
+        )
+        for shared_recipe in shared_recipes
+    ]
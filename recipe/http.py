@@ -0,0 +1,11 @@
+def is_fragment_request(request):
+    """True for fetch/XHR and htmx requests, which get partial HTML instead of a redirect"""
+    return (
+        request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        or request.headers.get('HX-Request') == 'true'
+    )
+
+
+def is_api_request(request):
+    """True for requests routed to the JSON API (recipe/api_urls.py)"""
+    return bool(request.resolver_match and request.resolver_match.app_name == 'api')
@@ -0,0 +1,76 @@
+import re
+from functools import lru_cache
+
+from django.urls import reverse
+
+
+# Sizes Spoonacular renders natively, keyed by width. Browsers pick one from
+# the srcset and load it straight from Spoonacular's CDN, so API images never
+# pass through our workers.
+SPOONACULAR_SIZES = {
+    240: '240x150',
+    312: '312x231',
+    480: '480x360',
+    636: '636x393',
+}
+
+# Widths offered in srcsets for Cloudinary images (resized on their CDN)
+CLOUDINARY_WIDTHS = (240, 480, 720, 960)
+
+# Default layout hint: one card per row on phones, a fixed column elsewhere
+DEFAULT_SIZES = '(max-width: 576px) 100vw, 480px'
+
+CLOUDINARY_UPLOAD_RE = re.compile(r'^(https?://res\.cloudinary\.com/[^/]+/image/upload/)(.+)$')
+
+
+# Stand-in id used to reverse a route once and reuse it as a format string
+_PLACEHOLDER_ID = 987654321
+
+
+@lru_cache(maxsize=None)
+def reverse_format(name, *args):
+    """
+    Return a str.format pattern for a URL whose first argument is an id, e.g.
+    reverse_format('recipe_detail').format(42). Any further arguments are fixed.
+    Much cheaper than calling reverse() for every card on a page.
+    """
+    return reverse(name, args=[_PLACEHOLDER_ID, *args]).replace(str(_PLACEHOLDER_ID), '{}')
+
+
+def spoonacular_image_url(recipe_id, size='312x231'):
+    """Original image URL on Spoonacular's CDN"""
+    return f"https://spoonacular.com/recipeImages/{recipe_id}-{size}.jpg"
+
+
+def cloudinary_variant(url, width):
+    """
+    Return a resized variant of a Cloudinary delivery URL, or the URL
+    unchanged if it is not a Cloudinary upload.
+    """
+    match = CLOUDINARY_UPLOAD_RE.match(url or '')
+    if not match:
+        return url
+    prefix, rest = match.groups()
+    return f"{prefix}w_{width},c_limit,f_auto,q_auto/{rest}"
+
+
+def image_sources(url=None, recipe_id=None):
+    """
+    Build src/srcset for an image.
+    API recipes (recipe_id given) use Spoonacular's native sizes, Cloudinary
+    URLs get transformation variants, anything else is passed through.
+    Returns a dict: {'src': ..., 'srcset': ...} (srcset may be empty).
+    """
+    if recipe_id and not str(recipe_id).startswith('created_'):
+        srcset = ', '.join(
+            f"{spoonacular_image_url(recipe_id, size)} {width}w"
+            for width, size in SPOONACULAR_SIZES.items()
+        )
+        return {'src': spoonacular_image_url(recipe_id), 'srcset': srcset}
+
+    if url and CLOUDINARY_UPLOAD_RE.match(url):
+        srcset = ', '.join(f"{cloudinary_variant(url, width)} {width}w" for width in CLOUDINARY_WIDTHS)
+        return {'src': cloudinary_variant(url, 480), 'srcset': srcset}
+
+    return {'src': url, 'srcset': ''}
+
@@ -0,0 +1,105 @@
+"""
+Live feed events (new shares and comments) for Server-Sent Events clients.
+
+Each process keeps a hub of connected clients, one asyncio queue per client,
+so an idle connection costs a queue and a suspended coroutine. Saves publish
+to the hub from whatever thread they run in.
+
+On Postgres, events also go through NOTIFY so clients connected to other
+workers hear them. One listener thread per process feeds them into the local
+hub. Other databases (e.g. SQLite in development) use the local hub only,
+which needs no broker for a single-process server.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'food_blog_live'
+
+# Events a slow client may fall behind by before it starts missing some
+QUEUE_SIZE = 100
+
+_subscribers = set()
+_lock = threading.Lock()
+_listener = None
+
+
+def _deliver(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+def publish_local(message):
+    """Hand a message to every client connected to this process"""
+    with _lock:
+        subscribers = list(_subscribers)
+    for loop, queue in subscribers:
+        loop.call_soon_threadsafe(_deliver, queue, message)
+
+
+def publish(event, data):
+    """Broadcast an event to all connected clients, in every process when possible"""
+    message = json.dumps({'event': event, 'data': data})
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, message])
+    else:
+        publish_local(message)
+
+
+def subscribe():
+    """Register the calling coroutine's client; returns its queue"""
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    with _lock:
+        _subscribers.add((asyncio.get_running_loop(), queue))
+    if connections['default'].vendor == 'postgresql':
+        _start_listener()
+    return queue
+
+
+def unsubscribe(queue):
+    with _lock:
+        _subscribers.difference_update({entry for entry in _subscribers if entry[1] is queue})
+
+
+def _start_listener():
+    global _listener
+    with _lock:
+        if _listener and _listener.is_alive():
+            return
+        _listener = threading.Thread(target=_listen, name='live-feed-listener', daemon=True)
+        _listener.start()
+
+
+def _listen():
+    """LISTEN on a dedicated connection and pass notifications to the local hub"""
+    import psycopg2
+
+    params = connections['default'].get_connection_params()
+    try:
+        conn = psycopg2.connect(**params)
+        conn.set_session(autocommit=True)
+        conn.cursor().execute(f"LISTEN {CHANNEL}")
+        while True:
+            if select.select([conn], [], [], 30) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                publish_local(conn.notifies.pop(0).payload)
+    except Exception:
+        # The next subscriber starts a new listener
+        logger.exception("Live feed listener stopped")
+
+
+def format_event(message):
+    """An SSE frame for a hub message"""
+    parsed = json.loads(message)
+    return f"event: {parsed['event']}\ndata: {json.dumps(parsed['data'])}\n\n"
@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.utils import timezone
+
+from recipe.feed import FEED_COMMENTS_PER_CARD, FeedCard
+from recipe.models import Recipe, RecipeComment, UserRecipe
+
+
+def sample_cards(count):
+    """In-memory feed cards (nothing is saved) mixing API and created recipes"""
+    author = User(id=1, username='benchmark')
+    now = timezone.now()
+    cards = []
+    for i in range(count):
+        recipe = Recipe(
+            id=i + 1,
+            recipe_id=f"created_{i}" if i % 3 == 0 else str(600000 + i),
+            title=f"Benchmark recipe {i}",
+            image_url="https://res.cloudinary.com/demo/image/upload/v1/sample.jpg",
+            servings=4,
+            ready_in_minutes=30,
+        )
+        shared = UserRecipe(user=author, recipe=recipe, is_shared=True, message="Try this!",
+                            rating=i % 6, shared_at=now)
+        comments = [
+            RecipeComment(id=j, recipe=recipe, user=author, comment="Looks great", created_at=now)
+            for j in range(3)
+        ]
+        summary = "A short description of the recipe " * 4 if recipe.recipe_id.startswith('created_') else ''
+        cards.append(FeedCard(shared, recent_comments=comments, comment_count=5, summary=summary))
+    return cards
+
+
+class Command(BaseCommand):
+    help = "Time rendering of the home feed template, reported per 100 cards"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--authenticated', action='store_true',
+                            help="Render as a logged-in user (includes comment forms)")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = User(id=1, username='benchmark') if options['authenticated'] else AnonymousUser()
+        template = get_template('home.html')
+
+        started = time.perf_counter()
+        cards = sample_cards(options['cards'])
+        build_time = time.perf_counter() - started
+
+        # First render compiles the templates (or loads them into the cached loader)
+        template.render({'feed_cards': cards, 'comments_per_card': FEED_COMMENTS_PER_CARD}, request)
+
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            template.render({'feed_cards': cards, 'comments_per_card': FEED_COMMENTS_PER_CARD}, request)
+            timings.append(time.perf_counter() - started)
+
+        scale = 100 / options['cards'] * 1000
+        timings.sort()
+        self.stdout.write(f"Building {options['cards']} cards: {build_time * scale:.2f} ms per 100 cards")
+        self.stdout.write(
+            f"Rendering: median {timings[len(timings) // 2] * scale:.2f} ms, "
+            f"best {timings[0] * scale:.2f} ms per 100 cards ({options['repeat']} runs)"
+        )
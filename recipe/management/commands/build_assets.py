@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import posixpath
+import re
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Third-party assets served from our own static files instead of CDNs.
+# Bootstrap and Bootstrap Icons are MIT licensed, so vendoring is allowed.
+# Integrity hashes match the ones base.html used for the CDN links.
+VENDOR_ASSETS = [
+    (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.0.1/dist/css/bootstrap.min.css',
+        'vendor/bootstrap/bootstrap.min.css',
+        'sha384-+0n0xVW2eSR5OomGNYDnhzAbDsOXxcvSN1TPprVMTNDbiYZCxYbOOl7+AMvyTG2x',
+    ),
+    (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.0.1/dist/js/bootstrap.bundle.min.js',
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+        'sha384-gtEjrD/SeCtmISkJkNUaaKMoLD0//ElJ19smozuHV6z3Iehds+3Ulb9Bn9Plx0x4',
+    ),
+    (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.7.2/font/bootstrap-icons.css',
+        'vendor/bootstrap-icons/bootstrap-icons.css',
+        None,
+    ),
+    (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.7.2/font/fonts/bootstrap-icons.woff2',
+        'vendor/bootstrap-icons/fonts/bootstrap-icons.woff2',
+        None,
+    ),
+    (
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.7.2/font/fonts/bootstrap-icons.woff',
+        'vendor/bootstrap-icons/fonts/bootstrap-icons.woff',
+        None,
+    ),
+]
+
+# Output bundle -> source files, relative to the static directory.
+# Fingerprinting and gzip/Brotli precompression happen in collectstatic
+# (CompressedManifestStaticFilesStorage).
+BUNDLES = {
+    # Same cascade order base.html has always used: our CSS, then Bootstrap
+    'dist/site.min.css': [
+        'CSS/style.css',
+        'vendor/bootstrap/bootstrap.min.css',
+        'vendor/bootstrap-icons/bootstrap-icons.css',
+    ],
+    'dist/site.min.js': [
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+    ],
+}
+
+SOURCE_MAP_RE = re.compile(rb'\n?(?://|/\*)# sourceMappingURL=[^\n]*')
+
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+# /*! ... */ comments carry license notices, which must be kept as they are
+LICENSE_COMMENT_RE = re.compile(r'(/\*!.*?\*/)', re.S)
+
+
+def minify_css(source):
+    # Split on license comments, which pass through untouched; odd parts are comments
+    parts = LICENSE_COMMENT_RE.split(source)
+    return ''.join(part if index % 2 else _minify_css_rules(part) for index, part in enumerate(parts)).strip()
+
+
+def _minify_css_rules(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    # Spaces around ':' are left alone, they are significant in selectors
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    return source.replace(';}', '}')
+
+
+def minify_js(source):
+    # Conservative: only drop indentation, blank lines and whole-line //
+    # comments. Block comments stay, a regex can't tell them from "/*"
+    # inside strings or regex literals.
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def rebase_css_urls(source, source_name, bundle_name):
+    """Rewrite relative url()s so they still resolve from the bundle's location"""
+    source_dir = posixpath.dirname(source_name)
+    bundle_dir = posixpath.dirname(bundle_name)
+
+    def rebase(match):
+        url = match.group(2)
+        if re.match(r'^([a-z]+:|/|#)', url):
+            return match.group(0)
+        path = url.split('?', 1)[0].split('#', 1)[0]
+        target = posixpath.normpath(posixpath.join(source_dir, path))
+        return f'url("{posixpath.relpath(target, bundle_dir)}")'
+
+    return CSS_URL_RE.sub(rebase, source)
+
+
+def check_integrity(content, integrity):
+    algorithm, expected = integrity.split('-', 1)
+    digest = base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+    return digest == expected
+
+
+class Command(BaseCommand):
+    help = "Vendor CDN assets and build minified CSS/JS bundles into static/dist"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendor', action='store_true',
+                            help="Download vendored third-party assets that are missing")
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+
+        if options['vendor']:
+            self.vendor(static_dir)
+
+        for bundle_name, sources in BUNDLES.items():
+            parts = []
+            for source_name in sources:
+                path = static_dir / source_name
+                if not path.exists():
+                    raise CommandError(f"Missing {source_name}, run with --vendor first")
+                source = path.read_text(encoding='utf-8')
+                if bundle_name.endswith('.css'):
+                    source = rebase_css_urls(source, source_name, bundle_name)
+                # Already minified vendor files go in as they are, license banners included
+                if source_name.endswith(('.min.css', '.min.js')):
+                    parts.append(source.strip())
+                elif bundle_name.endswith('.css'):
+                    parts.append(minify_css(source))
+                else:
+                    parts.append(minify_js(source))
+
+            output = static_dir / bundle_name
+            output.parent.mkdir(parents=True, exist_ok=True)
+            # Separate JS sources with ';' so concatenation can't merge statements
+            output.write_text(('\n' if bundle_name.endswith('.css') else ';\n').join(parts), encoding='utf-8')
+
+            original = sum((static_dir / name).stat().st_size for name in sources)
+            self.stdout.write(f"{bundle_name}: {original} -> {output.stat().st_size} bytes")
+
+        self.stdout.write("Run collectstatic to fingerprint and precompress the bundles.")
+
+    def vendor(self, static_dir):
+        for url, name, integrity in VENDOR_ASSETS:
+            path = static_dir / name
+            if path.exists():
+                continue
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            if integrity and not check_integrity(response.content, integrity):
+                raise CommandError(f"Integrity check failed for {url}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # We don't ship the source maps, and collectstatic fails on missing references
+            path.write_bytes(SOURCE_MAP_RE.sub(b'', response.content))
+            self.stdout.write(f"Vendored {name}")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipe import similar
+from recipe.models import RecipeNeighbour
+
+
+class Command(BaseCommand):
+    help = "Precompute the \"similar recipes\" shown on recipe pages (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=similar.NEIGHBOURS_PER_RECIPE,
+                            help="Neighbours stored per recipe")
+        parser.add_argument('--incremental', action='store_true',
+                            help="Only index recipes added since the last run")
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            count = similar.update(options['k'])
+            self.stdout.write(f"Indexed {count} new recipes")
+        else:
+            count = similar.rebuild(options['k'])
+            self.stdout.write(f"Indexed {count} recipes")
+        self.stdout.write(f"{RecipeNeighbour.objects.count()} neighbour links stored")
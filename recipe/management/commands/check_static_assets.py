@@ -0,0 +1,69 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+ASSET_RE = re.compile(r'<(?:link|script|img)\b[^>]*?\b(?:href|src)="([^"]+)"', re.I)
+
+# A year, the minimum we accept for fingerprinted files
+MIN_MAX_AGE = 60 * 60 * 24 * 365
+
+# WhiteNoise skips compressing files where it doesn't pay off, which is
+# expected for tiny files
+MIN_COMPRESSIBLE_SIZE = 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch a page the way a browser would and check that its static assets are "
+        "fingerprinted, compressed and served with long-lived immutable caching. "
+        "Also reports the total bytes transferred. Run after collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help="Page to measure (default: home page)")
+        parser.add_argument('--host', default='localhost', help="Host header to send (must be in ALLOWED_HOSTS)")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'], HTTP_ACCEPT_ENCODING='br, gzip')
+        page = client.get(options['path'])
+        if page.status_code != 200:
+            raise CommandError(f"{options['path']} returned {page.status_code}")
+
+        body = b''.join(page.streaming_content) if page.streaming else page.content
+        html = body.decode()
+        total = len(body)
+        self.stdout.write(f"{options['path']}: {total} bytes (HTML)")
+
+        problems = []
+        external = []
+        for url in dict.fromkeys(ASSET_RE.findall(html)):
+            if not url.startswith(settings.STATIC_URL):
+                if url.startswith(('http://', 'https://', '//')):
+                    external.append(url)
+                continue
+
+            response = client.get(url)
+            size = len(b''.join(response.streaming_content)) if response.streaming else len(response.content)
+            total += size
+            cache_control = response.get('Cache-Control', '')
+            encoding = response.get('Content-Encoding', 'identity')
+            self.stdout.write(f"  {url}: {size} bytes, {encoding}, {cache_control or 'no Cache-Control'}")
+
+            if response.status_code != 200:
+                problems.append(f"{url} returned {response.status_code}")
+                continue
+            max_age = re.search(r'max-age=(\d+)', cache_control)
+            if 'immutable' not in cache_control or not max_age or int(max_age.group(1)) < MIN_MAX_AGE:
+                problems.append(f"{url} is not cached as immutable for at least a year")
+            if encoding == 'identity' and url.endswith(('.css', '.js')) and size > MIN_COMPRESSIBLE_SIZE:
+                problems.append(f"{url} is served uncompressed")
+
+        for url in external:
+            self.stdout.write(f"  {url}: external, not measured")
+
+        self.stdout.write(f"Total transferred (same origin): {total} bytes")
+        if problems:
+            raise CommandError("\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("All static assets are fingerprinted, compressed and immutable."))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import CreatedRecipe
+from recipe import prerender
+from recipe.models import UserRecipe
+
+
+class Command(BaseCommand):
+    help = "Prerender every public recipe page, drop pages that are no longer public and rewrite the sitemap"
+
+    def handle(self, *args, **options):
+        if not settings.PRERENDER_PAGES:
+            self.stdout.write("Prerendering is off (PRERENDER_PAGES), nothing to do")
+            return
+
+        keys = {f"created_{pk}" for pk in CreatedRecipe.objects.filter(is_shared=True).values_list('id', flat=True)}
+        keys.update(
+            UserRecipe.objects.filter(is_shared=True, recipe__is_cached=True)
+            .exclude(recipe__recipe_id__startswith='created_')
+            .values_list('recipe__recipe_id', flat=True)
+        )
+        # Stored pages whose recipe is gone get removed by publish()
+        keys.update(key for key, _ in prerender.published_pages())
+
+        published = sum(prerender.publish(key) for key in sorted(keys))
+        urls = prerender.write_sitemap()
+        self.stdout.write(f"Published {published} pages, sitemap lists {urls} URLs")
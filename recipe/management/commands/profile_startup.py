@@ -0,0 +1,57 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Run in a fresh interpreter so the numbers match a newly started worker
+CHILD_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import food_blog.wsgi
+elapsed = time.perf_counter() - started
+from food_blog.profiling import memory_usage
+print(json.dumps({'seconds': elapsed, 'memory': memory_usage()}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile what a gunicorn worker pays at startup: import time of the WSGI "
+        "app broken down by top-level package, and resident memory once loaded"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Number of packages to list")
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+            return
+
+        # Self time of every module, grouped by top-level package
+        per_package = defaultdict(int)
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_RE.match(line)
+            if match:
+                per_package[match.group(4).split('.')[0]] += int(match.group(1))
+
+        summary = json.loads(result.stdout.strip().splitlines()[-1])
+        memory = summary['memory']
+
+        self.stdout.write(f"Loading food_blog.wsgi took {summary['seconds'] * 1000:.0f} ms")
+        self.stdout.write(
+            f"Resident memory after load: {memory['rss'] / 1024:.1f} MiB"
+            + (f" (private {memory['private'] / 1024:.1f} MiB)" if memory['private'] is not None else "")
+        )
+        self.stdout.write("\nSlowest packages to import (self time):")
+        for package, micros in sorted(per_package.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {package:<30} {micros / 1000:8.1f} ms")
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipe import analytics
+
+
+class Command(BaseCommand):
+    help = "Delete old hourly recipe view rollups (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ANALYTICS_RETENTION_DAYS,
+                            help="Keep rollups for this many days")
+
+    def handle(self, *args, **options):
+        deleted = analytics.prune(options['days'])
+        self.stdout.write(f"Deleted {deleted} hourly rollups older than {options['days']} days")
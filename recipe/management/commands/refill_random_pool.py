@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipe import random_pool
+from recipe.models import RandomPoolEntry
+from recipe.quota import QuotaExceeded
+
+
+class Command(BaseCommand):
+    help = "Top up the pool of prefetched random recipes (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=settings.RANDOM_POOL_SIZE)
+        parser.add_argument('--rotate', type=int, default=0,
+                            help="Replace this many of the oldest entries with new recipes")
+
+    def handle(self, *args, **options):
+        if options['rotate']:
+            random_pool.rotate(options['rotate'])
+        try:
+            added = random_pool.refill(options['size'])
+        except QuotaExceeded as error:
+            self.stdout.write(f"Stopped: {error}")
+            added = 0
+        self.stdout.write(f"Added {added} recipes, pool now holds {RandomPoolEntry.objects.count()}")
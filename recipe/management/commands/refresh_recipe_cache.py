@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, F, Min, OuterRef, Q
+from django.utils import timezone
+
+from recipe import spoonacular
+from recipe.cache import store_recipe_data
+from recipe.models import QueuedRecipeFetch, Recipe, RecipeComment, RecipeNeighbour, UserRecipe
+from recipe.quota import QuotaExceeded
+
+# Age buckets for the report, in days
+AGE_BUCKETS = (1, 7, 30, 90)
+
+# Queued fetches are dropped after this many tries (e.g. the id doesn't exist)
+MAX_QUEUE_ATTEMPTS = 3
+
+
+def api_recipes():
+    """Recipes cached from Spoonacular, flagged with whether anything references them"""
+    return Recipe.objects.exclude(recipe_id__startswith='created_').annotate(
+        is_saved=Exists(UserRecipe.objects.filter(recipe=OuterRef('pk'))),
+        is_commented=Exists(RecipeComment.objects.filter(recipe=OuterRef('pk'))),
+    )
+
+
+class Command(BaseCommand):
+    help = ("Fetch recipes queued while the quota was used up, refresh stale recipes people use, "
+            "evict ones nobody does, and report on the recipe cache")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-days', type=int, default=7,
+                            help="Refresh saved or commented recipes cached longer ago than this")
+        parser.add_argument('--batch-size', type=int, default=spoonacular.BULK_BATCH_SIZE,
+                            help="Recipes per informationBulk call")
+        parser.add_argument('--max-points', type=float, default=50,
+                            help="Spoonacular quota points this run may spend")
+        parser.add_argument('--pause', type=float, default=1.0,
+                            help="Seconds to wait between API calls")
+        parser.add_argument('--evict', action='store_true',
+                            help="Delete recipes nobody saved or commented on (random pool recipes are kept)")
+        parser.add_argument('--evict-days', type=int, default=30,
+                            help="Only evict recipes cached longer ago than this")
+        parser.add_argument('--report', action='store_true',
+                            help="Only print the cache report")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['report']:
+            self.refresh(options)
+            if options['evict']:
+                self.evict(options)
+        self.report()
+
+    def refresh(self, options):
+        cutoff = timezone.now() - timedelta(days=options['stale_days'])
+        queued = list(QueuedRecipeFetch.objects.values_list('recipe_id', flat=True))
+        stale = list(
+            api_recipes().filter(Q(is_saved=True) | Q(is_commented=True), cached_at__lt=cutoff)
+            .exclude(recipe_id__in=queued).order_by('cached_at').values_list('recipe_id', flat=True)
+        )
+        self.stdout.write(f"{len(queued)} queued and {len(stale)} stale recipes in use")
+        # Recipes people asked for go first
+        stale = queued + stale
+
+        points = refreshed = 0
+        batch_size = max(1, options['batch_size'])
+        for start in range(0, len(stale), batch_size):
+            batch = stale[start:start + batch_size]
+            cost = spoonacular.bulk_points(len(batch))
+            if points + cost > options['max_points']:
+                self.stdout.write(f"Stopping at the {options['max_points']:g} point budget")
+                break
+            if options['dry_run']:
+                self.stdout.write(f"Would refresh {len(batch)} recipes ({cost:g} points)")
+            else:
+                if start:
+                    time.sleep(options['pause'])
+                try:
+                    refreshed += store_recipe_data(spoonacular.get_recipe_information_bulk(batch))
+                except QuotaExceeded as error:
+                    self.stdout.write(f"Stopping: {error}")
+                    break
+                self.settle_queue(batch)
+            points += cost
+
+        self.stdout.write(f"Refreshed {refreshed} recipes using about {points:g} points")
+
+    def settle_queue(self, batch):
+        """Clear queued fetches that are now cached, and give up on ones that keep failing"""
+        cached = Recipe.objects.filter(recipe_id__in=batch, is_cached=True).values('recipe_id')
+        QueuedRecipeFetch.objects.filter(recipe_id__in=cached).delete()
+        QueuedRecipeFetch.objects.filter(recipe_id__in=batch).update(attempts=F('attempts') + 1)
+        QueuedRecipeFetch.objects.filter(attempts__gte=MAX_QUEUE_ATTEMPTS).delete()
+
+    def evict(self, options):
+        cutoff = timezone.now() - timedelta(days=options['evict_days'])
+        # Random pool recipes count as used: refilling the pool costs quota
+        cold = api_recipes().filter(
+            is_saved=False, is_commented=False, cached_at__lt=cutoff, random_pool_entry__isnull=True
+        )
+        if options['dry_run']:
+            self.stdout.write(f"Would evict {cold.count()} unused recipes")
+            return
+        with transaction.atomic():
+            # Similar recipe links to or from them would fetch them again
+            cold_ids = cold.values('recipe_id')
+            RecipeNeighbour.objects.filter(Q(source__in=cold_ids) | Q(neighbour__in=cold_ids)).delete()
+            # Content rows go with them (on_delete=CASCADE)
+            deleted, by_model = Recipe.objects.filter(pk__in=cold.values('pk')).delete()
+        self.stdout.write(f"Evicted {by_model.get('recipe.Recipe', 0)} unused recipes")
+
+    def report(self):
+        now = timezone.now()
+        buckets = {
+            f"under_{days}d": Count('id', filter=Q(cached_at__gte=now - timedelta(days=days)))
+            for days in AGE_BUCKETS
+        }
+        stats = api_recipes().aggregate(
+            total=Count('id'),
+            cached=Count('id', filter=Q(is_cached=True)),
+            in_use=Count('id', filter=Q(is_saved=True) | Q(is_commented=True)),
+            oldest=Min('cached_at'),
+            **buckets
+        )
+        created = Recipe.objects.filter(recipe_id__startswith='created_').count()
+
+        self.stdout.write(
+            f"API recipes: {stats['total']} ({stats['cached']} fully cached, {stats['in_use']} in use), "
+            f"created recipe mirrors: {created}"
+        )
+        previous, previous_label = 0, "0d"
+        for days in AGE_BUCKETS:
+            count = stats[f"under_{days}d"]
+            self.stdout.write(f"  cached {previous_label}-{days}d ago: {count - previous}")
+            previous, previous_label = count, f"{days}d"
+        self.stdout.write(f"  cached over {AGE_BUCKETS[-1]}d ago: {stats['total'] - previous}")
+        if stats['oldest']:
+            self.stdout.write(f"  oldest entry: {(now - stats['oldest']).days} days")
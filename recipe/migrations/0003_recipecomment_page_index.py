@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-19 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0002_recipe_cached_at_recipe_image_url_recipe_ingredients_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipecomment',
+            index=models.Index(fields=['recipe', '-created_at', '-id'], name='comment_recipe_page_idx'),
+        ),
+    ]
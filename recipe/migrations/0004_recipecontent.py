@@ -0,0 +1,58 @@
+# Generated by Django 4.2.25 on 2026-10-19 18:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_content(apps, schema_editor):
+    Recipe = apps.get_model('recipe', 'Recipe')
+    RecipeContent = apps.get_model('recipe', 'RecipeContent')
+    rows = Recipe.objects.values_list('id', 'summary', 'instructions', 'ingredients').iterator(chunk_size=500)
+    batch = []
+    for recipe_id, summary, instructions, ingredients in rows:
+        batch.append(RecipeContent(recipe_id=recipe_id, summary=summary, instructions=instructions, ingredients=ingredients))
+        if len(batch) == 500:
+            RecipeContent.objects.bulk_create(batch)
+            batch = []
+    RecipeContent.objects.bulk_create(batch)
+
+
+def restore_content(apps, schema_editor):
+    Recipe = apps.get_model('recipe', 'Recipe')
+    RecipeContent = apps.get_model('recipe', 'RecipeContent')
+    for content in RecipeContent.objects.iterator(chunk_size=500):
+        Recipe.objects.filter(id=content.recipe_id).update(
+            summary=content.summary, instructions=content.instructions, ingredients=content.ingredients
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0003_recipecomment_page_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeContent',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='recipe.recipe')),
+                ('summary', models.TextField(blank=True, null=True)),
+                ('instructions', models.TextField(blank=True, null=True)),
+                ('ingredients', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(copy_content, restore_content),
+        migrations.RemoveField(
+            model_name='recipe',
+            name='ingredients',
+        ),
+        migrations.RemoveField(
+            model_name='recipe',
+            name='instructions',
+        ),
+        migrations.RemoveField(
+            model_name='recipe',
+            name='summary',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.25 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+# Frozen copy of recipe.normalize at schema version 1, so this migration keeps
+# working if that module changes later
+FIELDS = ('original', 'name', 'amount', 'unit', 'aisle')
+
+
+def normalize_ingredient(ingredient):
+    if isinstance(ingredient, str):
+        return {'original': ingredient}
+    normalized = {}
+    for field in FIELDS:
+        value = ingredient.get(field)
+        if value in (None, '', []):
+            continue
+        if field == 'amount':
+            value = round(float(value), 3)
+        normalized[field] = value
+    normalized.setdefault('original', ingredient.get('originalName') or ingredient.get('name', ''))
+    return normalized
+
+
+def normalize_existing(apps, schema_editor):
+    RecipeContent = apps.get_model('recipe', 'RecipeContent')
+    batch = []
+    for content in RecipeContent.objects.filter(schema_version__lt=1).only('recipe', 'ingredients').iterator(chunk_size=500):
+        content.ingredients = [normalize_ingredient(ingredient) for ingredient in content.ingredients or []]
+        content.schema_version = 1
+        batch.append(content)
+        if len(batch) == 500:
+            RecipeContent.objects.bulk_update(batch, ['ingredients', 'schema_version'])
+            batch = []
+    RecipeContent.objects.bulk_update(batch, ['ingredients', 'schema_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0004_recipecontent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipecontent',
+            name='schema_version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        # The dropped fields can't be restored, so reversing only removes the column
+        migrations.RunPython(normalize_existing, migrations.RunPython.noop),
+    ]
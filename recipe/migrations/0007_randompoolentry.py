@@ -0,0 +1,26 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_apiusage_queuedrecipefetch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RandomPoolEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('random_key', models.FloatField(db_index=True)),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='random_pool_entry', to='recipe.recipe')),
+            ],
+            options={
+                'ordering': ['random_key'],
+            },
+        ),
+    ]
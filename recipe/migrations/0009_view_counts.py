@@ -0,0 +1,35 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0008_recipeneighbour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='RecipeViewHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe_key', models.CharField(max_length=100)),
+                ('hour', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['hour', 'recipe_key'], name='view_hour_hour_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recipeviewhour',
+            constraint=models.UniqueConstraint(fields=('recipe_key', 'hour'), name='view_hour_recipe_hour_unique'),
+        ),
+    ]
@@ -6,11 +6,8 @@ class Recipe(models.Model):
     recipe_id = models.CharField(max_length=100, unique=True)  # ID from the external API
     title = models.CharField(max_length=255, blank=True)
     
-    # Cached recipe data from API
+    # Cached recipe data from API (summary, instructions and ingredients live in RecipeContent)
     image_url = models.URLField(max_length=500, blank=True, null=True)
-    summary = models.TextField(blank=True, null=True)
-    instructions = models.TextField(blank=True, null=True)
-    ingredients = models.JSONField(blank=True, null=True)  # Store as JSON array
     ready_in_minutes = models.IntegerField(blank=True, null=True)
     servings = models.IntegerField(blank=True, null=True)
     source_url = models.URLField(max_length=500, blank=True, null=True)
@@ -19,11 +16,27 @@ class Recipe(models.Model):
     cached_at = models.DateTimeField(auto_now=True)  # Last time data was fetched
     is_cached = models.BooleanField(default=False)  # Whether we have full data cached
     
+    # Page views, added in batches by recipe/analytics.py
+    view_count = models.PositiveIntegerField(default=0)
+    
 
     def __str__(self):
         return self.title or f"Recipe {self.recipe_id}"
 
 
+# Large cached recipe text, kept out of the recipe table so the feed and
+# library queries that join Recipe don't carry it
+class RecipeContent(models.Model):
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name="content")
+    summary = models.TextField(blank=True, null=True)
+    instructions = models.TextField(blank=True, null=True)
+    ingredients = models.JSONField(blank=True, null=True)  # Store as JSON array
+    schema_version = models.PositiveSmallIntegerField(default=0)  # Shape of ingredients, see recipe/normalize.py
+
+    def __str__(self):
+        return f"Content for {self.recipe_id}"
+
+
 class UserRecipe(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipes")
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="user_recipes")
@@ -62,8 +75,94 @@ class RecipeComment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Supports keyset pagination of a recipe's comments
+            models.Index(fields=['recipe', '-created_at', '-id'], name='comment_recipe_page_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.recipe}"
-    
 
+
+# Spoonacular usage for one (UTC) day, shared by every process
+class ApiUsage(models.Model):
+    day = models.DateField(unique=True)
+    points_used = models.FloatField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    throttled = models.PositiveIntegerField(default=0)  # Calls refused by the quota or rate limit
+    quota_left = models.FloatField(blank=True, null=True)  # As last reported by Spoonacular
+    tokens = models.FloatField(default=0)  # Rate limit token bucket
+    tokens_updated_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day}: {self.points_used:g} points, {self.requests} requests"
+
+
+# Recipes someone asked for while the API quota was exhausted, fetched later
+class QueuedRecipeFetch(models.Model):
+    recipe_id = models.CharField(max_length=100, unique=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['requested_at']
+
+    def __str__(self):
+        return f"Queued fetch of {self.recipe_id}"
+
+
+# Prefetched recipes "Get Random Recipe" picks from, see recipe/random_pool.py
+class RandomPoolEntry(models.Model):
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, related_name="random_pool_entry")
+    random_key = models.FloatField(db_index=True)  # Uniform in [0, 1), picked by range lookup
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['random_key']
+
+    def __str__(self):
+        return f"Random pool: {self.recipe}"
+
+
+# Precomputed "similar recipes", rebuilt by the build_recipe_neighbours command
+# (see recipe/similar.py). Keys are Recipe.recipe_id values, created recipes
+# use "created_<id>", so a detail page needs a single lookup on source.
+class RecipeNeighbour(models.Model):
+    source = models.CharField(max_length=100)
+    neighbour = models.CharField(max_length=100)
+    title = models.CharField(max_length=255, blank=True)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()  # 0 is the most similar
+
+    class Meta:
+        ordering = ['source', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'rank'], name='neighbour_source_rank_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} -> {self.neighbour} ({self.score:.2f})"
+
+
+# Recipe page views per hour, written in batches by recipe/analytics.py.
+# Keys are Recipe.recipe_id values, created recipes use "created_<id>".
+class RecipeViewHour(models.Model):
+    recipe_key = models.CharField(max_length=100)
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['recipe_key', 'hour'], name='view_hour_recipe_hour_unique'),
+        ]
+        indexes = [
+            # Supports popularity over a time range
+            models.Index(fields=['hour', 'recipe_key'], name='view_hour_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_key} at {self.hour:%Y-%m-%d %H:00}: {self.views} views"
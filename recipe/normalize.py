@@ -0,0 +1,29 @@
+# Compact form of the Spoonacular data we cache. extendedIngredients entries
+# carry dozens of fields (metric and US measures, meta arrays, image names);
+# only the ones below are used by the app.
+
+# Bump when the stored shape changes, and add a migration rewriting old rows
+INGREDIENT_SCHEMA_VERSION = 1
+
+INGREDIENT_FIELDS = ('original', 'name', 'amount', 'unit', 'aisle')
+
+
+def normalize_ingredient(ingredient):
+    """Keep only INGREDIENT_FIELDS of one ingredient, dropping empty values"""
+    if isinstance(ingredient, str):
+        return {'original': ingredient}
+    normalized = {}
+    for field in INGREDIENT_FIELDS:
+        value = ingredient.get(field)
+        if value in (None, '', []):
+            continue
+        if field == 'amount':
+            value = round(float(value), 3)
+        normalized[field] = value
+    normalized.setdefault('original', ingredient.get('originalName') or ingredient.get('name', ''))
+    return normalized
+
+
+def normalize_ingredients(ingredients):
+    """Normalized copy of an extendedIngredients list (None becomes [])"""
+    return [normalize_ingredient(ingredient) for ingredient in ingredients or []]
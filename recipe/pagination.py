@@ -0,0 +1,60 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# Keyset (cursor) pagination over querysets ordered newest first by
+# (created_at, id). Unlike OFFSET paging, each page is a single indexed range
+# scan no matter how deep the reader scrolls.
+
+def encode_cursor(obj, field='created_at'):
+    """Build an opaque cursor pointing just after the given row"""
+    return encode_position(getattr(obj, field), obj.pk)
+
+
+def encode_position(value, pk):
+    """Cursor for a (value, pk) position; datetimes keep their microseconds"""
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    return base64.urlsafe_b64encode(f"{text}|{pk}".encode()).decode()
+
+
+def decode_position(cursor):
+    """Return (value as text, pk) from a cursor, or None if it is missing or invalid"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        return value, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, pk) from a cursor, or None if it is missing or invalid"""
+    position = decode_position(cursor)
+    if position is None:
+        return None
+    try:
+        return datetime.fromisoformat(position[0]), position[1]
+    except ValueError:
+        return None
+
+
+def keyset_page(queryset, cursor=None, limit=20, field='created_at'):
+    """
+    Return one page of rows plus the cursor for the next page.
+    Returns a tuple: (rows, next_cursor) where next_cursor is None on the last page.
+    """
+    position = decode_cursor(cursor)
+    if position:
+        timestamp, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'pk__lt': pk})
+        )
+
+    # Fetch one extra row to find out whether there is a next page
+    rows = list(queryset.order_by(f'-{field}', '-pk')[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1], field) if len(rows) > limit else None
+    return rows[:limit], next_cursor
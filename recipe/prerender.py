@@ -0,0 +1,202 @@
+"""
+Prerendered HTML for public recipe pages.
+
+Shared created recipes and API recipes shared to the feed look the same to
+every anonymous visitor, so they are rendered once to
+<created|recipe>/<id>/index.html in the PRERENDER_STORAGE whenever they
+change (see recipe/signals.py) and anonymous requests get the file back
+without touching the database or templates. sitemap.xml next to them lists
+every published page.
+
+Every process must see the same pages, or one that missed an unshare keeps
+serving the old page: the local PRERENDER_ROOT only works for a single
+server, and production only prerenders to a shared storage (PRERENDER_PAGES).
+With local storage a front server can serve the files itself for requests
+without a session cookie, e.g. with nginx:
+    try_files /created/$id/index.html @django;
+
+Pages are written in a background thread after the change commits.
+"""
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, transaction
+from django.http import FileResponse, HttpRequest
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .images import reverse_format
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prerender')
+
+# Page kinds: top directory of the pages -> route of the live page
+KINDS = {
+    'created': 'public_created_recipe_detail',
+    'recipe': 'recipe_detail',
+}
+
+
+def page_key(recipe_key):
+    """(kind, id) for a recipe key ("123" or "created_5"), or None if it can't have a page"""
+    recipe_key = str(recipe_key)
+    kind, pk = ('created', recipe_key[len('created_'):]) if recipe_key.startswith('created_') else ('recipe', recipe_key)
+    return (kind, pk) if pk.isdigit() else None
+
+
+def page_storage():
+    """The PRERENDER_STORAGE, rooted at PRERENDER_ROOT when it is local"""
+    backend = import_string(settings.PRERENDER_STORAGE)
+    if issubclass(backend, FileSystemStorage):
+        return backend(location=settings.PRERENDER_ROOT)
+    return backend()
+
+
+def page_name(recipe_key):
+    key = page_key(recipe_key)
+    return '/'.join((*key, 'index.html')) if key else None
+
+
+def is_published(recipe_key):
+    name = page_name(recipe_key)
+    return bool(settings.PRERENDER_PAGES and name and page_storage().exists(name))
+
+
+def serve(request, recipe_key):
+    """
+    The prerendered page for an anonymous GET, or None when the request
+    needs the live page (signed in, pending flash messages, not published).
+    """
+    if request.method != 'GET' or request.GET or 'messages' in request.COOKIES:
+        return None
+    if request.user.is_authenticated or not settings.PRERENDER_PAGES:
+        return None
+    name = page_name(recipe_key)
+    if name is None:
+        return None
+    try:
+        return FileResponse(page_storage().open(name), content_type='text/html; charset=utf-8')
+    except OSError:
+        return None
+
+
+def _anonymous_request():
+    request = HttpRequest()
+    request.method = 'GET'
+    request.user = AnonymousUser()
+    request.META['SERVER_NAME'] = Site.objects.get_current().domain
+    request.META['SERVER_PORT'] = '443'
+    return request
+
+
+def _write(name, content):
+    """Replace a stored file whole so readers never see a half written page"""
+    storage = page_storage()
+    if not isinstance(storage, FileSystemStorage):
+        # Object storages replace a file in one upload; delete first so save()
+        # doesn't pick another free name
+        storage.delete(name)
+        storage.save(name, ContentFile(content.encode('utf-8')))
+        return
+    path = Path(storage.path(name))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(handle, 'w', encoding='utf-8') as temp:
+        temp.write(content)
+    os.chmod(temp_name, 0o644)
+    os.replace(temp_name, path)
+
+
+def render_page(recipe_key):
+    """Anonymous HTML of a recipe page, or None if it should not be public"""
+    from blog.models import CreatedRecipe
+    from .models import Recipe
+    from .views import recipe_detail_context
+
+    kind, pk = page_key(recipe_key)
+    request = _anonymous_request()
+    if kind == 'created':
+        recipe = CreatedRecipe.objects.select_related('creator').filter(id=pk, is_shared=True).first()
+        if recipe is None:
+            return None
+        return render_to_string('public_created_recipe_detail.html', {'recipe': recipe}, request=request)
+
+    recipe_obj = Recipe.objects.select_related('content').filter(recipe_id=pk, is_cached=True).first()
+    if recipe_obj is None or not recipe_obj.user_recipes.filter(is_shared=True).exists():
+        return None
+    return render_to_string('search/detail.html', recipe_detail_context(recipe_obj), request=request)
+
+
+def publish(recipe_key):
+    """(Re)render a page, or remove it if the recipe is no longer public. Returns True if published."""
+    name = page_name(recipe_key)
+    if name is None:
+        return False
+    html = render_page(recipe_key)
+    if html is None:
+        page_storage().delete(name)
+        return False
+    _write(name, html)
+    return True
+
+
+def published_pages():
+    """(recipe key, modified time) of every stored page"""
+    storage = page_storage()
+    for kind in KINDS:
+        try:
+            directories, _ = storage.listdir(kind)
+        except FileNotFoundError:
+            continue
+        for pk in sorted(directories):
+            name = f"{kind}/{pk}/index.html"
+            # Removed pages can leave their directory behind
+            if storage.exists(name):
+                yield (f"created_{pk}" if kind == 'created' else pk), storage.get_modified_time(name)
+
+
+def write_sitemap():
+    """Rewrite sitemap.xml from the stored pages. Returns the number of URLs."""
+    base_url = f"https://{Site.objects.get_current().domain}"
+    entries = []
+    for recipe_key, modified in published_pages():
+        kind, pk = page_key(recipe_key)
+        lastmod = modified.date().isoformat()
+        location = escape(base_url + reverse_format(KINDS[kind]).format(pk))
+        entries.append(f"<url><loc>{location}</loc><lastmod>{lastmod}</lastmod></url>")
+    _write('sitemap.xml', (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        + ''.join(f"{entry}\n" for entry in entries)
+        + '</urlset>\n'
+    ))
+    return len(entries)
+
+
+def _background_publish(recipe_keys):
+    close_old_connections()
+    try:
+        for recipe_key in recipe_keys:
+            publish(recipe_key)
+        write_sitemap()
+    except Exception:
+        logger.exception("Prerendering %s failed", ', '.join(recipe_keys))
+    finally:
+        close_old_connections()
+
+
+def schedule(*recipe_keys):
+    """Republish (or remove) pages in the background once the current transaction commits"""
+    recipe_keys = [str(recipe_key) for recipe_key in recipe_keys if page_key(recipe_key)]
+    if recipe_keys and settings.PRERENDER_PAGES:
+        transaction.on_commit(lambda: _executor.submit(_background_publish, recipe_keys))
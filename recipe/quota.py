@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ApiUsage, QueuedRecipeFetch
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of calling Spoonacular when the points budget or rate limit is used up"""
+
+    def __init__(self, message, retry_after=60):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def seconds_until_reset():
+    """Spoonacular quotas reset at midnight UTC"""
+    now = timezone.now()
+    tomorrow = (now + timezone.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int((tomorrow - now).total_seconds()) + 1
+
+
+def acquire(points=1):
+    """
+    Take one request token and reserve points from today's budget, or raise
+    QuotaExceeded. The usage row is locked so every worker shares the bucket.
+    """
+    now = timezone.now()
+    rate = settings.SPOONACULAR_REQUESTS_PER_SECOND
+    burst = settings.SPOONACULAR_BURST
+
+    with transaction.atomic():
+        usage, _ = ApiUsage.objects.get_or_create(day=now.date(), defaults={'tokens': burst, 'tokens_updated_at': now})
+        usage = ApiUsage.objects.select_for_update().get(pk=usage.pk)
+
+        # Refill the bucket for the time since it was last used
+        if usage.tokens_updated_at:
+            elapsed = (now - usage.tokens_updated_at).total_seconds()
+            usage.tokens = min(burst, usage.tokens + max(elapsed, 0) * rate)
+        usage.tokens_updated_at = now
+
+        error = None
+        budget_left = settings.SPOONACULAR_DAILY_POINTS - usage.points_used
+        if usage.quota_left is not None:
+            budget_left = min(budget_left, usage.quota_left)
+        if points > budget_left:
+            error = QuotaExceeded("Daily Spoonacular quota used up", retry_after=seconds_until_reset())
+        elif usage.tokens < 1:
+            error = QuotaExceeded("Too many Spoonacular requests", retry_after=max(1, int((1 - usage.tokens) / rate) + 1))
+
+        if error:
+            usage.throttled += 1
+        else:
+            usage.tokens -= 1
+            usage.points_used += points
+            usage.requests += 1
+            if usage.quota_left is not None:
+                usage.quota_left -= points
+        usage.save()
+
+    if error:
+        raise error
+
+
+def record_response(response):
+    """Sync today's usage with the quota headers Spoonacular sends back"""
+    used = response.headers.get('X-API-Quota-Used')
+    left = response.headers.get('X-API-Quota-Left')
+    updates = {}
+    if used is not None:
+        # Their count is authoritative, but never undo concurrent reservations
+        ApiUsage.objects.filter(day=timezone.now().date(), points_used__lt=float(used)).update(points_used=float(used))
+    if left is not None:
+        updates['quota_left'] = float(left)
+    if response.status_code == 402:
+        # Payment required: the plan's quota is gone whatever our counters say
+        updates['quota_left'] = 0
+    if updates:
+        ApiUsage.objects.filter(day=timezone.now().date()).update(**updates)
+
+
+def queue_fetch(recipe_id):
+    """Remember a recipe to fetch once quota is available again"""
+    QueuedRecipeFetch.objects.get_or_create(recipe_id=str(recipe_id))
+
+
+def metrics():
+    """Today's consumption and limits, for the metrics endpoint"""
+    usage = ApiUsage.objects.filter(day=timezone.now().date()).first() or ApiUsage(day=timezone.now().date())
+    return {
+        'day': usage.day.isoformat(),
+        'points_used': usage.points_used,
+        'points_limit': settings.SPOONACULAR_DAILY_POINTS,
+        'quota_left': usage.quota_left,
+        'requests': usage.requests,
+        'throttled': usage.throttled,
+        'tokens': round(usage.tokens, 2),
+        'requests_per_second': settings.SPOONACULAR_REQUESTS_PER_SECOND,
+        'burst': settings.SPOONACULAR_BURST,
+        'queued_fetches': QueuedRecipeFetch.objects.count(),
+        'seconds_until_reset': seconds_until_reset(),
+    }
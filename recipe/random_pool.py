@@ -0,0 +1,115 @@
+"""
+Pool of prefetched recipes behind "Get Random Recipe".
+
+Recipes are fetched from /recipes/random in bulk (the response already holds
+full recipe information, so nothing else needs fetching) and each gets a
+random key. A pick is then one indexed range lookup on that key, with
+optional filters applied locally. Each process checks the pool size at most
+every RANDOM_POOL_CHECK_SECONDS, and when it runs low it is topped up in a
+background thread.
+"""
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+from . import spoonacular
+from .cache import store_recipe_data
+from .models import RandomPoolEntry, Recipe
+from .quota import QuotaExceeded
+
+logger = logging.getLogger(__name__)
+
+# /recipes/random returns at most 100 recipes per call
+REFILL_BATCH_SIZE = 100
+
+# Cache key that stops several workers refilling at once
+REFILL_LOCK = 'random-pool-refill'
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='random-pool')
+
+# When this process next counts the pool (time.monotonic())
+_next_check = 0.0
+
+
+def pick(max_ready_in_minutes=None, min_servings=None):
+    """Return a random Recipe from the pool matching the filters, or None"""
+    entries = RandomPoolEntry.objects.select_related('recipe')
+    if max_ready_in_minutes:
+        entries = entries.filter(recipe__ready_in_minutes__lte=max_ready_in_minutes)
+    if min_servings:
+        entries = entries.filter(recipe__servings__gte=min_servings)
+
+    # First entry at or after a random point, wrapping around to the start
+    key = random.random()
+    entry = entries.filter(random_key__gte=key).order_by('random_key').first()
+    if entry is None:
+        entry = entries.filter(random_key__lt=key).order_by('random_key').first()
+    return entry.recipe if entry else None
+
+
+def refill(size=None):
+    """
+    Top the pool up to size (RANDOM_POOL_SIZE by default), replacing the
+    oldest entries when it is full. Returns the number of recipes added.
+    """
+    size = size or settings.RANDOM_POOL_SIZE
+    wanted = size - RandomPoolEntry.objects.count()
+    added = 0
+    while added < wanted:
+        recipes_data = spoonacular.get_random_recipes(number=min(REFILL_BATCH_SIZE, wanted - added))
+        if not store_recipe_data(recipes_data):
+            break
+        recipe_ids = [str(data['id']) for data in recipes_data if 'id' in data]
+        recipe_pks = set(Recipe.objects.filter(recipe_id__in=recipe_ids).values_list('id', flat=True))
+        # Random picks can repeat recipes already in the pool, only count new ones
+        recipe_pks -= set(RandomPoolEntry.objects.filter(recipe_id__in=recipe_pks).values_list('recipe_id', flat=True))
+        if not recipe_pks:
+            break
+        RandomPoolEntry.objects.bulk_create(
+            [RandomPoolEntry(recipe_id=pk, random_key=random.random()) for pk in recipe_pks],
+            ignore_conflicts=True,
+        )
+        added += len(recipe_pks)
+    return added
+
+
+def rotate(count):
+    """Drop the oldest count entries so the next refill brings in new recipes"""
+    oldest = RandomPoolEntry.objects.order_by('added_at').values_list('pk', flat=True)[:count]
+    RandomPoolEntry.objects.filter(pk__in=list(oldest)).delete()
+
+
+def _background_refill():
+    close_old_connections()
+    try:
+        refill()
+    except QuotaExceeded:
+        logger.info("Random pool refill stopped by the API quota")
+    except Exception:
+        logger.exception("Random pool refill failed")
+    finally:
+        cache.delete(REFILL_LOCK)
+        close_old_connections()
+
+
+def refill_if_low():
+    """
+    Start a background refill when the pool is below RANDOM_POOL_LOW_WATER.
+    Cheap to call on every pick: the pool is only counted every
+    RANDOM_POOL_CHECK_SECONDS.
+    """
+    global _next_check
+    now = time.monotonic()
+    if now < _next_check:
+        return
+    _next_check = now + settings.RANDOM_POOL_CHECK_SECONDS
+    if RandomPoolEntry.objects.count() >= settings.RANDOM_POOL_LOW_WATER:
+        return
+    # Lock expires on its own in case a worker dies mid-refill
+    if cache.add(REFILL_LOCK, True, timeout=10 * 60):
+        transaction.on_commit(lambda: _executor.submit(_background_refill))
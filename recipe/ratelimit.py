@@ -0,0 +1,166 @@
+"""
+Per-user (or per-IP for anonymous visitors) rate limits for views that write.
+
+Each limit is a sliding window approximated from two fixed-window counters
+in the cache: the current window's count plus the previous window's count
+weighted by how much of it still overlaps the sliding window. A check is
+one incr and one get, whatever the rate.
+
+The counters need a cache where add() and incr() are atomic and cost no
+database round trip: Redis or memcached in production (LocMemCache, atomic
+within one process, is fine for development and tests). On any other
+backend, such as the DatabaseCache used without REDIS_URL, incr() is a read
+and a write that concurrent requests can interleave, so limits are not
+enforced at all: a warning is logged and the check framework reports
+recipe.W001.
+"""
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from .http import is_api_request, is_fragment_request
+
+# Views with a limit, for metrics
+LIMITED_VIEWS = []
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Cache backends with atomic add() and incr()
+ATOMIC_CACHES = (RedisCache, BaseMemcachedCache, LocMemCache)
+
+logger = logging.getLogger(__name__)
+_warned = False
+
+
+def cache_is_atomic():
+    return isinstance(caches['default'], ATOMIC_CACHES)
+
+
+def limits_enforced():
+    """
+    Whether limits are checked at all: RATELIMIT_ENABLED, and a cache the
+    counters work on (warns once per process otherwise).
+    """
+    global _warned
+    if not settings.RATELIMIT_ENABLED:
+        return False
+    if cache_is_atomic():
+        return True
+    if not _warned:
+        _warned = True
+        logger.warning("Rate limits are off: %s has no atomic incr, use Redis or memcached", type(caches['default']).__name__)
+    return False
+
+
+@checks.register(checks.Tags.caches)
+def check_cache(app_configs, **kwargs):
+    if settings.RATELIMIT_ENABLED and not cache_is_atomic():
+        return [checks.Warning(
+            "Rate limits are not enforced on this cache backend.",
+            hint="Set REDIS_URL (or configure memcached) so the limiter can count requests atomically.",
+            obj=type(caches['default']).__name__,
+            id='recipe.W001',
+        )]
+    return []
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if settings.RATELIMIT_USE_FORWARDED_FOR:
+        # The platform router appends the real client address last
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[-1].strip()
+        if forwarded:
+            return f"ip:{forwarded}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def hit(name, client, limit, window):
+    """
+    Count a request and return 0 if it is allowed, otherwise the number of
+    seconds until it would be.
+    """
+    now = time.time()
+    current = int(now // window)
+    key = f"ratelimit:{name}:{client}:{current}"
+
+    # add() is a no-op when the key exists, so incr() always has something to increment
+    cache.add(key, 0, timeout=window * 2)
+    count = cache.incr(key)
+    previous = cache.get(f"ratelimit:{name}:{client}:{current - 1}", 0)
+
+    overlap = 1 - (now - current * window) / window
+    if previous * overlap + count <= limit:
+        return 0
+
+    # Work out when the next request would fit
+    if count < limit and previous:
+        # Once enough of the previous window has slid out
+        wait = (overlap - (limit - count - 1) / previous) * window
+    else:
+        # After this window ends and its own weight has faded enough
+        wait = (current + 1) * window - now + window * max(0, 1 - (limit - 1) / count)
+    return max(1, math.ceil(wait))
+
+
+def throttled_key(name):
+    return f"ratelimit:throttled:{name}:{timezone.now().date().isoformat()}"
+
+
+def ratelimit(rate, methods=('POST',)):
+    """
+    Limit a view to rate requests (e.g. '10/m') per user or IP. Requests over
+    the limit get a 429 with Retry-After. methods=None limits every method.
+    Nothing is limited on a cache without atomic counters (see above).
+    """
+    limit, window = parse_rate(rate)
+
+    def decorator(view):
+        name = view.__name__
+        LIMITED_VIEWS.append(name)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if methods and request.method not in methods or not limits_enforced():
+                return view(request, *args, **kwargs)
+
+            retry_after = hit(name, client_key(request), limit, window)
+            if retry_after:
+                cache.add(throttled_key(name), 0, timeout=2 * PERIODS['d'])
+                cache.incr(throttled_key(name))
+                if is_api_request(request):
+                    response = JsonResponse({'error': 'Too many requests', 'retry_after': retry_after}, status=429)
+                elif is_fragment_request(request):
+                    response = HttpResponse(f"Too many requests, try again in {retry_after}s.", status=429)
+                else:
+                    response = render(request, 'search/rate_limited.html', {'retry_after': retry_after}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+def throttled_counts():
+    """Requests turned away today, per view"""
+    counts = cache.get_many([throttled_key(name) for name in LIMITED_VIEWS])
+    return {name: counts.get(throttled_key(name), 0) for name in LIMITED_VIEWS}
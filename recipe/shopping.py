@@ -0,0 +1,255 @@
+"""
+Shopping lists: the ingredients of a selection of recipes, each scaled to a
+target number of servings, added up per ingredient.
+
+Ingredient lines are parsed once per recipe version into
+(name, dimension, quantity in canonical units, aisle) rows and cached.
+Spoonacular ingredients come with amount and unit already, created recipes
+are parsed from their free text lines. Masses are kept in grams and volumes
+in millilitres so "2 tbsp butter" and "50 g butter" add up with others of
+their kind. Units that can't be converted (cloves, cans, pinches) only add up
+with the same unit. The totals for a selection are one np.bincount over all
+the rows.
+"""
+import hashlib
+import re
+from fractions import Fraction
+
+import numpy as np
+from django.core.cache import cache
+
+from blog.models import CreatedRecipe
+from .models import Recipe
+
+# Bump when parsing changes so cached rows are parsed again
+PARSE_VERSION = 1
+
+# How long parsed recipes and finished lists stay cached
+PARSED_TIMEOUT = 60 * 60 * 24 * 7
+LIST_TIMEOUT = 60 * 60
+
+MASS, VOLUME, COUNT = 'g', 'ml', ''
+
+# Unit spellings -> (dimension, size in the dimension's canonical unit)
+UNITS = {}
+for names, dimension, size in (
+    (('g', 'gram', 'grams', 'gr'), MASS, 1),
+    (('kg', 'kilogram', 'kilograms', 'kilo', 'kilos'), MASS, 1000),
+    (('mg', 'milligram', 'milligrams'), MASS, 0.001),
+    (('oz', 'ounce', 'ounces'), MASS, 28.3495),
+    (('lb', 'lbs', 'pound', 'pounds'), MASS, 453.592),
+    (('ml', 'milliliter', 'milliliters', 'millilitre', 'millilitres'), VOLUME, 1),
+    (('cl', 'centiliter', 'centilitre'), VOLUME, 10),
+    (('dl', 'deciliter', 'decilitre'), VOLUME, 100),
+    (('l', 'liter', 'liters', 'litre', 'litres'), VOLUME, 1000),
+    (('tsp', 'tsps', 'teaspoon', 'teaspoons', 't'), VOLUME, 4.92892),
+    (('tbsp', 'tbsps', 'tbs', 'tablespoon', 'tablespoons', 'tbl', 'T'), VOLUME, 14.7868),
+    (('cup', 'cups', 'c'), VOLUME, 236.588),
+    (('fl oz', 'fluid ounce', 'fluid ounces'), VOLUME, 29.5735),
+    (('pint', 'pints', 'pt'), VOLUME, 473.176),
+    (('quart', 'quarts', 'qt'), VOLUME, 946.353),
+    (('gallon', 'gallons', 'gal'), VOLUME, 3785.41),
+    (('', 'serving', 'servings', 'piece', 'pieces', 'whole', 'large', 'medium', 'small', 'each'), COUNT, 1),
+):
+    for name in names:
+        UNITS[name] = (dimension, size)
+
+# Units kept as they are, singular form
+OTHER_UNITS = {
+    'clove': 'clove', 'cloves': 'clove', 'can': 'can', 'cans': 'can', 'slice': 'slice', 'slices': 'slice',
+    'pinch': 'pinch', 'pinches': 'pinch', 'dash': 'dash', 'dashes': 'dash', 'bunch': 'bunch', 'bunches': 'bunch',
+    'handful': 'handful', 'handfuls': 'handful', 'stick': 'stick', 'sticks': 'stick', 'sprig': 'sprig',
+    'sprigs': 'sprig', 'head': 'head', 'heads': 'head', 'package': 'package', 'packages': 'package',
+    'pkg': 'package', 'jar': 'jar', 'jars': 'jar', 'bottle': 'bottle', 'bottles': 'bottle',
+}
+
+UNICODE_FRACTIONS = {
+    '½': '1/2', '⅓': '1/3', '⅔': '2/3', '¼': '1/4', '¾': '3/4', '⅕': '1/5',
+    '⅛': '1/8', '⅜': '3/8', '⅝': '5/8', '⅞': '7/8',
+}
+
+NUMBER = r'\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?'
+UNIT_WORDS = sorted((name for name in (*UNITS, *OTHER_UNITS) if name), key=len, reverse=True)
+LINE_RE = re.compile(
+    rf'^\s*(?P<amount>{NUMBER})(?:\s*(?:-|–|to)\s*(?P<upper>{NUMBER}))?'
+    rf'\s*(?:(?P<unit>{"|".join(re.escape(unit) for unit in UNIT_WORDS)})\.?(?![a-z]))?\s*(?:of\s+)?(?P<name>.*)$',
+    re.IGNORECASE,
+)
+
+
+def parse_amount(text):
+    """Float from "2", "1.5", "1,5", "3/4" or "1 1/2"; None if it isn't a number"""
+    try:
+        return float(sum(Fraction(part.replace(',', '.')) for part in text.split()))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def clean_name(name):
+    """Lower case ingredient name without notes, e.g. "Eggs, beaten" -> "egg" """
+    name = re.sub(r'\(.*?\)', '', name.lower())
+    name = name.split(',')[0].strip(' .-')
+    name = re.sub(r'\s+', ' ', name)
+    if name.endswith('ies') and len(name) > 4:
+        return name[:-3] + 'y'
+    if name.endswith('oes'):
+        return name[:-2]
+    if name.endswith('s') and not name.endswith(('ss', 'us')) and len(name) > 3:
+        return name[:-1]
+    return name
+
+
+def canonical(amount, unit):
+    """(dimension, quantity) in canonical units; dimension is the unit itself if it can't be converted"""
+    unit = (unit or '').strip().rstrip('.')
+    known = UNITS.get(unit) or UNITS.get(unit.lower())
+    if known:
+        dimension, size = known
+        return dimension, (amount * size if amount is not None else None)
+    return OTHER_UNITS.get(unit.lower(), unit.lower()), amount
+
+
+def parse_line(line):
+    """(name, dimension, quantity, '') from a free text line such as "2 1/2 cups flour" """
+    for symbol, fraction in UNICODE_FRACTIONS.items():
+        line = line.replace(symbol, f' {fraction}')
+    match = LINE_RE.match(line)
+    if not match or not match.group('name'):
+        return clean_name(line), COUNT, None, ''
+    # Ranges ("1-2 lb") are bought at the upper end
+    dimension, quantity = canonical(parse_amount(match.group('upper') or match.group('amount')), match.group('unit'))
+    return clean_name(match.group('name')), dimension, quantity, ''
+
+
+def parse_ingredient(ingredient):
+    """(name, dimension, quantity, aisle) from a normalized Spoonacular ingredient"""
+    name = ingredient.get('name') or ''
+    if 'amount' not in ingredient or not name:
+        row = parse_line(ingredient.get('original', ''))
+        return (*row[:3], ingredient.get('aisle', ''))
+    dimension, quantity = canonical(float(ingredient['amount']), ingredient.get('unit'))
+    return clean_name(name), dimension, quantity, ingredient.get('aisle', '')
+
+
+def recipe_versions(recipe_keys):
+    """
+    {recipe key: (title, servings, version stamp)} for the keys that exist;
+    created recipes are "created_<id>".
+    """
+    api_ids = [key for key in recipe_keys if not key.startswith('created_')]
+    created_ids = [int(key[len('created_'):]) for key in recipe_keys if key.startswith('created_')]
+    versions = {
+        recipe_id: (title, servings, cached_at.timestamp())
+        for recipe_id, title, servings, cached_at in Recipe.objects.filter(
+            recipe_id__in=api_ids, is_cached=True
+        ).values_list('recipe_id', 'title', 'servings', 'cached_at')
+    }
+    versions.update(
+        (f"created_{pk}", (title, servings, updated_at.timestamp()))
+        for pk, title, servings, updated_at in CreatedRecipe.objects.filter(
+            id__in=created_ids
+        ).values_list('id', 'title', 'servings', 'updated_at')
+    )
+    return versions
+
+
+def parsed_rows(versions):
+    """{recipe key: [(name, dimension, quantity, aisle), ...]}, parsing only what isn't cached"""
+    cache_keys = {
+        f"shopping:{PARSE_VERSION}:{key}:{stamp}": key
+        for key, (_, _, stamp) in versions.items()
+    }
+    found = cache.get_many(cache_keys)
+    rows = {cache_keys[cache_key]: value for cache_key, value in found.items()}
+
+    missing = [key for key in versions if key not in rows]
+    api_ids = [key for key in missing if not key.startswith('created_')]
+    created_ids = [int(key[len('created_'):]) for key in missing if key.startswith('created_')]
+    parsed = {}
+    for recipe_id, ingredients in Recipe.objects.filter(recipe_id__in=api_ids).values_list('recipe_id', 'content__ingredients'):
+        parsed[recipe_id] = [parse_ingredient(ingredient) for ingredient in ingredients or []]
+    for recipe in CreatedRecipe.objects.filter(id__in=created_ids).only('id', 'ingredients'):
+        parsed[f"created_{recipe.id}"] = [parse_line(line) for line in recipe.get_ingredients_list()]
+
+    if parsed:
+        stamps = {key: cache_key for cache_key, key in cache_keys.items()}
+        cache.set_many({stamps[key]: value for key, value in parsed.items()}, PARSED_TIMEOUT)
+    rows.update(parsed)
+    return rows
+
+
+def aggregate(selection, versions, rows):
+    """
+    Totals for [(recipe key, target servings or None)]: a list of
+    {'name', 'amount', 'unit', 'aisle', 'recipes'} sorted by aisle and name.
+    """
+    items = {}
+    index, quantity, factor, recipe_of = [], [], [], []
+    for position, (key, servings) in enumerate(selection):
+        _, base_servings, _ = versions[key]
+        scale = servings / base_servings if servings and base_servings else 1.0
+        for name, dimension, amount, aisle in rows.get(key, ()):
+            item = items.setdefault((name, dimension), (len(items), aisle))
+            index.append(item[0])
+            quantity.append(np.nan if amount is None else amount)
+            factor.append(scale)
+            recipe_of.append(position)
+    if not items:
+        return []
+
+    index = np.asarray(index, dtype=np.intp)
+    quantity = np.asarray(quantity, dtype=np.float64)
+    factor = np.asarray(factor, dtype=np.float64)
+    measured = ~np.isnan(quantity)
+    totals = np.bincount(index, weights=np.where(measured, quantity * factor, 0), minlength=len(items))
+    has_amount = np.bincount(index, weights=measured, minlength=len(items)) > 0
+    # Distinct recipes using each item
+    pairs = np.unique(np.stack([index, np.asarray(recipe_of, dtype=np.intp)]), axis=1)
+    recipe_counts = np.bincount(pairs[0], minlength=len(items))
+
+    result = []
+    for (name, dimension), (position, aisle) in items.items():
+        amount, unit = display(totals[position], dimension) if has_amount[position] else (None, dimension)
+        result.append({'name': name, 'amount': amount, 'unit': unit, 'aisle': aisle or '', 'recipes': int(recipe_counts[position])})
+    result.sort(key=lambda item: (item['aisle'], item['name'], item['unit']))
+    return result
+
+
+def display(total, dimension):
+    """Readable (amount, unit) for a canonical total, e.g. 1500 g -> (1.5, 'kg')"""
+    if dimension == MASS and total >= 1000:
+        return round(total / 1000, 2), 'kg'
+    if dimension == VOLUME and total >= 1000:
+        return round(total / 1000, 2), 'l'
+    if dimension in (MASS, VOLUME):
+        return round(total), dimension
+    return round(total, 2), dimension
+
+
+def shopping_list(selection):
+    """
+    Shopping list for [(recipe key, target servings or None)], cached by the
+    selection and the versions of the recipes in it.
+    Returns {'recipes': [...], 'items': [...], 'missing': [...]}.
+    """
+    versions = recipe_versions({key for key, _ in selection})
+    missing = sorted({key for key, _ in selection if key not in versions})
+    selection = [(key, servings) for key, servings in selection if key in versions]
+
+    digest = hashlib.sha1(repr(sorted(
+        (key, servings, versions[key][2]) for key, servings in selection
+    )).encode()).hexdigest()
+    list_key = f"shopping-list:{PARSE_VERSION}:{digest}"
+    items = cache.get(list_key)
+    if items is None:
+        items = aggregate(selection, versions, parsed_rows(versions))
+        cache.set(list_key, items, LIST_TIMEOUT)
+
+    return {
+        'recipes': [
+            {'recipe_id': key, 'title': versions[key][0], 'servings': servings or versions[key][1]}
+            for key, servings in selection
+        ],
+        'items': items,
+        'missing': missing,
+    }
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import CreatedRecipe
+from . import live, prerender
+from .models import RecipeComment, UserRecipe
+
+
+@receiver(post_save, sender=UserRecipe)
+def announce_share(sender, instance, **kwargs):
+    if instance.is_shared:
+        transaction.on_commit(lambda: live.publish('share', {'id': instance.pk}))
+
+
+@receiver(post_save, sender=RecipeComment)
+def announce_comment(sender, instance, created, **kwargs):
+    if created:
+        recipe_id = instance.recipe.recipe_id
+        transaction.on_commit(lambda: live.publish('comment', {'recipe_id': recipe_id}))
+
+
+# Keep prerendered public pages (recipe/prerender.py) in step with their recipes
+
+@receiver(post_save, sender=CreatedRecipe)
+@receiver(post_delete, sender=CreatedRecipe)
+def prerender_created_recipe(sender, instance, **kwargs):
+    # Publishes when shared, removes the page when unshared or deleted. Always
+    # scheduled: a page this process can't see may still be out there
+    prerender.schedule(f"created_{instance.pk}")
+
+
+# No post_delete receivers for saves and comments: they would turn off fast
+# bulk deletes, so the views deleting shared saves schedule their pages
+@receiver(post_save, sender=UserRecipe)
+def prerender_shared_recipe(sender, instance, **kwargs):
+    recipe_id = instance.recipe.recipe_id
+    if not recipe_id.startswith('created_'):
+        prerender.schedule(recipe_id)
+
+
+@receiver(post_save, sender=RecipeComment)
+def prerender_commented_recipe(sender, instance, **kwargs):
+    # Comments show on API recipe pages
+    recipe_id = instance.recipe.recipe_id
+    if prerender.is_published(recipe_id):
+        prerender.schedule(recipe_id)
@@ -0,0 +1,183 @@
+import re
+
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from blog.models import CreatedRecipe
+from .models import Recipe, RecipeNeighbour
+
+# "Similar recipes": every cached API recipe and shared created recipe becomes
+# a TF-IDF vector over its title and ingredient names, and the top
+# NEIGHBOURS_PER_RECIPE cosine neighbours of each are stored in RecipeNeighbour.
+# Only the build_recipe_neighbours command imports this module (and NumPy/SciPy).
+
+NEIGHBOURS_PER_RECIPE = 8
+
+# Rows of the similarity matrix computed at once; each block is dense
+# (block x corpus size floats) so this bounds memory on big corpora
+BLOCK_SIZE = 512
+
+# Title words count more than each ingredient word
+TITLE_WEIGHT = 2
+
+# Ingredient lines of created recipes are free text, so quantities and common
+# units are dropped before they become terms
+STOP_WORDS = {
+    'a', 'an', 'and', 'for', 'in', 'of', 'or', 'the', 'to', 'with', 'by', 'on',
+    'cup', 'cups', 'tbsp', 'tsp', 'tablespoon', 'tablespoons', 'teaspoon', 'teaspoons',
+    'g', 'kg', 'ml', 'l', 'oz', 'lb', 'lbs', 'pinch', 'large', 'small', 'medium',
+    'chopped', 'sliced', 'diced', 'fresh', 'taste',
+}
+WORD_RE = re.compile(r'[a-z]+')
+
+
+def tokens(text):
+    return [word for word in WORD_RE.findall((text or '').lower()) if len(word) > 1 and word not in STOP_WORDS]
+
+
+def corpus():
+    """
+    (recipe_id, title, terms) for every recipe that can be recommended.
+    Created recipes use their "created_<id>" key, like their feed mirror.
+    """
+    documents = []
+    api_recipes = Recipe.objects.filter(is_cached=True).exclude(
+        recipe_id__startswith='created_'
+    ).select_related('content').only('recipe_id', 'title', 'content__ingredients')
+    for recipe in api_recipes.iterator(chunk_size=2000):
+        content = getattr(recipe, 'content', None)
+        names = [ingredient.get('name') or ingredient.get('original', '') for ingredient in (content.ingredients if content else [])]
+        terms = tokens(recipe.title) * TITLE_WEIGHT + tokens(' '.join(names))
+        documents.append((recipe.recipe_id, recipe.title, terms))
+
+    created = CreatedRecipe.objects.filter(is_shared=True).only('id', 'title', 'ingredients')
+    for recipe in created.iterator(chunk_size=2000):
+        terms = tokens(recipe.title) * TITLE_WEIGHT + tokens(recipe.ingredients)
+        documents.append((f"created_{recipe.id}", recipe.title, terms))
+    return documents
+
+
+def tfidf_matrix(documents):
+    """L2-normalized sparse TF-IDF rows (CSR), one per document"""
+    vocabulary = {}
+    indptr, indices, counts = [0], [], []
+    for _, _, terms in documents:
+        row = {}
+        for term in terms:
+            column = vocabulary.setdefault(term, len(vocabulary))
+            row[column] = row.get(column, 0) + 1
+        indices.extend(row)
+        counts.extend(row.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), len(vocabulary)),
+    )
+    # Sublinear term frequency and smoothed inverse document frequency
+    matrix.data = 1 + np.log(matrix.data)
+    document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def top_neighbours(matrix, rows, k=NEIGHBOURS_PER_RECIPE):
+    """
+    Yield (row, [(column, score), ...]) with the k most similar other rows for
+    each of rows, best first. Zero-similarity pairs are skipped.
+    """
+    corpus_t = matrix.T.tocsc()
+    rows = np.asarray(rows)
+    k = min(k, matrix.shape[0] - 1)
+    if k <= 0:
+        return
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        scores = (matrix[block] @ corpus_t).toarray()
+        scores[np.arange(len(block)), block] = -1  # never your own neighbour
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        for row, columns, values in zip(block, best, best_scores):
+            yield int(row), [(int(column), float(value)) for column, value in zip(columns, values) if value > 0]
+
+
+def _neighbour_rows(documents, source, neighbours):
+    return [
+        RecipeNeighbour(
+            source=documents[source][0],
+            neighbour=documents[column][0],
+            title=documents[column][1],
+            score=round(score, 4),
+            rank=rank,
+        )
+        for rank, (column, score) in enumerate(neighbours)
+    ]
+
+
+def rebuild(k=NEIGHBOURS_PER_RECIPE):
+    """Recompute every neighbour list. Returns the number of recipes indexed."""
+    documents = corpus()
+    matrix = tfidf_matrix(documents)
+    objects = []
+    for row, neighbours in top_neighbours(matrix, range(len(documents)), k):
+        objects.extend(_neighbour_rows(documents, row, neighbours))
+    with transaction.atomic():
+        RecipeNeighbour.objects.all().delete()
+        RecipeNeighbour.objects.bulk_create(objects, batch_size=2000)
+    return len(documents)
+
+
+def update(k=NEIGHBOURS_PER_RECIPE):
+    """
+    Index recipes that have no neighbour list yet and forget recipes that are
+    gone. A new recipe also joins the lists of the recipes it is closest to.
+    Existing scores keep the IDF weights they were computed with, so run
+    rebuild() now and then. Returns the number of new recipes indexed.
+    """
+    documents = corpus()
+    position = {document[0]: row for row, document in enumerate(documents)}
+
+    lists = {}
+    changed = set()
+    for source, key, score in RecipeNeighbour.objects.values_list('source', 'neighbour', 'score'):
+        lists.setdefault(source, [])
+        if key in position:
+            lists[source].append((position[key], score))
+        else:
+            changed.add(source)
+    vanished = [source for source in lists if source not in position]
+    for source in vanished:
+        del lists[source]
+    changed.difference_update(vanished)
+
+    new_rows = [row for row, document in enumerate(documents) if document[0] not in lists]
+    if new_rows:
+        matrix = tfidf_matrix(documents)
+        for row, neighbours in top_neighbours(matrix, new_rows, k):
+            lists[documents[row][0]] = neighbours
+            changed.add(documents[row][0])
+            # Similarity is symmetric, so offer the new recipe to its neighbours
+            for column, score in neighbours:
+                key = documents[column][0]
+                current = lists.get(key)
+                if current is None or (len(current) >= k and score <= current[-1][1]):
+                    continue
+                merged = [item for item in current if item[0] != row] + [(row, score)]
+                lists[key] = sorted(merged, key=lambda item: -item[1])[:k]
+                changed.add(key)
+
+    objects = []
+    for source in changed:
+        objects.extend(_neighbour_rows(documents, position[source], lists[source]))
+    with transaction.atomic():
+        RecipeNeighbour.objects.filter(source__in=[*vanished, *changed]).delete()
+        RecipeNeighbour.objects.bulk_create(objects, batch_size=2000)
+    return len(new_rows)
@@ -0,0 +1,55 @@
+import requests
+from django.conf import settings
+
+from . import quota
+
+# All calls to the Spoonacular API go through this module
+API_BASE_URL = "https://api.spoonacular.com"
+
+# informationBulk accepts a comma separated id list; keep each call modest
+BULK_BATCH_SIZE = 50
+
+
+def _get(path, points=1, **params):
+    """Call the API if the quota allows it (raises quota.QuotaExceeded otherwise)"""
+    quota.acquire(points)
+    params['apiKey'] = settings.SPOONACULAR_API_KEY
+    response = requests.get(f"{API_BASE_URL}{path}", params=params, timeout=15)
+    quota.record_response(response)
+    if response.status_code == 402:
+        raise quota.QuotaExceeded("Spoonacular quota used up", retry_after=quota.seconds_until_reset())
+    return response.json()
+
+
+def get_recipe_information(recipe_id):
+    """Full information for one recipe"""
+    return _get(f"/recipes/{recipe_id}/information")
+
+
+def bulk_points(count):
+    """Quota points an informationBulk call for count recipes costs (1 + 0.5 per extra recipe)"""
+    return 1 + 0.5 * (count - 1) if count else 0
+
+
+def get_recipe_information_bulk(recipe_ids):
+    """Full information for many recipes, one upstream call per BULK_BATCH_SIZE ids"""
+    recipe_ids = list(recipe_ids)
+    results = []
+    for start in range(0, len(recipe_ids), BULK_BATCH_SIZE):
+        batch = recipe_ids[start:start + BULK_BATCH_SIZE]
+        results.extend(_get(
+            "/recipes/informationBulk",
+            points=bulk_points(len(batch)),
+            ids=','.join(str(recipe_id) for recipe_id in batch)
+        ))
+    return results
+
+
+def search_recipes(query, number=10):
+    # 1 point plus 0.01 per result
+    return _get("/recipes/complexSearch", points=1 + 0.01 * number, query=query, number=number).get('results', [])
+
+
+def get_random_recipes(number=1):
+    # 1 point plus 0.01 per recipe, and each recipe comes with full information
+    return _get("/recipes/random", points=1 + 0.01 * number, number=number).get('recipes', [])
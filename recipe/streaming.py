@@ -0,0 +1,72 @@
+"""
+Streamed page rendering: the page shell (everything around a list) is sent
+as soon as it is rendered and the list follows in chunks as it is produced,
+so the first bytes go out before the whole list has been read or rendered.
+
+Under ASGI the body is an async iterator, since Django would otherwise read
+a sync one to the end before sending anything. The chunks are still produced
+by sync code (templates, database cursors), one at a time in the sync thread.
+"""
+import contextvars
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# Stands in for the streamed list while the shell is rendered
+STREAM_MARKER = '<!--streamed-content-->'
+
+# Returned by next() once the chunks run out
+_END = object()
+
+
+def _in_context(context, chunks):
+    """Produce chunks inside the request's context (e.g. its database routing)"""
+    chunks = iter(chunks)
+    while True:
+        try:
+            yield context.run(next, chunks)
+        except StopIteration:
+            return
+
+
+async def _in_context_async(context, chunks):
+    """_in_context for ASGI: each chunk is produced in the sync thread, off the event loop"""
+    chunks = iter(chunks)
+    produce = sync_to_async(context.run)
+    while True:
+        chunk = await produce(next, chunks, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+def stream_template(request, template_name, context, slot, chunks):
+    """
+    Render template_name with STREAM_MARKER in the slot variable, then stream
+    the part before it, every chunk of HTML from chunks, and the rest.
+    """
+    # Headers go out with the shell, so the CSRF cookie must be settled first
+    get_token(request)
+    html = render_to_string(template_name, {**context, slot: mark_safe(STREAM_MARKER)}, request)
+    head, tail = html.split(STREAM_MARKER)
+    # Taken now: the body is produced after the middleware has returned and
+    # reset the request's context variables
+    request_context = contextvars.copy_context()
+
+    if isinstance(request, ASGIRequest):
+        async def content():
+            yield head
+            async for chunk in _in_context_async(request_context, chunks):
+                yield chunk
+            yield tail
+    else:
+        def content():
+            yield head
+            yield from _in_context(request_context, chunks)
+            yield tail
+
+    return StreamingHttpResponse(content(), content_type='text/html; charset=utf-8')
@@ -0,0 +1,22 @@
+from django import template
+
+from recipe.images import DEFAULT_SIZES, image_sources
+
+register = template.Library()
+
+
+# Render a lazy-loaded <img> with a srcset of size-appropriate variants.
+# Pass recipe_id for API recipes, or url for Cloudinary/other images.
+# Use eager=True for images that are likely above the fold.
+@register.inclusion_tag('recipe/responsive_image.html')
+def responsive_image(url=None, alt='', recipe_id=None, css_class='', style='', eager=False, sizes=DEFAULT_SIZES):
+    sources = image_sources(url=url, recipe_id=recipe_id)
+    return {
+        'src': sources['src'],
+        'srcset': sources['srcset'],
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'style': style,
+        'eager': eager,
+    }
@@ -1,3 +0,0 @@
-from django.test import TestCase
-from views import recipe 
-# Create your tests here.
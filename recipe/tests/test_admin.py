@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import CreatedRecipe
+from recipe.admin_utils import EstimatedCountPaginator
+from recipe.models import Recipe, RecipeComment, UserRecipe
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=STORAGES)
+class ChangelistQueryTests(TestCase):
+    """Changelists run the same number of queries however many rows they show"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='pass')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = Recipe.objects.count()
+        for n in range(start, start + count):
+            user = User.objects.create_user(f'cook{n}')
+            recipe = Recipe.objects.create(recipe_id=str(n), title=f'Recipe {n}', is_cached=True)
+            UserRecipe.objects.create(user=user, recipe=recipe, is_shared=bool(n % 2))
+            RecipeComment.objects.create(user=user, recipe=recipe, comment='Nice', rating=n % 5)
+            CreatedRecipe.objects.create(creator=user, title=f'Created {n}', ingredients='egg', instructions='cook')
+
+    def assertConstantQueries(self, url, params=None, queries=None):
+        self.add_rows(2)
+        with self.assertNumQueries(queries):
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        self.add_rows(20)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_user_recipe_changelist(self):
+        # user, page, rows with their user and recipe
+        response = self.assertConstantQueries(reverse('admin:recipe_userrecipe_changelist'), queries=3)
+        self.assertEqual(len(response.context['cl'].result_list), 22)
+        self.assertContains(response, 'Recipe 21')
+
+    def test_comment_changelist(self):
+        # user, page, rows, distinct ratings for the rating filter
+        self.assertConstantQueries(reverse('admin:recipe_recipecomment_changelist'), queries=4)
+
+    def test_created_recipe_changelist(self):
+        self.assertConstantQueries(reverse('admin:blog_createdrecipe_changelist'), queries=3)
+
+    def test_username_filter(self):
+        url = reverse('admin:recipe_userrecipe_changelist')
+        response = self.assertConstantQueries(url, {'user': 'COOK1', 'is_shared__exact': '1'}, queries=3)
+        self.assertEqual([row.user.username for row in response.context['cl'].result_list], ['cook1'])
+        # The filter box keeps the other filters
+        self.assertContains(response, '<input type="hidden" name="is_shared__exact" value="1">', html=True)
+        self.assertContains(response, 'value="COOK1"')
+
+    def test_username_filter_with_unknown_user(self):
+        self.add_rows(2)
+        response = self.client.get(reverse('admin:recipe_recipecomment_changelist'), {'user': 'nobody'})
+        self.assertEqual(list(response.context['cl'].result_list), [])
+
+    def test_creator_filter(self):
+        self.add_rows(3)
+        response = self.client.get(reverse('admin:blog_createdrecipe_changelist'), {'creator': 'cook2'})
+        self.assertEqual([recipe.title for recipe in response.context['cl'].result_list], ['Created 2'])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Recipe.objects.bulk_create(Recipe(recipe_id=str(n), title=f'Recipe {n}') for n in range(3))
+
+    def postgres_estimate(self, reltuples):
+        # The first cursor answers the pg_class lookup, any COUNT after it runs for real
+        estimate = mock.MagicMock()
+        estimate.__enter__.return_value.fetchone.return_value = (reltuples,)
+        cursors = iter([estimate])
+        real_cursor = connection.cursor
+        return mock.patch.multiple(connection, vendor='postgresql', cursor=lambda: next(cursors, None) or real_cursor())
+
+    def test_unfiltered_list_uses_the_estimate(self):
+        with self.postgres_estimate(12345):
+            self.assertEqual(EstimatedCountPaginator(Recipe.objects.all(), 10).count, 12345)
+
+    def test_filtered_list_is_counted(self):
+        # SQLite has no pg_class, so only the COUNT can run here
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertEqual(EstimatedCountPaginator(Recipe.objects.filter(recipe_id='1'), 10).count, 1)
+
+    def test_unanalyzed_table_is_counted(self):
+        with self.postgres_estimate(-1):
+            self.assertEqual(EstimatedCountPaginator(Recipe.objects.all(), 10).count, 3)
+
+    def test_other_databases_count(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Recipe.objects.all(), 10).count, 3)
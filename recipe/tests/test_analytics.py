@@ -0,0 +1,76 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from blog.models import CreatedRecipe
+from recipe import analytics
+from recipe.models import Recipe, RecipeViewHour
+
+
+class FlusherTests(SimpleTestCase):
+    def setUp(self):
+        analytics._buffer.clear()
+        self.addCleanup(analytics._buffer.clear)
+        self.written = []
+        self.flushed = threading.Event()
+
+        def write_counts(counts):
+            self.written.append(counts)
+            self.flushed.set()
+
+        for patcher in (
+            # Each test starts its own flusher, which waits with that test's interval
+            mock.patch('recipe.analytics._flusher', None),
+            mock.patch('recipe.analytics.write_counts', write_counts),
+            mock.patch('recipe.analytics.close_old_connections'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @override_settings(ANALYTICS_FLUSH_SECONDS=0.05, ANALYTICS_FLUSH_SIZE=100)
+    def test_flushes_on_a_timer_without_more_views(self):
+        analytics.record_view('1')
+        analytics.record_view('1')
+        self.assertTrue(self.flushed.wait(timeout=5))
+        self.assertEqual([sum(counts.values()) for counts in self.written], [2])
+        self.assertEqual(analytics._buffer, Counter())
+
+    @override_settings(ANALYTICS_FLUSH_SECONDS=60, ANALYTICS_FLUSH_SIZE=2)
+    def test_full_buffer_flushes_early(self):
+        analytics.record_view('1')
+        analytics.record_view('2')
+        self.assertTrue(self.flushed.wait(timeout=5))
+        self.assertEqual({key for _, key in self.written[0]}, {'1', '2'})
+
+    @override_settings(ANALYTICS_FLUSH_SECONDS=60, ANALYTICS_FLUSH_SIZE=100)
+    def test_explicit_flush(self):
+        analytics.record_view('created_3')
+        analytics.flush()
+        self.assertEqual(len(self.written), 1)
+        self.assertFalse(analytics._buffer)
+
+
+class WriteCountsTests(TestCase):
+    def test_totals_and_hourly_rollups(self):
+        cook = User.objects.create_user('cook')
+        recipe = Recipe.objects.create(recipe_id='1', title='Soup', view_count=4)
+        created = CreatedRecipe.objects.create(creator=cook, title='Stew', ingredients='x', instructions='y')
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        earlier = hour - timedelta(hours=1)
+        RecipeViewHour.objects.create(recipe_key='1', hour=hour, views=1)
+
+        analytics.write_counts(Counter({
+            (earlier, '1'): 2, (hour, '1'): 3, (hour, f'created_{created.id}'): 2, (hour, 'created_x'): 1,
+        }))
+
+        recipe.refresh_from_db()
+        created.refresh_from_db()
+        self.assertEqual((recipe.view_count, created.view_count), (9, 2))
+        self.assertEqual(RecipeViewHour.objects.get(recipe_key='1', hour=hour).views, 4)
+        self.assertEqual(RecipeViewHour.objects.get(recipe_key='1', hour=earlier).views, 2)
+        self.assertEqual(analytics.popular(days=1, limit=2), [('1', 6), (f'created_{created.id}', 2)])
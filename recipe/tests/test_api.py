@@ -0,0 +1,132 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import CreatedRecipe
+from recipe.models import Recipe, RecipeComment, RecipeViewHour, UserRecipe
+
+
+class RecipeKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user('cook')
+        Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        shared = CreatedRecipe.objects.create(creator=cls.cook, title='Shared stew', ingredients='x', instructions='y', is_shared=True)
+        unshared = CreatedRecipe.objects.create(creator=cls.cook, title='Secret stew', ingredients='x', instructions='y')
+        cls.shared_key, cls.unshared_key = f'created_{shared.id}', f'created_{unshared.id}'
+        for created, is_shared in ((shared, True), (unshared, False)):
+            mirror = Recipe.objects.create(recipe_id=f'created_{created.id}', title=created.title, is_cached=True)
+            UserRecipe.objects.create(user=cls.cook, recipe=mirror, is_shared=is_shared)
+
+    def setUp(self):
+        cache.clear()
+        fetch = mock.patch('recipe.views.spoonacular.get_recipe_information')
+        self.fetch = fetch.start()
+        self.addCleanup(fetch.stop)
+
+    def get(self, recipe_id):
+        return self.client.get(reverse('api:recipe', args=[recipe_id]))
+
+    def comment(self, recipe_id):
+        self.client.force_login(self.cook)
+        return self.client.post(
+            reverse('api:recipe_comments', args=[recipe_id]), json.dumps({'comment': 'Tasty'}), content_type='application/json',
+        )
+
+    def test_cached_recipe(self):
+        self.assertEqual(self.get('1').json()['title'], 'Soup')
+        self.fetch.assert_not_called()
+
+    def test_only_spoonacular_ids_are_fetched(self):
+        for recipe_id in ('abc', '1.5', 'created_', f'{self.shared_key}x', 'created_999'):
+            self.assertEqual(self.get(recipe_id).status_code, 404, recipe_id)
+            self.assertEqual(self.comment(recipe_id).status_code, 404, recipe_id)
+        self.fetch.assert_not_called()
+        # No stub rows for share_created_recipe's get_or_create to pick up
+        self.assertFalse(Recipe.objects.filter(recipe_id='created_999').exists())
+
+    def test_shared_created_recipe(self):
+        self.assertEqual(self.get(self.shared_key).json()['title'], 'Shared stew')
+        self.assertEqual(self.comment(self.shared_key).status_code, 201)
+
+    def test_unshared_created_recipe_is_hidden(self):
+        self.assertEqual(self.get(self.unshared_key).status_code, 404)
+        self.assertEqual(self.comment(self.unshared_key).status_code, 404)
+        self.assertFalse(RecipeComment.objects.exists())
+
+        # Comments left while it was shared stay hidden too
+        RecipeComment.objects.create(recipe=Recipe.objects.get(recipe_id=self.unshared_key), user=self.cook, comment='Secret')
+        for url in (
+            reverse('api:recipe_comments', args=[self.unshared_key]),
+            reverse('recipe_comments', args=[self.unshared_key]),
+            reverse('feed_comments', args=[self.unshared_key]),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+        response = self.client.post(reverse('make_feed_comment', args=[self.unshared_key]), {'comment': 'x'}, HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments_of_visible_recipes(self):
+        self.assertEqual(self.client.get(reverse('api:recipe_comments', args=[self.shared_key])).json()['results'], [])
+        self.assertEqual(self.client.get(reverse('recipe_comments', args=[self.shared_key]), {'format': 'json'}).status_code, 200)
+        # Listing comments never fetches, an unknown id just has none
+        self.assertEqual(self.client.get(reverse('api:recipe_comments', args=['999'])).json()['results'], [])
+        self.assertEqual(self.client.get(reverse('api:recipe_comments', args=['abc'])).status_code, 404)
+        self.fetch.assert_not_called()
+
+    def test_library_takes_spoonacular_ids_only(self):
+        self.client.force_login(self.cook)
+        response = self.client.post(reverse('api:library'), json.dumps({'recipe_id': self.shared_key}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.fetch.assert_not_called()
+
+    def test_popular_leaves_out_unshared_created_recipes(self):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        for key, views in (('1', 5), (self.shared_key, 3), (self.unshared_key, 9)):
+            RecipeViewHour.objects.create(recipe_key=key, hour=hour, views=views)
+        response = self.client.get(reverse('api:popular_recipes'))
+        self.assertEqual(
+            response.json()['results'],
+            [{'recipe_id': '1', 'title': 'Soup', 'views': 5}, {'recipe_id': self.shared_key, 'title': 'Shared stew', 'views': 3}],
+        )
+
+
+class CursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cook = User.objects.create_user('cook')
+        recipe = Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        comments = RecipeComment.objects.bulk_create(RecipeComment(recipe=recipe, user=cook, comment=f'{n}') for n in range(5))
+        # Microseconds apart, so a cursor rounded to milliseconds would skip rows
+        start = timezone.now()
+        for n, comment in enumerate(comments):
+            RecipeComment.objects.filter(pk=comment.pk).update(created_at=start + timedelta(microseconds=n))
+        for n in range(5):
+            Recipe.objects.create(recipe_id=str(10 + n), title=f'Recipe {n}', is_cached=True, view_count=n // 2)
+
+    def walk(self, url, **params):
+        seen, cursor = [], None
+        while True:
+            page = self.client.get(url, {'limit': 2, **params, **({'cursor': cursor} if cursor else {})}).json()
+            seen.extend(page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return seen
+
+    def test_datetime_order(self):
+        seen = self.walk(reverse('api:recipe_comments', args=['1']))
+        self.assertEqual([row['comment'] for row in seen], ['4', '3', '2', '1', '0'])
+
+    def test_number_order(self):
+        seen = self.walk(reverse('api:recipes'), order='views', fields='recipe_id')
+        self.assertEqual([row['recipe_id'] for row in seen], ['14', '13', '12', '11', '10', '1'])
+
+    def test_invalid_cursor(self):
+        url = reverse('api:recipes')
+        for cursor in ('junk', 'bm90IGEgdGltZXw1', 'MTIzfHg='):
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 400, cursor)
@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from recipe.management.commands.build_assets import minify_css, minify_js
+
+BOOTSTRAP_CSS = '/*!\n * Bootstrap v5.0.1 (https://getbootstrap.com/)\n * Licensed under MIT\n */:root{--bs-blue:#0d6efd}\n'
+BOOTSTRAP_JS = '/*!\n  * Bootstrap v5.0.1 (https://getbootstrap.com/)\n  * Licensed under MIT\n  */\n!function(t){var e="/*";t(e)}();\n'
+
+
+class MinifyTests(SimpleTestCase):
+    def test_css_keeps_license_comments(self):
+        source = '/*! Keep me */\n/* drop me */\n.card > .title {\n  color : red;\n}\n'
+        self.assertEqual(minify_css(source), '/*! Keep me */ .card>.title{color : red}')
+
+    def test_js_leaves_block_comment_markers_alone(self):
+        source = '  var pattern = /a\\/*b/;\n\n  // note\n  var s = "*/";\n'
+        self.assertEqual(minify_js(source), 'var pattern = /a\\/*b/;\nvar s = "*/";')
+
+
+class BuildAssetsTests(SimpleTestCase):
+    def setUp(self):
+        self.static_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.static_dir)
+        files = {
+            'CSS/style.css': '/* ours */\nbody {\n  margin: 0;\n}\n',
+            'vendor/bootstrap/bootstrap.min.css': BOOTSTRAP_CSS,
+            'vendor/bootstrap-icons/bootstrap-icons.css': '/*! Icons, MIT */\n@font-face { src: url("./fonts/bootstrap-icons.woff2") }\n',
+            'vendor/bootstrap/bootstrap.bundle.min.js': BOOTSTRAP_JS,
+        }
+        for name, content in files.items():
+            path = self.static_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding='utf-8')
+
+    def test_vendor_files_are_bundled_unchanged(self):
+        with override_settings(STATICFILES_DIRS=[self.static_dir]):
+            call_command('build_assets', stdout=StringIO())
+        css = (self.static_dir / 'dist/site.min.css').read_text(encoding='utf-8')
+        js = (self.static_dir / 'dist/site.min.js').read_text(encoding='utf-8')
+
+        self.assertIn(BOOTSTRAP_CSS.strip(), css)
+        self.assertIn('/*! Icons, MIT */', css)
+        self.assertNotIn('/* ours */', css)
+        # Font URLs still resolve from dist/
+        self.assertIn('url("../vendor/bootstrap-icons/fonts/bootstrap-icons.woff2")', css)
+        self.assertEqual(js, BOOTSTRAP_JS.strip())
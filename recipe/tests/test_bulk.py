@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipe.models import QueuedRecipeFetch, Recipe, UserRecipe
+from recipe.quota import QuotaExceeded
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def recipes(*ids):
+    return [{'id': int(recipe_id), 'title': f'Recipe {recipe_id}'} for recipe_id in ids]
+
+
+@override_settings(RATELIMIT_ENABLED=False, STORAGES=STORAGES)
+class BulkSaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user('cook')
+        Recipe.objects.create(recipe_id='1', title='Cached', is_cached=True)
+
+    def setUp(self):
+        self.client.force_login(self.cook)
+        fetch = mock.patch('recipe.views.spoonacular.get_recipe_information_bulk')
+        self.fetch = fetch.start()
+        self.addCleanup(fetch.stop)
+
+    def save(self, ids, **data):
+        return self.client.post(reverse('bulk_save_recipes'), {'recipe_ids': ids, **data})
+
+    def messages(self, response):
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def saved(self):
+        return set(UserRecipe.objects.filter(user=self.cook).values_list('recipe__recipe_id', flat=True))
+
+    def test_partial_failure(self):
+        UserRecipe.objects.create(user=self.cook, recipe=Recipe.objects.get(recipe_id='1'))
+        # The API doesn't know 3
+        self.fetch.return_value = recipes(2)
+        response = self.save(['1', '2', '3', 'abc'])
+        self.assertRedirects(response, reverse('my_recipes'), fetch_redirect_response=False)
+        self.assertEqual(self.saved(), {'1', '2'})
+        self.fetch.assert_called_once_with(['2', '3'])
+        self.assertEqual(self.messages(response), [
+            '1 recipe(s) added to your favorites.',
+            '1 recipe(s) could not be found or will be fetched later, try importing them again tomorrow.',
+        ])
+
+    def test_fetches_in_batches_and_queues_the_rest_on_quota(self):
+        self.fetch.side_effect = [recipes(2, 3), QuotaExceeded("Daily quota used up")]
+        with mock.patch('recipe.views.spoonacular.BULK_BATCH_SIZE', 2):
+            self.save(['2', '3', '4', '5', '6'])
+        self.assertEqual([call.args[0] for call in self.fetch.call_args_list], [['2', '3'], ['4', '5']])
+        self.assertEqual(self.saved(), {'2', '3'})
+        self.assertEqual(set(QueuedRecipeFetch.objects.values_list('recipe_id', flat=True)), {'4', '5', '6'})
+
+    def test_at_most_max_bulk_recipes(self):
+        self.fetch.return_value = []
+        with mock.patch('recipe.views.MAX_BULK_RECIPES', 3):
+            self.save(['1', '2', '3', '4', '5'])
+        self.fetch.assert_called_once_with(['2', '3'])
+
+    def test_next_is_used_on_both_paths(self):
+        self.fetch.return_value = recipes(2)
+        for ids in ([], ['2']):
+            response = self.save(ids, next='/search/?q=soup')
+            self.assertRedirects(response, '/search/?q=soup', fetch_redirect_response=False)
+
+    def test_next_must_stay_on_the_site(self):
+        self.fetch.return_value = recipes(2)
+        for next_page in ('https://evil.example/', '//evil.example/', 'javascript:alert(1)'):
+            for ids in ([], ['2']):
+                response = self.save(ids, next=next_page)
+                self.assertRedirects(response, reverse('my_recipes'), fetch_redirect_response=False)
+
+    def test_import_from_pasted_ids_and_urls(self):
+        self.fetch.return_value = recipes(715538)
+        self.assertContains(self.client.get(reverse('import_recipes')), 'Import Recipes')
+        response = self.client.post(reverse('import_recipes'), {
+            'recipe_list': '1\nhttps://spoonacular.com/recipes/bruschetta-715538, nonsense',
+        })
+        self.assertRedirects(response, reverse('my_recipes'), fetch_redirect_response=False)
+        self.assertEqual(self.saved(), {'1', '715538'})
+
+
+class BulkDeleteTests(TestCase):
+    def test_deletes_only_your_own(self):
+        cook, other = User.objects.create_user('cook'), User.objects.create_user('other')
+        for recipe_id in ('1', '2'):
+            recipe = Recipe.objects.create(recipe_id=recipe_id, title=recipe_id, is_cached=True)
+            UserRecipe.objects.create(user=cook, recipe=recipe)
+            UserRecipe.objects.create(user=other, recipe=recipe)
+        self.client.force_login(cook)
+        response = self.client.post(reverse('bulk_delete_recipes'), {'recipe_ids': ['1', '3']})
+        self.assertRedirects(response, reverse('my_recipes'), fetch_redirect_response=False)
+        self.assertEqual(list(UserRecipe.objects.filter(user=cook).values_list('recipe__recipe_id', flat=True)), ['2'])
+        self.assertEqual(UserRecipe.objects.filter(user=other).count(), 2)
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)], ['1 recipe(s) deleted from your favorites.'])
+
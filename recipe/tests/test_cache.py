@@ -0,0 +1,36 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from recipe import prerender
+from recipe.cache import store_recipe_data
+from recipe.models import Recipe
+
+
+class StoreRecipeDataTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        overrides = override_settings(PRERENDER_ROOT=root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_upserts_recipes_and_content(self):
+        Recipe.objects.create(recipe_id='1', title='Old title')
+        stored = store_recipe_data([
+            {'id': 1, 'title': 'Soup', 'servings': 2, 'extendedIngredients': []},
+            {'id': 2, 'title': 'Cake', 'summary': 'Sweet'},
+            {'title': 'No id'},
+        ])
+        self.assertEqual(stored, 2)
+        self.assertEqual(dict(Recipe.objects.values_list('recipe_id', 'title')), {'1': 'Soup', '2': 'Cake'})
+        self.assertEqual(Recipe.objects.get(recipe_id='2').content.summary, 'Sweet')
+
+    def test_republishes_refreshed_public_pages(self):
+        # Bulk upserts send no post_save
+        prerender._write(prerender.page_name('1'), 'old page')
+        with mock.patch('recipe.prerender.schedule') as schedule:
+            store_recipe_data([{'id': 1, 'title': 'Soup'}, {'id': 2, 'title': 'Cake'}])
+        schedule.assert_called_once_with('1')
@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from recipe.feed import build_feed_cards
+from recipe.models import Recipe, RecipeContent, UserRecipe
+from recipe.views import get_or_fetch_recipe
+
+
+class RecipeContentTests(TestCase):
+    def setUp(self):
+        fetch = mock.patch('recipe.views.spoonacular.get_recipe_information')
+        self.fetch = fetch.start()
+        self.addCleanup(fetch.stop)
+
+    def test_fetch_writes_the_recipe_and_its_content(self):
+        self.fetch.return_value = {
+            'id': 1, 'title': 'Soup', 'summary': 'Warm', 'instructions': 'Boil',
+            'extendedIngredients': [{'original': '1 onion', 'name': 'onion'}],
+        }
+        recipe, data = get_or_fetch_recipe(1)
+        self.assertEqual(recipe.title, 'Soup')
+        content = RecipeContent.objects.get(recipe=recipe)
+        self.assertEqual((content.summary, content.instructions), ('Warm', 'Boil'))
+        self.assertEqual(content.ingredients, data['extendedIngredients'])
+
+    def test_cached_recipe_reads_its_content_in_one_query(self):
+        recipe = Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        RecipeContent.objects.create(recipe=recipe, summary='Warm', instructions='Boil', ingredients=[{'original': '1 onion'}])
+        with self.assertNumQueries(1):
+            _, data = get_or_fetch_recipe('1')
+        self.assertEqual((data['summary'], data['instructions']), ('Warm', 'Boil'))
+        self.assertEqual(data['extendedIngredients'], [{'original': '1 onion'}])
+        self.fetch.assert_not_called()
+
+    def test_cached_recipe_without_content(self):
+        Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        _, data = get_or_fetch_recipe('1')
+        self.assertEqual(data['extendedIngredients'], [])
+        self.assertIsNone(data['summary'])
+
+    def test_feed_loads_summaries_for_created_recipes_only(self):
+        cook = User.objects.create_user('cook')
+        shared = []
+        for recipe_id, summary in (('1', 'Spoonacular summary'), ('created_1', 'My own stew'), ('created_2', '')):
+            recipe = Recipe.objects.create(recipe_id=recipe_id, title=recipe_id, is_cached=True)
+            RecipeContent.objects.create(recipe=recipe, summary=summary)
+            shared.append(UserRecipe.objects.create(user=cook, recipe=recipe, is_shared=True))
+        shared_recipes = UserRecipe.objects.filter(pk__in=[entry.pk for entry in shared]).select_related('user', 'recipe').order_by('id')
+        # Shared recipes, comment counts, recent comments and summaries
+        with self.assertNumQueries(4):
+            cards = build_feed_cards(shared_recipes)
+        self.assertEqual([card.summary for card in cards], ['', 'My own stew', ''])
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipe.feed import FEED_COMMENTS_PER_CARD
+from recipe.models import Recipe, RecipeComment, UserRecipe
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+FRAGMENT = {'HTTP_HX_REQUEST': 'true'}
+
+
+@override_settings(RATELIMIT_ENABLED=False, STORAGES=STORAGES)
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user('cook')
+        cls.soup = Recipe.objects.create(recipe_id='1', title='Tomato soup', is_cached=True)
+        cls.shared = UserRecipe.objects.create(user=cls.cook, recipe=cls.soup, is_shared=True, rating=4)
+        cls.private = UserRecipe.objects.create(user=cls.cook, recipe=Recipe.objects.create(recipe_id='2', title='Cake', is_cached=True))
+        for n in range(FEED_COMMENTS_PER_CARD + 1):
+            RecipeComment.objects.create(recipe=cls.soup, user=cls.cook, comment=f'Comment {n}')
+
+    def test_feed_card(self):
+        response = self.client.get(reverse('feed_card', args=[self.shared.pk]))
+        self.assertContains(response, 'Tomato soup')
+        self.assertContains(response, '⭐⭐⭐⭐')
+        self.assertEqual(len(response.context['card'].recent_comments), FEED_COMMENTS_PER_CARD)
+        self.assertContains(response, f'View all {FEED_COMMENTS_PER_CARD + 1} comments')
+        self.assertNotContains(response, 'Comment 0')
+
+    def test_feed_card_must_be_shared(self):
+        for pk in (self.private.pk, 999):
+            self.assertEqual(self.client.get(reverse('feed_card', args=[pk])).status_code, 404)
+
+    def test_feed_comments(self):
+        response = self.client.get(reverse('feed_comments', args=['1']))
+        self.assertEqual(response['X-Comment-Count'], str(FEED_COMMENTS_PER_CARD + 1))
+        self.assertContains(response, f'Comment {FEED_COMMENTS_PER_CARD}')
+        self.assertContains(response, 'Log in</a> to add a comment')
+        self.assertEqual(self.client.get(reverse('feed_comments', args=['999'])).status_code, 404)
+
+    def test_more_link_follows_the_comments_per_card(self):
+        with mock.patch('recipe.views.FEED_COMMENTS_PER_CARD', FEED_COMMENTS_PER_CARD + 1), \
+                mock.patch('recipe.feed.FEED_COMMENTS_PER_CARD', FEED_COMMENTS_PER_CARD + 1):
+            response = self.client.get(reverse('feed_comments', args=['1']))
+        self.assertContains(response, 'Comment 0')
+        self.assertNotContains(response, 'View all')
+
+    def test_make_feed_comment_fragment(self):
+        self.client.force_login(self.cook)
+        url = reverse('make_feed_comment', args=['1'])
+        response = self.client.post(url, {'comment': 'Lovely'}, **FRAGMENT)
+        self.assertEqual(response['X-Comment-Count'], str(FEED_COMMENTS_PER_CARD + 2))
+        self.assertContains(response, 'Lovely')
+        self.assertContains(response, 'feed-comment-form')
+
+        self.assertEqual(self.client.post(url, {'comment': ''}, **FRAGMENT).status_code, 400)
+        self.assertEqual(self.client.post(reverse('make_feed_comment', args=['999']), {'comment': 'x'}, **FRAGMENT).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.post(url, {'comment': 'x'}, **FRAGMENT).status_code, 403)
+        self.assertEqual(RecipeComment.objects.count(), FEED_COMMENTS_PER_CARD + 2)
+
+    def test_make_feed_comment_without_javascript(self):
+        self.client.force_login(self.cook)
+        response = self.client.post(reverse('make_feed_comment', args=['1']), {'comment': 'Lovely'})
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)], ['Your comment has been added.'])
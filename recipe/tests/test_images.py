@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from recipe.images import cloudinary_variant, image_sources, spoonacular_image_url
+
+
+class ImageSourcesTests(SimpleTestCase):
+    def test_api_recipes_load_from_spoonacular(self):
+        sources = image_sources(recipe_id=716429)
+        self.assertEqual(sources['src'], 'https://spoonacular.com/recipeImages/716429-312x231.jpg')
+        self.assertIn('https://spoonacular.com/recipeImages/716429-636x393.jpg 636w', sources['srcset'])
+        self.assertNotIn('/recipe/', sources['srcset'])
+
+    def test_cloudinary_urls_get_variants(self):
+        url = 'https://res.cloudinary.com/demo/image/upload/v1/recipes/pic.jpg'
+        sources = image_sources(url=url, recipe_id='created_3')
+        self.assertEqual(sources['src'], cloudinary_variant(url, 480))
+        self.assertIn('w_240,c_limit,f_auto,q_auto/v1/recipes/pic.jpg 240w', sources['srcset'])
+
+    def test_other_urls_pass_through(self):
+        self.assertEqual(image_sources(url='/media/recipes/pic.jpg'), {'src': '/media/recipes/pic.jpg', 'srcset': ''})
+
+    def test_old_image_links_redirect_to_the_same_size(self):
+        response = self.client.get(reverse('recipe_image', args=[716429, '480x360']))
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], spoonacular_image_url(716429, '480x360'))
+
+    def test_unknown_size(self):
+        self.assertEqual(self.client.get(reverse('recipe_image', args=[716429, '9x9'])).status_code, 404)
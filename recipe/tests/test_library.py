@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import CreatedRecipe
+from recipe.models import Recipe, RecipeComment, UserRecipe
+from recipe.views import LIBRARY_PAGE_SIZE, created_recipes_for, library_counts
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=STORAGES)
+class LibraryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user('cook')
+        other = User.objects.create_user('other')
+        for n in range(LIBRARY_PAGE_SIZE + 2):
+            recipe = Recipe.objects.create(recipe_id=str(n + 1), title=f'Saved {n + 1}', is_cached=True)
+            UserRecipe.objects.create(user=cls.cook, recipe=recipe)
+        UserRecipe.objects.create(user=other, recipe=Recipe.objects.get(recipe_id='1'))
+
+        cls.rated = CreatedRecipe.objects.create(creator=cls.cook, title='Rated stew', ingredients='x', instructions='y')
+        cls.plain = CreatedRecipe.objects.create(creator=cls.cook, title='Plain stew', ingredients='x', instructions='y')
+        CreatedRecipe.objects.create(creator=other, title='Not mine', ingredients='x', instructions='y')
+        # The feed copy of a created recipe sits in the cook's library too, but is not a saved recipe
+        mirror = Recipe.objects.create(recipe_id=f'created_{cls.rated.id}', title='Rated stew', is_cached=True)
+        UserRecipe.objects.create(user=cls.cook, recipe=mirror, is_shared=True)
+        for user, rating in ((cls.cook, 5), (other, 2), (other, None)):
+            RecipeComment.objects.create(recipe=mirror, user=user, comment='Nice', rating=rating)
+        # Comments on the Spoonacular recipe with the same number don't count
+        RecipeComment.objects.create(recipe=Recipe.objects.get(recipe_id=str(cls.plain.id)), user=other, comment='x', rating=1)
+
+    def setUp(self):
+        self.client.force_login(self.cook)
+
+    def test_counts(self):
+        with self.assertNumQueries(1):
+            counts = library_counts(self.cook)
+        self.assertEqual(counts, {'saved': LIBRARY_PAGE_SIZE + 2, 'created': 2})
+        self.assertEqual(library_counts(User.objects.create_user('new')), {'saved': 0, 'created': 0})
+
+    def test_created_recipes_are_annotated_with_their_ratings(self):
+        recipes = {recipe.pk: recipe for recipe in created_recipes_for(self.cook)}
+        self.assertEqual(set(recipes), {self.rated.pk, self.plain.pk})
+        self.assertEqual((recipes[self.rated.pk].average_rating, recipes[self.rated.pk].rating_count), (3.5, 2))
+        self.assertEqual((recipes[self.plain.pk].average_rating, recipes[self.plain.pk].rating_count), (None, 0))
+
+    def test_saved_tab_pages(self):
+        response = self.client.get(reverse('my_recipes'))
+        self.assertEqual(response.context['tab'], 'saved')
+        self.assertIsNone(response.context['created_page'])
+        page = response.context['saved_page']
+        self.assertEqual(len(page), LIBRARY_PAGE_SIZE)
+        self.assertEqual(page.paginator.num_pages, 2)
+        # Newest first
+        self.assertEqual(page[0].recipe.recipe_id, str(LIBRARY_PAGE_SIZE + 2))
+        self.assertContains(response, f'You have {LIBRARY_PAGE_SIZE + 2} saved recipe(s)')
+        self.assertContains(response, '?tab=saved&saved_page=2')
+
+        last = self.client.get(reverse('my_recipes'), {'saved_page': 2}).context['saved_page']
+        self.assertEqual([entry.recipe.recipe_id for entry in last], ['2', '1'])
+        # Out of range pages show the last one
+        self.assertEqual(self.client.get(reverse('my_recipes_saved'), {'page': 9}).context['saved_page'].number, 2)
+
+    def test_created_tab(self):
+        response = self.client.get(reverse('my_recipes'), {'tab': 'created'})
+        self.assertIsNone(response.context['saved_page'])
+        self.assertEqual([recipe.title for recipe in response.context['created_page']], ['Plain stew', 'Rated stew'])
+        self.assertContains(response, 'You have created 2 original recipe(s).')
+
+        fragment = self.client.get(reverse('my_recipes_created'))
+        self.assertEqual(len(fragment.context['created_page']), 2)
+        self.assertNotContains(fragment, 'Not mine')
+
+    def test_login_required(self):
+        self.client.logout()
+        for name in ('my_recipes', 'my_recipes_saved', 'my_recipes_created'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 302, name)
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from recipe import live
+
+
+class HubTests(SimpleTestCase):
+    async def test_fans_out_to_every_subscriber(self):
+        first, second = live.subscribe(), live.subscribe()
+        try:
+            live.publish('share', {'id': 7})
+            for queue in (first, second):
+                message = await asyncio.wait_for(queue.get(), timeout=1)
+                self.assertEqual(json.loads(message), {'event': 'share', 'data': {'id': 7}})
+        finally:
+            live.unsubscribe(first)
+            live.unsubscribe(second)
+
+    async def test_publishing_from_another_thread(self):
+        # Saves publish from sync views running in worker threads
+        queue = live.subscribe()
+        try:
+            thread = threading.Thread(target=live.publish_local, args=['{"event": "comment", "data": {}}'])
+            thread.start()
+            thread.join()
+            self.assertEqual(await asyncio.wait_for(queue.get(), timeout=1), '{"event": "comment", "data": {}}')
+        finally:
+            live.unsubscribe(queue)
+
+    async def test_unsubscribed_clients_hear_nothing(self):
+        queue = live.subscribe()
+        live.unsubscribe(queue)
+        live.publish('share', {'id': 1})
+        await asyncio.sleep(0)
+        self.assertTrue(queue.empty())
+
+    async def test_slow_client_drops_events_instead_of_blocking(self):
+        queue = live.subscribe()
+        try:
+            for n in range(live.QUEUE_SIZE + 5):
+                live.publish_local(json.dumps({'event': 'share', 'data': {'id': n}}))
+            await asyncio.sleep(0)
+            self.assertEqual(queue.qsize(), live.QUEUE_SIZE)
+        finally:
+            live.unsubscribe(queue)
+
+    def test_format_event(self):
+        message = json.dumps({'event': 'comment', 'data': {'recipe_id': '12'}})
+        self.assertEqual(live.format_event(message), 'event: comment\ndata: {"recipe_id": "12"}\n\n')
+
+
+class LiveFeedViewTests(SimpleTestCase):
+    def setUp(self):
+        # Closing the test client's stream doesn't reach the view's generator
+        self.addCleanup(live._subscribers.clear)
+
+    async def test_streams_published_events(self):
+        response = await self.async_client.get(reverse('live_feed'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+            live.publish('share', {'id': 3})
+            self.assertEqual(await asyncio.wait_for(anext(chunks), timeout=1), b'event: share\ndata: {"id": 3}\n\n')
+        finally:
+            await chunks.aclose()
+
+    async def test_heartbeat_when_idle(self):
+        with mock.patch('recipe.views.LIVE_HEARTBEAT_SECONDS', 0.01):
+            response = await self.async_client.get(reverse('live_feed'))
+            chunks = aiter(response.streaming_content)
+            try:
+                await anext(chunks)
+                self.assertEqual(await asyncio.wait_for(anext(chunks), timeout=1), b': ping\n\n')
+            finally:
+                await chunks.aclose()
+
+    def test_wsgi_workers_tell_the_browser_to_retry_later(self):
+        response = self.client.get(reverse('live_feed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response.content, b'retry: 600000\n\n')
@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from recipe.models import RecipeContent
+from recipe.normalize import INGREDIENT_SCHEMA_VERSION, normalize_ingredient, normalize_ingredients
+from recipe.views import get_or_fetch_recipe
+
+# An extendedIngredients entry as Spoonacular sends it (trimmed a little)
+SPOONACULAR_INGREDIENT = {
+    'id': 11282,
+    'aisle': 'Produce',
+    'image': 'brown-onion.png',
+    'consistency': 'SOLID',
+    'name': 'onion',
+    'nameClean': 'onion',
+    'original': '1 large onion, chopped',
+    'originalName': 'large onion, chopped',
+    'amount': 1.0000001,
+    'unit': '',
+    'meta': ['chopped'],
+    'measures': {'us': {'amount': 1.0, 'unitShort': '', 'unitLong': ''}, 'metric': {'amount': 1.0, 'unitShort': '', 'unitLong': ''}},
+}
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_keeps_the_used_fields_only(self):
+        self.assertEqual(normalize_ingredient(SPOONACULAR_INGREDIENT), {
+            'original': '1 large onion, chopped', 'name': 'onion', 'amount': 1.0, 'aisle': 'Produce',
+        })
+
+    def test_original_falls_back_to_the_name(self):
+        self.assertEqual(normalize_ingredient({'originalName': 'salt', 'aisle': ''}), {'original': 'salt'})
+        self.assertEqual(normalize_ingredient({'name': 'pepper'}), {'name': 'pepper', 'original': 'pepper'})
+
+    def test_plain_strings_and_missing_lists(self):
+        self.assertEqual(normalize_ingredients(['2 eggs']), [{'original': '2 eggs'}])
+        self.assertEqual(normalize_ingredients(None), [])
+
+    def test_already_normalized_is_unchanged(self):
+        normalized = normalize_ingredients([SPOONACULAR_INGREDIENT])
+        self.assertEqual(normalize_ingredients(normalized), normalized)
+
+
+class StoredSchemaTests(TestCase):
+    def test_fetched_recipes_store_the_current_schema(self):
+        with mock.patch('recipe.views.spoonacular.get_recipe_information') as fetch:
+            fetch.return_value = {'id': 1, 'title': 'Soup', 'extendedIngredients': [SPOONACULAR_INGREDIENT]}
+            recipe, data = get_or_fetch_recipe(1)
+        content = RecipeContent.objects.get(recipe=recipe)
+        self.assertEqual(content.schema_version, INGREDIENT_SCHEMA_VERSION)
+        self.assertEqual(content.ingredients, [normalize_ingredient(SPOONACULAR_INGREDIENT)])
+        # Callers see the same shape as on the cached path
+        self.assertEqual(data['extendedIngredients'], content.ingredients)
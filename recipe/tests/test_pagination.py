@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from recipe.models import Recipe, RecipeComment
+from recipe.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cook', password='pass')
+        cls.recipe = Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        comments = RecipeComment.objects.bulk_create(
+            RecipeComment(recipe=cls.recipe, user=cls.user, comment=f'comment {n}') for n in range(7)
+        )
+        # Microseconds apart, with a tie, like rows from one bulk import
+        start = timezone.now()
+        for n, comment in enumerate(comments):
+            RecipeComment.objects.filter(pk=comment.pk).update(created_at=start + timedelta(microseconds=min(n, 5)))
+
+    def walk(self, limit):
+        queryset = RecipeComment.objects.filter(recipe=self.recipe)
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(queryset, cursor=cursor, limit=limit)
+            seen.extend(row.pk for row in rows)
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = list(RecipeComment.objects.filter(recipe=self.recipe).order_by('-created_at', '-pk').values_list('pk', flat=True))
+        for limit in (1, 2, 3, 7, 20):
+            self.assertEqual(self.walk(limit), expected)
+
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = keyset_page(RecipeComment.objects.all(), limit=7)
+        self.assertEqual(len(rows), 7)
+        self.assertIsNone(cursor)
+
+    def test_cursor_keeps_microseconds(self):
+        comment = RecipeComment.objects.earliest('created_at')
+        self.assertEqual(decode_cursor(encode_cursor(comment)), (comment.created_at, comment.pk))
+
+    def test_invalid_cursor_starts_from_the_top(self):
+        self.assertIsNone(decode_cursor('not a cursor'))
+        self.assertIsNone(decode_cursor(''))
+        rows, _ = keyset_page(RecipeComment.objects.all(), cursor='bm9wZQ==', limit=2)
+        self.assertEqual(rows, list(RecipeComment.objects.order_by('-created_at', '-pk')[:2]))
+
+    def test_comment_endpoint_pages_as_json(self):
+        url = reverse('recipe_comments', args=[self.recipe.recipe_id])
+        ids, cursor = [], None
+        while True:
+            response = self.client.get(url, {'format': 'json', **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            ids.extend(comment['id'] for comment in response.json()['comments'])
+            cursor = response.json()['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(sorted(ids), sorted(RecipeComment.objects.values_list('pk', flat=True)))
+
+    def test_comment_endpoint_unknown_recipe(self):
+        response = self.client.get(reverse('recipe_comments', args=['404']), {'format': 'json'})
+        self.assertEqual(response.status_code, 404)
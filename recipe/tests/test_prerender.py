@@ -0,0 +1,89 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.storage import InMemoryStorage
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import CreatedRecipe
+from recipe import prerender
+from recipe.models import Recipe, UserRecipe
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(PRERENDER_PAGES=True, RATELIMIT_ENABLED=False, STORAGES=STORAGES)
+class PrerenderTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        overrides = override_settings(PRERENDER_ROOT=root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.cook = User.objects.create_user('cook')
+        self.recipe = CreatedRecipe.objects.create(
+            creator=self.cook, title='Shared stew', ingredients='x', instructions='y', is_shared=True,
+        )
+        self.key = f'created_{self.recipe.pk}'
+
+    def served(self, recipe_key):
+        request = RequestFactory().get('/')
+        request.user = mock.Mock(is_authenticated=False)
+        response = prerender.serve(request, recipe_key)
+        return response and b''.join(response.streaming_content).decode()
+
+    def test_publish_serve_and_sitemap(self):
+        self.assertTrue(prerender.publish(self.key))
+        self.assertIn('Shared stew', self.served(self.key))
+        self.assertEqual([key for key, _ in prerender.published_pages()], [self.key])
+        self.assertEqual(prerender.write_sitemap(), 1)
+        self.assertContains(self.client.get(reverse('sitemap')), f'/{self.recipe.pk}/')
+
+    def test_unshare_and_delete_always_republish(self):
+        # The page may exist in storage this process has never written to
+        with mock.patch('recipe.prerender.schedule') as schedule:
+            self.recipe.is_shared = False
+            self.recipe.save()
+            self.recipe.delete()
+        self.assertEqual([call.args for call in schedule.call_args_list], [(self.key,), (self.key,)])
+
+    def test_unshared_pages_are_removed(self):
+        prerender.publish(self.key)
+        CreatedRecipe.objects.filter(pk=self.recipe.pk).update(is_shared=False)
+        self.assertFalse(prerender.publish(self.key))
+        self.assertIsNone(self.served(self.key))
+        self.assertFalse(prerender.is_published(self.key))
+
+    def test_deleting_a_shared_save_republishes(self):
+        self.client.force_login(self.cook)
+        soup = Recipe.objects.create(recipe_id='1', title='Soup', is_cached=True)
+        UserRecipe.objects.create(user=self.cook, recipe=soup, is_shared=True)
+        with mock.patch('recipe.prerender.schedule') as schedule:
+            self.client.post(reverse('bulk_delete_recipes'), {'recipe_ids': ['1']})
+        schedule.assert_called_once_with('1')
+
+    def test_object_storage(self):
+        storage = InMemoryStorage()
+        with mock.patch('recipe.prerender.page_storage', return_value=storage):
+            prerender.publish(self.key)
+            # A republish keeps the name instead of saving next to it
+            prerender.publish(self.key)
+            self.assertEqual(storage.listdir(f'created/{self.recipe.pk}'), ([], ['index.html']))
+            self.assertIn('Shared stew', self.served(self.key))
+
+    @override_settings(PRERENDER_PAGES=False)
+    def test_off(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            prerender.schedule(self.key)
+        self.assertEqual(callbacks, [])
+        # Pages left from before are not served
+        prerender.publish(self.key)
+        self.assertIsNone(self.served(self.key))
+        self.assertFalse(prerender.is_published(self.key))
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipe import quota
+from recipe.models import ApiUsage, QueuedRecipeFetch
+
+
+def response(status_code=200, **headers):
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+@override_settings(SPOONACULAR_DAILY_POINTS=10, SPOONACULAR_REQUESTS_PER_SECOND=1, SPOONACULAR_BURST=3)
+class AcquireTests(TestCase):
+    def usage(self):
+        return ApiUsage.objects.get(day=timezone.now().date())
+
+    def test_takes_tokens_and_points(self):
+        quota.acquire(points=2)
+        usage = self.usage()
+        self.assertEqual(usage.points_used, 2)
+        self.assertEqual(usage.requests, 1)
+        self.assertAlmostEqual(usage.tokens, 2, places=1)
+
+    def test_burst_then_rate_limited(self):
+        for _ in range(3):
+            quota.acquire()
+        with self.assertRaises(quota.QuotaExceeded) as raised:
+            quota.acquire()
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(self.usage().throttled, 1)
+        self.assertEqual(self.usage().requests, 3)
+
+    def test_bucket_refills_over_time(self):
+        for _ in range(3):
+            quota.acquire()
+        ApiUsage.objects.update(tokens_updated_at=timezone.now() - timedelta(seconds=2))
+        quota.acquire()
+        quota.acquire()
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.acquire()
+
+    def test_daily_budget(self):
+        quota.acquire(points=9)
+        with self.assertRaises(quota.QuotaExceeded) as raised:
+            quota.acquire(points=2)
+        # Waits for the midnight UTC reset, not a few seconds
+        self.assertAlmostEqual(raised.exception.retry_after, quota.seconds_until_reset(), delta=2)
+        self.assertEqual(self.usage().points_used, 9)
+
+    def test_reported_quota_left_wins(self):
+        quota.acquire()
+        quota.record_response(response(**{'X-API-Quota-Left': '0.5'}))
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.acquire()
+
+
+class RecordResponseTests(TestCase):
+    def setUp(self):
+        self.usage = ApiUsage.objects.create(day=timezone.now().date(), points_used=4)
+
+    def test_used_header_only_moves_the_count_up(self):
+        quota.record_response(response(**{'X-API-Quota-Used': '7.5'}))
+        self.usage.refresh_from_db()
+        self.assertEqual(self.usage.points_used, 7.5)
+        quota.record_response(response(**{'X-API-Quota-Used': '2'}))
+        self.usage.refresh_from_db()
+        self.assertEqual(self.usage.points_used, 7.5)
+
+    def test_payment_required_empties_the_quota(self):
+        quota.record_response(response(status_code=402))
+        self.usage.refresh_from_db()
+        self.assertEqual(self.usage.quota_left, 0)
+
+    def test_queue_fetch_is_idempotent(self):
+        quota.queue_fetch(42)
+        quota.queue_fetch('42')
+        self.assertEqual(QueuedRecipeFetch.objects.get().recipe_id, '42')
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from recipe import random_pool
+from recipe.cache import store_recipe_data
+from recipe.models import RandomPoolEntry, Recipe
+
+
+def recipes(*ids):
+    return [{'id': recipe_id, 'title': f'Recipe {recipe_id}', 'readyInMinutes': 10 * recipe_id, 'servings': 2} for recipe_id in ids]
+
+
+@mock.patch('recipe.random_pool.spoonacular.get_random_recipes')
+class RefillTests(TestCase):
+    def setUp(self):
+        store_recipe_data(recipes(1))
+        RandomPoolEntry.objects.create(recipe=Recipe.objects.get(recipe_id='1'), random_key=0.5)
+
+    def test_counts_only_recipes_new_to_the_pool(self, get_random_recipes):
+        get_random_recipes.side_effect = [recipes(1, 2), recipes(3)]
+        self.assertEqual(random_pool.refill(size=3), 2)
+        self.assertEqual(RandomPoolEntry.objects.count(), 3)
+        self.assertEqual([call.kwargs['number'] for call in get_random_recipes.call_args_list], [2, 1])
+
+    def test_stops_when_a_batch_adds_nothing(self, get_random_recipes):
+        get_random_recipes.return_value = recipes(1)
+        self.assertEqual(random_pool.refill(size=5), 0)
+        self.assertEqual(get_random_recipes.call_count, 1)
+
+    def test_full_pool_makes_no_calls(self, get_random_recipes):
+        self.assertEqual(random_pool.refill(size=1), 0)
+        get_random_recipes.assert_not_called()
+
+
+@override_settings(RANDOM_POOL_LOW_WATER=5, RANDOM_POOL_CHECK_SECONDS=60)
+class RefillIfLowTests(TestCase):
+    def setUp(self):
+        random_pool._next_check = 0.0
+        self.addCleanup(setattr, random_pool, '_next_check', 0.0)
+        cache.delete(random_pool.REFILL_LOCK)
+        self.addCleanup(cache.delete, random_pool.REFILL_LOCK)
+
+    def test_counts_the_pool_once_per_interval(self):
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(1):
+            random_pool.refill_if_low()
+        self.assertEqual(len(callbacks), 1)
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(0):
+            for _ in range(10):
+                random_pool.refill_if_low()
+        self.assertEqual(callbacks, [])
+
+    def test_one_refill_at_a_time(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            random_pool.refill_if_low()
+            random_pool._next_check = 0.0
+            random_pool.refill_if_low()
+        self.assertEqual(len(callbacks), 1)
+
+
+class PickTests(TestCase):
+    def setUp(self):
+        store_recipe_data(recipes(1, 2, 3))
+        for key, recipe in zip((0.1, 0.5, 0.9), Recipe.objects.order_by('recipe_id')):
+            RandomPoolEntry.objects.create(recipe=recipe, random_key=key)
+
+    def test_wraps_around(self):
+        with mock.patch('recipe.random_pool.random.random', return_value=0.95):
+            self.assertEqual(random_pool.pick().recipe_id, '1')
+        with mock.patch('recipe.random_pool.random.random', return_value=0.3):
+            self.assertEqual(random_pool.pick().recipe_id, '2')
+
+    def test_filters(self):
+        with mock.patch('recipe.random_pool.random.random', return_value=0.0):
+            self.assertEqual(random_pool.pick(max_ready_in_minutes=15).recipe_id, '1')
+            self.assertEqual(random_pool.pick(min_servings=2).recipe_id, '1')
+            self.assertIsNone(random_pool.pick(min_servings=4))
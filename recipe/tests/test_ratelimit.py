@@ -0,0 +1,142 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from recipe import ratelimit
+
+# Pages render without collectstatic's manifest
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Start of a one minute window
+T0 = 6000.0
+
+
+def at(seconds):
+    # Only the limiter's clock, the cache keeps real time
+    return mock.patch('recipe.ratelimit.time', SimpleNamespace(time=lambda: seconds))
+
+
+class SlidingWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def hits(self, count, now, limit=3):
+        with at(now):
+            return [ratelimit.hit('view', 'ip:1', limit, 60) for _ in range(count)]
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('10/m'), (10, 60))
+        self.assertEqual(ratelimit.parse_rate('5/h'), (5, 3600))
+
+    def test_limit_within_a_window(self):
+        allowed, refused = self.hits(3, T0), self.hits(1, T0 + 10)
+        self.assertEqual(allowed, [0, 0, 0])
+        # The refused hit counts too: 4 * (1 - x/60) + 1 <= 3 half way into the next window
+        self.assertEqual(refused, [80])
+
+    def test_previous_window_counts_by_overlap(self):
+        self.hits(3, T0)
+        # Half way through the next window half of the last one still counts: 1.5 + 1, then 1.5 + 2
+        allowed, refused = self.hits(1, T0 + 90), self.hits(1, T0 + 90)
+        self.assertEqual(allowed, [0])
+        self.assertEqual(refused, [30])
+        # The whole previous window has slid out a window later
+        self.assertEqual(self.hits(1, T0 + 120), [0])
+
+    def test_clients_and_views_are_counted_apart(self):
+        self.hits(3, T0)
+        with at(T0):
+            self.assertEqual(ratelimit.hit('view', 'ip:2', 3, 60), 0)
+            self.assertEqual(ratelimit.hit('other', 'ip:1', 3, 60), 0)
+
+
+class ClientKeyTests(TestCase):
+    def request(self, **meta):
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1', **meta)
+        request.user = AnonymousUser()
+        return request
+
+    def test_signed_in_users_by_id(self):
+        request = self.request()
+        request.user = User.objects.create_user('cook')
+        self.assertEqual(ratelimit.client_key(request), f'user:{request.user.pk}')
+
+    @override_settings(RATELIMIT_USE_FORWARDED_FOR=True)
+    def test_forwarded_for_uses_the_address_the_router_appended(self):
+        request = self.request(HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2')
+        self.assertEqual(ratelimit.client_key(request), 'ip:2.2.2.2')
+        self.assertEqual(ratelimit.client_key(self.request(HTTP_X_FORWARDED_FOR=' ')), 'ip:10.0.0.1')
+
+    @override_settings(RATELIMIT_USE_FORWARDED_FOR=False)
+    def test_forwarded_for_ignored_unless_enabled(self):
+        request = self.request(HTTP_X_FORWARDED_FOR='1.1.1.1')
+        self.assertEqual(ratelimit.client_key(request), 'ip:10.0.0.1')
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMIT_USE_FORWARDED_FOR=False, STORAGES=STORAGES)
+class DecoratorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        @ratelimit.ratelimit('2/m')
+        def limited_view(request):
+            return HttpResponse('ok')
+
+        self.view = limited_view
+        self.addCleanup(ratelimit.LIMITED_VIEWS.remove, 'limited_view')
+
+    def call(self, method='post', **headers):
+        request = getattr(RequestFactory(), method)('/', REMOTE_ADDR='10.0.0.1', headers=headers)
+        request.user = AnonymousUser()
+        request.resolver_match = None
+        return request
+
+    def test_page_429_with_retry_after(self):
+        with at(T0):
+            self.assertEqual([self.view(self.call()).status_code for _ in range(2)], [200, 200])
+            response = self.view(self.call())
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '100')
+        self.assertIn(b'100', response.content)
+        self.assertEqual(ratelimit.throttled_counts()['limited_view'], 1)
+
+    def test_fragment_and_api_429s(self):
+        with at(T0):
+            self.view(self.call())
+            self.view(self.call())
+            fragment = self.view(self.call(HX_Request='true'))
+            api_request = self.call()
+            api_request.resolver_match = SimpleNamespace(app_name='api')
+            api = self.view(api_request)
+        self.assertEqual((fragment.status_code, fragment['Retry-After']), (429, '100'))
+        self.assertEqual(fragment.content, b'Too many requests, try again in 100s.')
+        self.assertEqual((api.status_code, api['Retry-After']), (429, '105'))
+        self.assertEqual(json.loads(api.content), {'error': 'Too many requests', 'retry_after': 105})
+
+    def test_other_methods_are_not_limited(self):
+        with at(T0):
+            self.assertEqual({self.view(self.call('get')).status_code for _ in range(5)}, {200})
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_can_be_turned_off(self):
+        with at(T0):
+            self.assertEqual({self.view(self.call()).status_code for _ in range(5)}, {200})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}})
+    def test_off_without_atomic_counters(self):
+        with mock.patch('recipe.ratelimit._warned', False), self.assertLogs('recipe.ratelimit', 'WARNING') as logs, at(T0):
+            self.assertEqual({self.view(self.call()).status_code for _ in range(5)}, {200})
+        # Once per process
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual([warning.id for warning in ratelimit.check_cache(None)], ['recipe.W001'])
+
+    def test_check_passes_on_an_atomic_cache(self):
+        self.assertEqual(ratelimit.check_cache(None), [])
@@ -0,0 +1,53 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from recipe.models import RandomPoolEntry, Recipe, RecipeComment, RecipeContent, RecipeNeighbour, UserRecipe
+
+
+class EvictTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('cook', password='pass')
+        for recipe_id in ('1', '2', '3', '4', '5', 'created_1'):
+            recipe = Recipe.objects.create(recipe_id=recipe_id, title=f'Recipe {recipe_id}', is_cached=True)
+            RecipeContent.objects.create(recipe=recipe, summary='...')
+        UserRecipe.objects.create(user=user, recipe=Recipe.objects.get(recipe_id='1'))
+        RecipeComment.objects.create(user=user, recipe=Recipe.objects.get(recipe_id='2'), comment='Nice')
+        RandomPoolEntry.objects.create(recipe=Recipe.objects.get(recipe_id='3'), random_key=0.5)
+        for rank, (source, neighbour) in enumerate((('1', '4'), ('1', '2'), ('4', '1'), ('2', '3'))):
+            RecipeNeighbour.objects.create(source=source, neighbour=neighbour, score=0.5, rank=rank)
+        Recipe.objects.update(cached_at=timezone.now() - timedelta(days=60))
+
+    def evict(self, *args):
+        call_command('refresh_recipe_cache', '--evict', '--max-points=0', *args, stdout=StringIO())
+
+    def test_evicts_only_unused_recipes(self):
+        self.evict()
+        # 4 and 5 are unused; saved, commented, pooled and created recipes stay
+        self.assertEqual(
+            set(Recipe.objects.values_list('recipe_id', flat=True)), {'1', '2', '3', 'created_1'}
+        )
+        self.assertEqual(RecipeContent.objects.count(), 4)
+        self.assertEqual(RandomPoolEntry.objects.count(), 1)
+
+    def test_drops_neighbours_of_evicted_recipes(self):
+        self.evict()
+        self.assertEqual(
+            set(RecipeNeighbour.objects.values_list('source', 'neighbour')), {('1', '2'), ('2', '3')}
+        )
+
+    def test_recently_cached_recipes_stay(self):
+        Recipe.objects.filter(recipe_id='5').update(cached_at=timezone.now())
+        self.evict()
+        self.assertTrue(Recipe.objects.filter(recipe_id='5').exists())
+        self.assertFalse(Recipe.objects.filter(recipe_id='4').exists())
+
+    def test_dry_run_deletes_nothing(self):
+        self.evict('--dry-run')
+        self.assertEqual(Recipe.objects.count(), 6)
+        self.assertEqual(RecipeNeighbour.objects.count(), 4)
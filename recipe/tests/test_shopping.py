@@ -0,0 +1,182 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from blog.models import CreatedRecipe
+from recipe import shopping
+from recipe.api import ApiError, MAX_SHOPPING_RECIPES, parse_selection
+from recipe.models import Recipe, RecipeContent, UserRecipe
+from recipe.shopping import COUNT, MASS, VOLUME
+
+
+class ParseLineTests(SimpleTestCase):
+    def assertParses(self, line, name, dimension, quantity):
+        parsed_name, parsed_dimension, parsed_quantity, aisle = shopping.parse_line(line)
+        self.assertEqual((parsed_name, parsed_dimension, aisle), (name, dimension, ''), line)
+        if quantity is None:
+            self.assertIsNone(parsed_quantity, line)
+        else:
+            self.assertAlmostEqual(parsed_quantity, quantity, places=3, msg=line)
+
+    def test_amounts(self):
+        self.assertParses('2 1/2 cups flour', 'flour', VOLUME, 2.5 * 236.588)
+        self.assertParses('100g cheese', 'cheese', MASS, 100)
+        self.assertParses('1.5 kg sugar', 'sugar', MASS, 1500)
+        # Decimal comma
+        self.assertParses('1,5 kg sugar', 'sugar', MASS, 1500)
+
+    def test_unicode_fractions(self):
+        self.assertParses('½ tsp salt', 'salt', VOLUME, 4.92892 / 2)
+        self.assertParses('1½ cups milk', 'milk', VOLUME, 1.5 * 236.588)
+
+    def test_ranges_use_the_upper_end(self):
+        self.assertParses('1-2 lb potatoes', 'potato', MASS, 2 * 453.592)
+        self.assertParses('1 to 2 tbsp oil', 'oil', VOLUME, 2 * 14.7868)
+        self.assertParses('2–3 eggs', 'egg', COUNT, 3)
+
+    def test_teaspoon_and_tablespoon_abbreviations(self):
+        self.assertParses('1 t salt', 'salt', VOLUME, 4.92892)
+        self.assertParses('1 T sugar', 'sugar', VOLUME, 14.7868)
+        self.assertParses('2 Tbsp. honey', 'honey', VOLUME, 2 * 14.7868)
+        # A unit letter at the start of a word is part of the name
+        self.assertParses('2 tomatoes', 'tomato', COUNT, 2)
+
+    def test_units_kept_as_they_are(self):
+        self.assertParses('3 cloves garlic, minced', 'garlic', 'clove', 3)
+        self.assertParses('1 can of tomatoes', 'tomato', 'can', 1)
+        self.assertParses('2 large eggs', 'egg', COUNT, 2)
+
+    def test_lines_without_an_amount(self):
+        self.assertParses('Salt and pepper', 'salt and pepper', COUNT, None)
+        self.assertParses('a pinch of salt', 'a pinch of salt', COUNT, None)
+
+
+class NameAndUnitTests(SimpleTestCase):
+    def test_clean_name_strips_notes_and_plurals(self):
+        for raw, name in (
+            ('Eggs, beaten', 'egg'),
+            ('Berries', 'berry'),
+            ('Potatoes', 'potato'),
+            ('Onions (red)', 'onion'),
+            ('glass', 'glass'),
+            ('asparagus', 'asparagus'),
+            ('peas', 'pea'),
+            ('gas', 'gas'),
+        ):
+            self.assertEqual(shopping.clean_name(raw), name, raw)
+
+    def test_parse_amount(self):
+        self.assertEqual(shopping.parse_amount('1 1/2'), 1.5)
+        self.assertEqual(shopping.parse_amount('3/4'), 0.75)
+        self.assertEqual(shopping.parse_amount('1,5'), 1.5)
+        self.assertIsNone(shopping.parse_amount('some'))
+        self.assertIsNone(shopping.parse_amount('1/0'))
+
+    def test_canonical(self):
+        self.assertEqual(shopping.canonical(2, 'kg'), (MASS, 2000))
+        self.assertEqual(shopping.canonical(1, 'T'), (VOLUME, 14.7868))
+        self.assertEqual(shopping.canonical(1, 't'), (VOLUME, 4.92892))
+        self.assertEqual(shopping.canonical(1, 'Tbsp.'), (VOLUME, 14.7868))
+        self.assertEqual(shopping.canonical(2, 'Cloves'), ('clove', 2))
+        self.assertEqual(shopping.canonical(2, 'glasses'), ('glasses', 2))
+        self.assertEqual(shopping.canonical(None, 'g'), (MASS, None))
+        self.assertEqual(shopping.canonical(3, None), (COUNT, 3))
+
+    def test_display(self):
+        self.assertEqual(shopping.display(1500, MASS), (1.5, 'kg'))
+        self.assertEqual(shopping.display(29.57, VOLUME), (30, VOLUME))
+        self.assertEqual(shopping.display(2.5, 'clove'), (2.5, 'clove'))
+
+
+class AggregateTests(SimpleTestCase):
+    versions = {'1': ('Soup', 2, 0.0), '2': ('Stew', None, 0.0)}
+
+    def test_adds_up_per_name_and_dimension(self):
+        rows = {
+            '1': [('butter', MASS, 50.0, 'Dairy'), ('butter', VOLUME, 14.7868, 'Dairy'), ('salt', COUNT, None, 'Spices')],
+            '2': [('butter', MASS, 100.0, 'Dairy'), ('garlic', 'clove', 2.0, 'Produce')],
+        }
+        items = shopping.aggregate([('1', None), ('2', None)], self.versions, rows)
+        self.assertEqual(items, [
+            {'name': 'butter', 'amount': 150, 'unit': MASS, 'aisle': 'Dairy', 'recipes': 2},
+            {'name': 'butter', 'amount': 15, 'unit': VOLUME, 'aisle': 'Dairy', 'recipes': 1},
+            {'name': 'garlic', 'amount': 2.0, 'unit': 'clove', 'aisle': 'Produce', 'recipes': 1},
+            {'name': 'salt', 'amount': None, 'unit': COUNT, 'aisle': 'Spices', 'recipes': 1},
+        ])
+
+    def test_rows_without_an_amount_add_nothing(self):
+        rows = {'1': [('egg', COUNT, None, ''), ('egg', COUNT, 2.0, '')], '2': [('egg', COUNT, None, '')]}
+        items = shopping.aggregate([('1', None), ('2', None)], self.versions, rows)
+        self.assertEqual(items, [{'name': 'egg', 'amount': 2.0, 'unit': COUNT, 'aisle': '', 'recipes': 2}])
+
+    def test_scales_to_servings(self):
+        rows = {'1': [('flour', MASS, 200.0, '')], '2': [('flour', MASS, 100.0, '')]}
+        # Soup serves 2, so 6 servings is three times; Stew has no servings to scale from
+        items = shopping.aggregate([('1', 6), ('2', 6)], self.versions, rows)
+        self.assertEqual(items[0]['amount'], 700)
+
+    def test_nothing_to_buy(self):
+        self.assertEqual(shopping.aggregate([('1', None)], self.versions, {}), [])
+
+
+class ParseSelectionTests(SimpleTestCase):
+    def test_keys_and_servings(self):
+        self.assertEqual(
+            parse_selection('716429:4, created_12,,3:0'),
+            [('716429', 4), ('created_12', None), ('3', None)],
+        )
+
+    def test_invalid(self):
+        for value in (None, '', ',', 'abc', 'created_x', '12:two', '12:-1', f"{','.join(['1'] * (MAX_SHOPPING_RECIPES + 1))}"):
+            with self.assertRaises(ApiError, msg=value):
+                parse_selection(value)
+
+
+class ShoppingListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = User.objects.create_user('cook')
+        other = User.objects.create_user('other')
+        soup = Recipe.objects.create(recipe_id='1', title='Soup', servings=2, is_cached=True)
+        RecipeContent.objects.create(recipe=soup, ingredients=[
+            {'name': 'butter', 'amount': 50, 'unit': 'g', 'aisle': 'Dairy'},
+            {'original': '2 onions, chopped', 'aisle': 'Produce'},
+        ])
+        UserRecipe.objects.create(user=cls.cook, recipe=soup)
+        Recipe.objects.create(recipe_id='2', title='Not saved', is_cached=True)
+        cls.mine = CreatedRecipe.objects.create(creator=cls.cook, title='Mine', ingredients='100 g butter\n1 onion', instructions='x', servings=4)
+        cls.private = CreatedRecipe.objects.create(creator=other, title='Private', ingredients='1 kg butter', instructions='x')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.cook)
+
+    def get(self, recipes):
+        return self.client.get(reverse('api:shopping_list'), {'recipes': recipes})
+
+    def test_list(self):
+        selection = f'1:4,created_{self.mine.id},2,created_{self.private.id},999'
+        response = self.get(selection).json()
+        self.assertEqual(response['recipes'], [
+            {'recipe_id': '1', 'title': 'Soup', 'servings': 4},
+            {'recipe_id': f'created_{self.mine.id}', 'title': 'Mine', 'servings': 4},
+        ])
+        self.assertEqual(response['items'], [
+            {'name': 'butter', 'amount': 200, 'unit': MASS, 'aisle': 'Dairy', 'recipes': 2},
+            # Same item across recipes; the aisle comes from the first that has it
+            {'name': 'onion', 'amount': 5.0, 'unit': COUNT, 'aisle': 'Produce', 'recipes': 2},
+        ])
+        # Unsaved, other people's unshared and unknown recipes
+        self.assertEqual(response['missing'], sorted(['2', f'created_{self.private.id}', '999']))
+
+        # The second time only the user, access and versions are read; the list is cached
+        with self.assertNumQueries(5):
+            self.assertEqual(self.get(selection).json(), response)
+
+    def test_bad_selection(self):
+        self.assertEqual(self.get('abc').status_code, 400)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.get('1').status_code, 401)
@@ -0,0 +1,128 @@
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from blog.models import CreatedRecipe
+from recipe import similar
+from recipe.models import Recipe, RecipeContent, RecipeNeighbour
+
+
+def neighbours(source):
+    return list(RecipeNeighbour.objects.filter(source=source).values_list('neighbour', flat=True))
+
+
+class TokensTests(TestCase):
+    def test_drops_quantities_units_and_short_words(self):
+        self.assertEqual(similar.tokens('2 cups Chopped fresh Basil, a pinch of salt'), ['basil', 'salt'])
+        self.assertEqual(similar.tokens(None), [])
+
+
+class TopNeighboursTests(TestCase):
+    documents = [
+        ('1', 'Tomato soup', ['tomato', 'soup']),
+        ('2', 'Tomato salad', ['tomato', 'salad']),
+        ('3', 'Chocolate cake', ['chocolate', 'cake']),
+        ('4', 'Tomato soup again', ['tomato', 'soup', 'again']),
+    ]
+
+    def test_rows_are_normalized(self):
+        matrix = similar.tfidf_matrix(self.documents)
+        np.testing.assert_allclose(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel(), 1, rtol=1e-5)
+
+    def test_best_first_without_self_or_unrelated(self):
+        matrix = similar.tfidf_matrix(self.documents)
+        found = dict(similar.top_neighbours(matrix, range(4), k=3))
+        self.assertEqual([column for column, _ in found[0]], [3, 1])
+        self.assertEqual(found[2], [])
+        scores = [score for _, score in found[0]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_k_is_capped_by_the_corpus(self):
+        matrix = similar.tfidf_matrix(self.documents[:2])
+        found = dict(similar.top_neighbours(matrix, [0, 1], k=8))
+        self.assertEqual([column for column, _ in found[0]], [1])
+        self.assertEqual(list(similar.top_neighbours(matrix[:1], [0])), [])
+
+    def test_blocks_give_the_same_answer(self):
+        matrix = similar.tfidf_matrix(self.documents)
+        whole = dict(similar.top_neighbours(matrix, range(4), k=2))
+        similar.BLOCK_SIZE, size = 1, similar.BLOCK_SIZE
+        try:
+            self.assertEqual(dict(similar.top_neighbours(matrix, range(4), k=2)), whole)
+        finally:
+            similar.BLOCK_SIZE = size
+
+
+class NeighbourListTests(TestCase):
+    def setUp(self):
+        self.cook = User.objects.create_user('cook')
+        self.add_recipe('1', 'Tomato soup', ['tomato', 'onion'])
+        self.add_recipe('2', 'Tomato salad', ['tomato', 'cucumber'])
+        self.add_recipe('3', 'Chocolate cake', ['chocolate', 'flour'])
+
+    def add_recipe(self, recipe_id, title, ingredients):
+        recipe = Recipe.objects.create(recipe_id=recipe_id, title=title, is_cached=True)
+        RecipeContent.objects.create(recipe=recipe, ingredients=[{'name': name} for name in ingredients])
+
+    def add_created(self, title, ingredients, is_shared=True):
+        return CreatedRecipe.objects.create(
+            creator=self.cook, title=title, ingredients=ingredients, instructions='Cook', is_shared=is_shared,
+        )
+
+    def test_rebuild(self):
+        shared = self.add_created('Chocolate brownies', '200g chocolate\n100g flour')
+        self.add_created('Chocolate mousse', 'chocolate', is_shared=False)
+        Recipe.objects.create(recipe_id='9', title='Tomato stub', is_cached=False)
+        RecipeNeighbour.objects.create(source='gone', neighbour='1', score=1, rank=0)
+
+        self.assertEqual(similar.rebuild(), 4)
+        self.assertEqual(neighbours('1'), ['2'])
+        self.assertEqual(neighbours('3'), [f'created_{shared.id}'])
+        self.assertEqual(neighbours(f'created_{shared.id}'), ['3'])
+        # Unshared created recipes and uncached stubs are never recommended
+        self.assertEqual(
+            set(RecipeNeighbour.objects.values_list('source', flat=True)),
+            {'1', '2', '3', f'created_{shared.id}'},
+        )
+        row = RecipeNeighbour.objects.get(source='1')
+        self.assertEqual((row.title, row.rank), ('Tomato salad', 0))
+        self.assertTrue(0 < row.score < 1)
+
+    def test_rebuild_keeps_the_top_k(self):
+        self.add_recipe('4', 'Tomato pasta', ['tomato', 'pasta'])
+        similar.rebuild(k=1)
+        self.assertEqual(RecipeNeighbour.objects.filter(source='1').count(), 1)
+
+    def test_update_indexes_new_recipes_and_offers_them_to_neighbours(self):
+        similar.rebuild()
+        self.add_recipe('4', 'Chocolate cake with cherries', ['chocolate', 'flour', 'cherry'])
+
+        # The cake had nothing in common with the soups, so it had no list to keep either
+        self.assertEqual(similar.update(), 2)
+        self.assertEqual(neighbours('4'), ['3'])
+        self.assertEqual(neighbours('3'), ['4'])
+        self.assertEqual(neighbours('1'), ['2'])
+        # Nothing new, nothing to do
+        self.assertEqual(similar.update(), 0)
+
+    def test_update_respects_k_when_offering(self):
+        self.add_recipe('4', 'Tomato pasta', ['tomato', 'pasta'])
+        similar.rebuild(k=1)
+        self.add_recipe('5', 'Tomato soup with onion', ['tomato', 'onion'])
+        similar.update(k=1)
+        self.assertEqual(neighbours('5'), ['1'])
+        # Soup's one slot goes to the closer newcomer, the others keep theirs
+        self.assertEqual(neighbours('1'), ['5'])
+        self.assertEqual(RecipeNeighbour.objects.filter(source='2').count(), 1)
+
+    def test_update_forgets_recipes_that_are_gone(self):
+        shared = self.add_created('Tomato bake', 'tomato\nonion')
+        similar.rebuild()
+        self.assertIn(f'created_{shared.id}', neighbours('1'))
+
+        shared.is_shared = False
+        shared.save()
+        similar.update()
+        self.assertEqual(neighbours(f'created_{shared.id}'), [])
+        self.assertNotIn(f'created_{shared.id}', neighbours('1'))
+        self.assertFalse(RecipeNeighbour.objects.filter(neighbour=f'created_{shared.id}').exists())
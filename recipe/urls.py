@@ -9,6 +9,17 @@ urlpatterns = [
     path('recipe/<int:recipe_id>/share/', views.share_recipe, name='share_recipe'),
     path('recipe/<int:recipe_id>/delete/', views.delete_recipe, name='delete_recipe'),
     path('my-recipes/', views.my_recipes, name='my_recipes'),
+    path('my-recipes/saved/', views.my_recipes_saved, name='my_recipes_saved'),
+    path('my-recipes/created/', views.my_recipes_created, name='my_recipes_created'),
+    path('my-recipes/save/', views.bulk_save_recipes, name='bulk_save_recipes'),
+    path('my-recipes/delete/', views.bulk_delete_recipes, name='bulk_delete_recipes'),
+    path('my-recipes/import/', views.import_recipes, name='import_recipes'),
     path('recipe/<int:recipe_id>/comment/', views.make_comment, name='make_comment'),
     path('recipe/<str:recipe_id>/feed-comment/', views.make_feed_comment, name='make_feed_comment'),
+    path('recipe/<str:recipe_id>/comments/', views.recipe_comments, name='recipe_comments'),
+    path('recipe/<int:recipe_id>/image/<str:size>/', views.recipe_image, name='recipe_image'),
+    path('recipe/<str:recipe_id>/feed-comments/', views.feed_comments, name='feed_comments'),
+    path('feed/card/<int:user_recipe_id>/', views.feed_card, name='feed_card'),
+    path('feed/live/', views.live_feed, name='live_feed'),
+    path('quota/metrics/', views.quota_metrics, name='quota_metrics'),
 ]
\ No newline at end of file
@@ -1,14 +1,60 @@
 
 # Imports
+import asyncio
+import re
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.http import HttpResponse, JsonResponse, Http404, FileResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-import requests 
-from .models import Recipe, UserRecipe, RecipeComment
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db.models import Avg, CharField, Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils.cache import patch_cache_control
+from django.utils.http import url_has_allowed_host_and_scheme
+from .models import Recipe, RecipeContent, RecipeNeighbour, UserRecipe, RecipeComment
+from .pagination import keyset_page
+from .feed import FEED_COMMENTS_PER_CARD, build_comment_block, build_feed_cards
+from .http import is_fragment_request
+from .cache import content_fields_from_api, recipe_fields_from_api, store_recipe_data
+from .images import SPOONACULAR_SIZES, reverse_format, spoonacular_image_url
+from . import spoonacular
+from . import analytics, live, prerender, quota, random_pool
+from .ratelimit import ratelimit, throttled_counts
+from .streaming import stream_template
+from .quota import QuotaExceeded, queue_fetch
 from blog.models import CreatedRecipe
 
+# Number of comments loaded per page on the recipe detail page
+COMMENTS_PER_PAGE = 20
+
+# Live feed streams: reconnect delay, heartbeat interval and how long one
+# connection is held before the browser is asked to reconnect
+LIVE_RETRY_MS = 3000
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_STREAM_SECONDS = 5 * 60
+
+# Recipes per page in each My Recipes section
+LIBRARY_PAGE_SIZE = 12
+
+# Most recipes accepted by one bulk save, delete or import
+MAX_BULK_RECIPES = 200
+
+# Feed cards rendered (and read from the database) per streamed chunk
+FEED_STREAM_CHUNK = 20
+
+
+def shown_recipes():
+    """API recipes, and the feed mirrors of created recipes while they are shared"""
+    shared = UserRecipe.objects.filter(recipe=OuterRef('pk'), is_shared=True)
+    return Recipe.objects.filter(~Q(recipe_id__startswith='created_') | Exists(shared))
+
+
 # Helper function to fetch and cache recipe data
 def get_or_fetch_recipe(recipe_id):
     """
@@ -19,17 +65,18 @@ def get_or_fetch_recipe(recipe_id):
     
     # Try to get from database
     try:
-        recipe_obj = Recipe.objects.get(recipe_id=recipe_id_str)
+        recipe_obj = Recipe.objects.select_related('content').get(recipe_id=recipe_id_str)
         
         # If cached, return cached data
         if recipe_obj.is_cached:
+            content = getattr(recipe_obj, 'content', None) or RecipeContent()
             recipe_data = {
                 'id': int(recipe_id),
                 'title': recipe_obj.title,
                 'image': recipe_obj.image_url,
-                'summary': recipe_obj.summary,
-                'instructions': recipe_obj.instructions,
-                'extendedIngredients': recipe_obj.ingredients or [],
+                'summary': content.summary,
+                'instructions': content.instructions,
+                'extendedIngredients': content.ingredients or [],
                 'readyInMinutes': recipe_obj.ready_in_minutes,
                 'servings': recipe_obj.servings,
                 'sourceUrl': recipe_obj.source_url,
@@ -39,68 +86,119 @@ def get_or_fetch_recipe(recipe_id):
         pass
     
     # Fetch from API (if not cached)
-    url = f"https://api.spoonacular.com/recipes/{recipe_id}/information"
-    params = {'apiKey': settings.SPOONACULAR_API_KEY}
-    response = requests.get(url, params=params)
-    recipe_data = response.json()
+    recipe_data = spoonacular.get_recipe_information(recipe_id)
     
-    # Fix image URL
-    recipe_data['image'] = f"https://spoonacular.com/recipeImages/{recipe_id}-312x231.jpg"
-    
-    # Create recipe in database with full cached data
-    recipe_obj, created = Recipe.objects.get_or_create(
+    # Create (or complete) the recipe in database with full cached data
+    recipe_obj, created = Recipe.objects.update_or_create(
         recipe_id=recipe_id_str,
-        defaults={
-            'title': recipe_data.get('title', f'Recipe {recipe_id}'),
-            'image_url': recipe_data.get('image'),
-            'summary': recipe_data.get('summary', ''),
-            'instructions': recipe_data.get('instructions', ''),
-            'ingredients': recipe_data.get('extendedIngredients', []),
-            'ready_in_minutes': recipe_data.get('readyInMinutes'),
-            'servings': recipe_data.get('servings'),
-            'source_url': recipe_data.get('sourceUrl'),
-            'is_cached': True
-        }
+        defaults=recipe_fields_from_api(recipe_id, recipe_data)
     )
+    content_fields = content_fields_from_api(recipe_data)
+    RecipeContent.objects.update_or_create(recipe=recipe_obj, defaults=content_fields)
+    
+    # Same shape as the cached path
+    recipe_data['extendedIngredients'] = content_fields['ingredients']
     
     return recipe_obj, recipe_data
 
 
+# Batch version of get_or_fetch_recipe for bulk operations
+def get_or_fetch_recipes(recipe_ids):
+    """
+    Get many API recipes at once. Everything not cached yet is fetched with
+    batched informationBulk calls and written with bulk upserts.
+    Returns a dict: {recipe_id_str: recipe_obj} (ids the API doesn't know are left out,
+    ids that hit the quota are queued for later)
+    """
+    recipe_ids = list(dict.fromkeys(str(recipe_id) for recipe_id in recipe_ids))
+    cached = set(Recipe.objects.filter(recipe_id__in=recipe_ids, is_cached=True).values_list('recipe_id', flat=True))
+    missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in cached]
+    
+    # One batch at a time so a quota stop keeps what was already fetched
+    for start in range(0, len(missing), spoonacular.BULK_BATCH_SIZE):
+        batch = missing[start:start + spoonacular.BULK_BATCH_SIZE]
+        try:
+            store_recipe_data(spoonacular.get_recipe_information_bulk(batch))
+        except QuotaExceeded:
+            for recipe_id in missing[start:]:
+                queue_fetch(recipe_id)
+            break
+    
+    return {
+        recipe.recipe_id: recipe
+        for recipe in Recipe.objects.filter(recipe_id__in=recipe_ids, is_cached=True).only('id', 'recipe_id')
+    }
+
+
+# Friendly page for when Spoonacular can't be called (quota or rate limit)
+def api_unavailable(request, error, recipe_id=None):
+    if recipe_id is not None:
+        queue_fetch(recipe_id)
+    response = render(request, 'search/unavailable.html', {'queued': recipe_id is not None}, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+# Recipes already in the cache, shaped like Spoonacular search results
+def search_cached_recipes(query, number=10):
+    recipes = Recipe.objects.filter(is_cached=True, title__icontains=query).exclude(
+        recipe_id__startswith='created_'
+    ).only('recipe_id', 'title', 'image_url', 'ready_in_minutes').order_by('title')[:number]
+    return [
+        {'id': recipe.recipe_id, 'title': recipe.title, 'image': recipe.image_url, 'readyInMinutes': recipe.ready_in_minutes}
+        for recipe in recipes
+    ]
+
+
 # Get all shared recipes for the feed, ordered by most recent
 def home_view(request):
     shared_recipes = UserRecipe.objects.filter(
         is_shared=True
     ).select_related('user', 'recipe').order_by('-shared_at')
     
-# Get comments for each shared recipe (limit to 3 most recent for feed display)
+    if settings.STREAMING_PAGES:
+        # Page shell first, then cards as they are read from the database
+        return stream_template(request, "home.html", {}, 'feed_stream', feed_card_chunks(request, shared_recipes))
     
-    recipes_with_comments = []
-    for shared_recipe in shared_recipes:
-        comments = RecipeComment.objects.filter(
-            recipe=shared_recipe.recipe
-        ).select_related('user').order_by('-created_at')[:3]
-        
-        comment_count = RecipeComment.objects.filter(
-            recipe=shared_recipe.recipe
-        ).count()
-        
-        recipes_with_comments.append({
-            'shared_recipe': shared_recipe,
-            'recent_comments': comments,
-            'comment_count': comment_count
-        })
+    # Cards carry their URLs, stars and 3 most recent comments, ready to print
+    feed_cards = build_feed_cards(shared_recipes)
+    
+    return render(request, "home.html", {'feed_cards': feed_cards, 'comments_per_card': FEED_COMMENTS_PER_CARD})
+
+
+# Rendered feed cards, FEED_STREAM_CHUNK at a time, read through a cursor
+def feed_card_chunks(request, shared_recipes):
+    def render_chunk(batch, continued):
+        return render_to_string('recipe/feed_cards.html', {
+            'feed_cards': build_feed_cards(batch), 'continued': continued, 'comments_per_card': FEED_COMMENTS_PER_CARD
+        }, request)
     
-    return render(request, "home.html", {'recipes_with_comments': recipes_with_comments})
+    batch = []
+    continued = False  # only the very first card is loaded eagerly
+    for shared_recipe in shared_recipes.iterator(chunk_size=FEED_STREAM_CHUNK):
+        batch.append(shared_recipe)
+        if len(batch) == FEED_STREAM_CHUNK:
+            yield render_chunk(batch, continued)
+            batch = []
+            continued = True
+    if batch:
+        yield render_chunk(batch, continued)
+    elif not continued:
+        yield render_to_string('recipe/feed_empty.html', request=request)
 
 
 # Share recipe to Feed
+@ratelimit('10/m')
 def share_recipe(request, recipe_id):
     if request.method == 'POST':
         message = request.POST.get('message', '')
         rating = request.POST.get('rating', None)
         
         # Use helper to fetch and cache recipe data
-        recipe_obj, recipe_data = get_or_fetch_recipe(recipe_id)
+        try:
+            recipe_obj, recipe_data = get_or_fetch_recipe(recipe_id)
+        except QuotaExceeded as error:
+            return api_unavailable(request, error, recipe_id)
         
         # Get or create UserRecipe entry and mark as shared
         user_recipe, created = UserRecipe.objects.get_or_create(
@@ -122,9 +220,16 @@ def share_recipe(request, recipe_id):
             if rating:
                 user_recipe.rating = rating
             user_recipe.save()
-            messages.success(request, "Recipe shared to the feed!")
-        else:
+        
+        if is_fragment_request(request):
+            # The new feed card, ready to be dropped into the page
+            card, = build_feed_cards([user_recipe])
+            return render(request, 'recipe/feed_card.html', {'card': card, 'comments_per_card': FEED_COMMENTS_PER_CARD})
+        
+        if created:
             messages.success(request, "Recipe added to your favorites and shared!")
+        else:
+            messages.success(request, "Recipe shared to the feed!")
         
         return redirect('home')
     
@@ -137,68 +242,174 @@ def share_recipe(request, recipe_id):
 def search_recipes(request):
     if request.method == 'POST':
         query = request.POST.get('query')
-        url = "https://api.spoonacular.com/recipes/complexSearch"
-        params = {
-            'apiKey': settings.SPOONACULAR_API_KEY,
-            'query': query,
-            'number': 10
-        }
-        response = requests.get(url, params=params)
-        data = response.json()
-        recipes = data.get('results', [])
+        try:
+            recipes = spoonacular.search_recipes(query, number=10)
+        except QuotaExceeded:
+            # Fall back to recipes we already have
+            recipes = search_cached_recipes(query, number=10)
+            messages.warning(request, "Live search is taking a break, showing matching recipes we already have.")
         return render(request, 'search/results.html', {'recipes': recipes})
     return render(request, 'search/search.html') 
 
 
 # Display Recipe Details
 def recipe_detail(request, recipe_id):
+    
+    # Anonymous visitors get the prerendered page when there is one
+    response = prerender.serve(request, recipe_id)
+    if response:
+        analytics.record_view(str(recipe_id))
+        return response
 
     # Use cached data if available
-    recipe_obj, recipe = get_or_fetch_recipe(recipe_id)
+    try:
+        recipe_obj, recipe = get_or_fetch_recipe(recipe_id)
+    except QuotaExceeded as error:
+        return api_unavailable(request, error, recipe_id)
+    
+    # Buffered in memory, written in batches
+    analytics.record_view(recipe_obj.recipe_id)
+    
+    return render(request, 'search/detail.html', recipe_detail_context(recipe_obj, recipe, request.user))
+
+
+def recipe_detail_context(recipe_obj, recipe=None, user=None):
+    """Template context of a recipe page, for user (anonymous if None)"""
+    if recipe is None:
+        recipe_obj, recipe = get_or_fetch_recipe(recipe_obj.recipe_id)
     
     # Check if recipe is already saved by the user
     is_saved = UserRecipe.objects.filter(
-        user=request.user,
-        recipe__recipe_id=str(recipe_id)
-    ).exists() if request.user.is_authenticated else False
-    
-     # Get all comments for this recipe
-    comments = RecipeComment.objects.filter(
+        user=user,
         recipe=recipe_obj
-    ).select_related('user').order_by('-created_at')
+    ).exists() if user and user.is_authenticated else False
     
-    return render(request, 'search/detail.html', {
+    # Only the first page of comments, the rest is loaded from recipe_comments
+    comments, next_cursor = keyset_page(
+        RecipeComment.objects.filter(recipe=recipe_obj).select_related('user'),
+        limit=COMMENTS_PER_PAGE
+    )
+    
+    # Comment count and rating aggregate in a single query
+    comment_stats = RecipeComment.objects.filter(recipe=recipe_obj).aggregate(
+        total=Count('id'),
+        rating_count=Count('rating'),
+        average_rating=Avg('rating')
+    )
+    
+    return {
         'recipe': recipe,
         'is_saved': is_saved,
-        'comments': comments
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'comment_stats': comment_stats,
+        'similar_recipes': similar_recipes(recipe_obj.recipe_id)
+    }
+
+
+def similar_recipes(recipe_id):
+    """Precomputed neighbours of a recipe (one indexed query) with their links"""
+    neighbours = list(RecipeNeighbour.objects.filter(source=str(recipe_id)).order_by('rank'))
+    for neighbour in neighbours:
+        if neighbour.neighbour.startswith('created_'):
+            neighbour.url = reverse_format('public_created_recipe_detail').format(neighbour.neighbour[len('created_'):])
+        else:
+            neighbour.url = reverse_format('recipe_detail').format(neighbour.neighbour)
+    return neighbours
+
+
+# Paginated comments for a recipe, as JSON or an HTML fragment
+def recipe_comments(request, recipe_id):
+    try:
+        recipe_obj = shown_recipes().get(recipe_id=str(recipe_id))
+    except Recipe.DoesNotExist:
+        raise Http404("Recipe not found.")
+    
+    comments, next_cursor = keyset_page(
+        RecipeComment.objects.filter(recipe=recipe_obj).select_related('user'),
+        cursor=request.GET.get('cursor'),
+        limit=COMMENTS_PER_PAGE
+    )
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'user': comment.user.username,
+                    'comment': comment.comment,
+                    'rating': comment.rating,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': next_cursor,
+        })
+    
+    return render(request, 'search/comment_page.html', {
+        'recipe_id': recipe_obj.recipe_id,
+        'comments': comments,
+        'next_cursor': next_cursor
     })
 
 
-# Get a random recipe from Spoonacular API and cache it
-def random_recipe(request):
+# Sitemap of the prerendered public pages, written by recipe/prerender.py
+def sitemap(request):
+    storage = prerender.page_storage()
+    if not storage.exists('sitemap.xml'):
+        prerender.write_sitemap()
+    response = FileResponse(storage.open('sitemap.xml'), content_type='application/xml')
+    patch_cache_control(response, public=True, max_age=60 * 60)
+    return response
+
+
+# Old image links (e.g. in prerendered pages) go to the same size on Spoonacular's CDN
+def recipe_image(request, recipe_id, size):
+    if size not in SPOONACULAR_SIZES.values():
+        raise Http404("Unknown image size.")
     
-    url = "https://api.spoonacular.com/recipes/random"
-    params = {
-        'apiKey': settings.SPOONACULAR_API_KEY,
-        'number': 1  # Get one random recipe
+    response = redirect(spoonacular_image_url(recipe_id, size), permanent=True)
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365)
+    return response
+
+
+# Pick a random recipe from the prefetched pool (optionally filtered)
+def random_recipe(request):
+    filters = {
+        'max_ready_in_minutes': request.GET.get('max_ready', ''),
+        'min_servings': request.GET.get('servings', ''),
     }
-    response = requests.get(url, params=params)
-    data = response.json()
+    filters = {name: int(value) for name, value in filters.items() if value.isdigit()}
     
-    recipe_data = data['recipes'][0]
-    recipe_id = recipe_data['id']
+    recipe_obj = random_pool.pick(**filters)
+    random_pool.refill_if_low()
     
-    # Cache this recipe for future use
-    recipe_obj, recipe = get_or_fetch_recipe(recipe_id)
+    if recipe_obj is None:
+        if filters:
+            messages.info(request, "No recipes matched those filters, here's something else to try.")
+            recipe_obj = random_pool.pick()
+    if recipe_obj is None:
+        # Pool is empty (e.g. first run): fetch one live, the response has everything we need
+        try:
+            recipes_data = spoonacular.get_random_recipes(number=1)
+        except QuotaExceeded as error:
+            return api_unavailable(request, error)
+        if not store_recipe_data(recipes_data):
+            raise Http404("No random recipe available.")
+        return redirect('recipe_detail', recipe_id=recipes_data[0]['id'])
     
-    return render(request, 'search/detail.html', {'recipe': recipe})
+    return redirect('recipe_detail', recipe_id=recipe_obj.recipe_id)
 
 
 # Save Recipe to User's Favorites
+@ratelimit('30/m', methods=None)
 def save_recipe(request, recipe_id):
     
     # Use helper to fetch and cache recipe data
-    recipe_obj, recipe_data = get_or_fetch_recipe(recipe_id)
+    try:
+        recipe_obj, recipe_data = get_or_fetch_recipe(recipe_id)
+    except QuotaExceeded as error:
+        return api_unavailable(request, error, recipe_id)
     
     # Get or Create UserRecipe entry
     user_recipe, created = UserRecipe.objects.get_or_create(
@@ -214,20 +425,81 @@ def save_recipe(request, recipe_id):
     return redirect('recipe_detail', recipe_id=recipe_id)
 
 
-# Display User Recipes
+# Saved API recipes for a user (their own created recipes are listed separately)
+def saved_recipes_for(user):
+    return UserRecipe.objects.filter(user=user).exclude(
+        recipe__recipe_id__startswith='created_'
+    ).select_related('recipe').order_by('-created_at', '-id')
+
+
+# Created recipes for a user, with comment ratings annotated instead of
+# calling get_average_rating/get_rating_count for every card
+def created_recipes_for(user):
+    ratings = RecipeComment.objects.filter(
+        recipe__recipe_id=Concat(Value('created_'), Cast(OuterRef('id'), CharField())),
+        rating__isnull=False
+    ).order_by().values('recipe')
+    return CreatedRecipe.objects.filter(creator=user).annotate(
+        average_rating=Subquery(ratings.annotate(value=Avg('rating')).values('value')),
+        rating_count=Coalesce(Subquery(ratings.annotate(value=Count('id')).values('value')), 0)
+    ).order_by('-created_at', '-id')
+
+
+# Saved and created recipe counts for the tabs, in one query
+def library_counts(user):
+    saved = saved_recipes_for(OuterRef('pk')).order_by().values('user').annotate(total=Count('id')).values('total')
+    created = CreatedRecipe.objects.filter(creator=OuterRef('pk')).order_by().values('creator').annotate(total=Count('id')).values('total')
+    return User.objects.filter(pk=user.pk).values(
+        saved=Coalesce(Subquery(saved), 0),
+        created=Coalesce(Subquery(created), 0)
+    ).get()
+
+
+# One page of a library section; the total is already known from library_counts
+def library_page(queryset, total, number):
+    paginator = Paginator(queryset, LIBRARY_PAGE_SIZE)
+    paginator.count = total  # skip Paginator's own COUNT query
+    return paginator.get_page(number)
 
+
+# Display User Recipes
+@login_required
 def my_recipes(request):
+    counts = library_counts(request.user)
     
-    # Get saved recipes, excluding user's own created recipes that were shared
-    saved_recipes = UserRecipe.objects.filter(
-        user=request.user).exclude(recipe__recipe_id__startswith='created_').order_by('-created_at')
-    
-    # Get user's created recipes
-    created_recipes = CreatedRecipe.objects.filter(creator=request.user).order_by('-created_at')
+    # Only the open tab is rendered, the other one loads from its fragment endpoint
+    tab = 'created' if request.GET.get('tab') == 'created' else 'saved'
+    saved_page = created_page = None
+    if tab == 'saved':
+        saved_page = library_page(saved_recipes_for(request.user), counts['saved'], request.GET.get('saved_page'))
+    else:
+        created_page = library_page(created_recipes_for(request.user), counts['created'], request.GET.get('created_page'))
     
     return render(request, 'recipe/my_recipes.html', {
-        'saved_recipes': saved_recipes,
-        'created_recipes': created_recipes
+        'counts': counts,
+        'tab': tab,
+        'saved_page': saved_page,
+        'created_page': created_page
+    })
+
+
+# Saved recipes section of My Recipes as an HTML fragment
+@login_required
+def my_recipes_saved(request):
+    counts = library_counts(request.user)
+    return render(request, 'recipe/library_saved.html', {
+        'counts': counts,
+        'saved_page': library_page(saved_recipes_for(request.user), counts['saved'], request.GET.get('page'))
+    })
+
+
+# Created recipes section of My Recipes as an HTML fragment
+@login_required
+def my_recipes_created(request):
+    counts = library_counts(request.user)
+    return render(request, 'recipe/library_created.html', {
+        'counts': counts,
+        'created_page': library_page(created_recipes_for(request.user), counts['created'], request.GET.get('page'))
     })
 
 
@@ -236,16 +508,95 @@ def my_recipes(request):
 def delete_recipe(request, recipe_id):
         user_recipe = UserRecipe.objects.get(user=request.user, recipe__recipe_id=str(recipe_id))
         user_recipe.delete()
+        if user_recipe.is_shared:
+            prerender.schedule(recipe_id)
         messages.success(request, "Recipe deleted from your favorites.")
         return redirect('my_recipes')
 
 
+# Parse recipe ids from a form (checkboxes or pasted list of ids / Spoonacular URLs)
+def parse_recipe_ids(request):
+    """Return up to MAX_BULK_RECIPES unique recipe id strings, in order"""
+    recipe_ids = request.POST.getlist('recipe_ids')
+    for token in re.split(r'[\s,]+', request.POST.get('recipe_list', '')):
+        # e.g. "715538" or "https://spoonacular.com/recipes/bruschetta-715538"
+        match = re.search(r'(\d+)/?$', token)
+        if match:
+            recipe_ids.append(match.group(1))
+    recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id.isdigit()]
+    return list(dict.fromkeys(recipe_ids))[:MAX_BULK_RECIPES]
+
+
+def next_url(request, default='my_recipes'):
+    """The POSTed "next" page if it is on this site, otherwise default"""
+    url = request.POST.get('next')
+    if url and url_has_allowed_host_and_scheme(url, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        return url
+    return default
+
+
+# Save many recipes to User's Favorites at once
+@login_required
+@ratelimit('5/m')
+def bulk_save_recipes(request):
+    if request.method != 'POST':
+        return redirect('my_recipes')
+    
+    recipe_ids = parse_recipe_ids(request)
+    if not recipe_ids:
+        messages.error(request, "No recipes selected.")
+        return redirect(next_url(request))
+    
+    # Uncached recipes are fetched in batches, existing favorites are skipped by the DB
+    recipes = get_or_fetch_recipes(recipe_ids)
+    already_saved = UserRecipe.objects.filter(user=request.user, recipe__in=recipes.values()).count()
+    UserRecipe.objects.bulk_create(
+        [UserRecipe(user=request.user, recipe=recipe) for recipe in recipes.values()],
+        ignore_conflicts=True
+    )
+    
+    added = len(recipes) - already_saved
+    messages.success(request, f"{added} recipe(s) added to your favorites.")
+    skipped = len(recipe_ids) - len(recipes)
+    if skipped:
+        messages.warning(request, f"{skipped} recipe(s) could not be found or will be fetched later, try importing them again tomorrow.")
+    return redirect(next_url(request))
+
+
+# Delete many recipes from User's Favorites at once
+@login_required
+def bulk_delete_recipes(request):
+    if request.method == 'POST':
+        recipe_ids = parse_recipe_ids(request)
+        user_recipes = UserRecipe.objects.filter(
+            user=request.user,
+            recipe__recipe_id__in=recipe_ids
+        )
+        # Their pages may have been public because of these shares
+        prerender.schedule(*user_recipes.filter(is_shared=True).values_list('recipe__recipe_id', flat=True))
+        deleted, _ = user_recipes.delete()
+        messages.success(request, f"{deleted} recipe(s) deleted from your favorites.")
+    return redirect('my_recipes')
+
+
+# Import a list of recipes into User's Favorites
+@login_required
+def import_recipes(request):
+    if request.method == 'POST':
+        return bulk_save_recipes(request)
+    return render(request, 'recipe/import_recipes.html', {'max_recipes': MAX_BULK_RECIPES})
+
+
 # Make Comment on Recipe
+@ratelimit('10/m')
 def make_comment(request, recipe_id):
     if request.method == 'POST':
         comment_text = request.POST.get('comment')
         rating = request.POST.get('rating', None)
-        recipe_obj, _ = get_or_fetch_recipe(recipe_id)
+        try:
+            recipe_obj, _ = get_or_fetch_recipe(recipe_id)
+        except QuotaExceeded as error:
+            return api_unavailable(request, error, recipe_id)
 
 # Create the comment
         RecipeComment.objects.create(
@@ -261,14 +612,16 @@ def make_comment(request, recipe_id):
 
 
 # Handle comments submitted from the home feed
+@ratelimit('10/m')
 def make_feed_comment(request, recipe_id):
+    fragment = is_fragment_request(request)
     
     if request.method == 'POST' and request.user.is_authenticated:
         comment_text = request.POST.get('comment')
         
         if comment_text:
             try:
-                recipe_obj = Recipe.objects.get(recipe_id=str(recipe_id))
+                recipe_obj = shown_recipes().only('id', 'recipe_id').get(recipe_id=str(recipe_id))
                 
                 # Create the comment
                 RecipeComment.objects.create(
@@ -277,8 +630,78 @@ def make_feed_comment(request, recipe_id):
                     comment=comment_text,
                 )
                 
+                if fragment:
+                    return render_comment_block(request, recipe_obj)
                 messages.success(request, "Your comment has been added.")
             except Recipe.DoesNotExist:
+                if fragment:
+                    raise Http404("Recipe not found.")
                 messages.error(request, "Recipe not found.")
+        elif fragment:
+            return HttpResponse("Comment can't be empty.", status=400)
+    elif fragment:
+        return HttpResponse("Log in to add a comment.", status=403)
     
     return redirect('home')
+
+
+# Just a recipe's feed comment section, with the new total in a header
+def render_comment_block(request, recipe_obj):
+    block = build_comment_block(recipe_obj)
+    response = render(request, 'recipe/feed_comments.html', {'card': block, 'comments_per_card': FEED_COMMENTS_PER_CARD})
+    response['X-Comment-Count'] = str(block.comment_count)
+    return response
+
+
+# One feed card as an HTML fragment (used by the live feed)
+def feed_card(request, user_recipe_id):
+    shared_recipes = UserRecipe.objects.filter(pk=user_recipe_id, is_shared=True).select_related('user', 'recipe')
+    cards = build_feed_cards(shared_recipes)
+    if not cards:
+        raise Http404("Shared recipe not found.")
+    return render(request, 'recipe/feed_card.html', {'card': cards[0], 'comments_per_card': FEED_COMMENTS_PER_CARD})
+
+
+# A recipe's feed comment section as an HTML fragment (used by the live feed)
+def feed_comments(request, recipe_id):
+    try:
+        recipe_obj = shown_recipes().only('id', 'recipe_id').get(recipe_id=str(recipe_id))
+    except Recipe.DoesNotExist:
+        raise Http404("Recipe not found.")
+    return render_comment_block(request, recipe_obj)
+
+
+# Server-Sent Events stream of new shares and comments (needs the ASGI server)
+async def live_feed(request):
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be tied up for the whole connection, so tell
+        # the browser to check back much later instead
+        return HttpResponse("retry: 600000\n\n", content_type='text/event-stream')
+    
+    async def events():
+        queue = live.subscribe()
+        try:
+            yield f"retry: {LIVE_RETRY_MS}\n\n"
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + LIVE_STREAM_SECONDS
+            while loop.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": ping\n\n"
+                else:
+                    yield live.format_event(message)
+        finally:
+            live.unsubscribe(queue)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Spoonacular quota and our own rate limits, for monitoring
+@staff_member_required
+def quota_metrics(request):
+    return JsonResponse({**quota.metrics(), 'rate_limited': throttled_counts()})
@@ -0,0 +1,45 @@
+/* Upload a recipe's featured image straight to Cloudinary when signed
+   parameters are available, so the form post only carries the public id.
+   Falls back to a normal file upload otherwise. */
+document.querySelectorAll('form[data-upload-signature-url]').forEach(function (form) {
+    var fileInput = form.querySelector('input[type="file"][name="featured_image"]');
+    var submitButton = form.querySelector('button[type="submit"]');
+    if (!fileInput || !window.fetch) {
+        return;
+    }
+
+    fileInput.addEventListener('change', function () {
+        var file = fileInput.files[0];
+        if (!file) {
+            return;
+        }
+        submitButton.disabled = true;
+
+        fetch(form.dataset.uploadSignatureUrl, {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (params) {
+                if (!params.direct_upload) {
+                    return null;
+                }
+                var data = new FormData();
+                data.append('file', file);
+                ['api_key', 'timestamp', 'signature', 'folder'].forEach(function (key) {
+                    data.append(key, params[key]);
+                });
+                return fetch(params.upload_url, {method: 'POST', body: data})
+                    .then(function (response) { return response.json(); });
+            })
+            .then(function (result) {
+                if (!result || !result.public_id) {
+                    return;
+                }
+                form.querySelector('[name="featured_image_public_id"]').value = result.public_id;
+                form.querySelector('[name="featured_image_version"]').value = result.version;
+                form.querySelector('[name="featured_image_signature"]').value = result.signature;
+                // Already uploaded, don't send the file again
+                fileInput.value = '';
+            })
+            .catch(function () {})
+            .then(function () { submitButton.disabled = false; });
+    });
+});